@@ -2,16 +2,29 @@
 """
 Nurse Well-being Knowledge Graph Data Generator
 
-Generates node and relationship CSVs and Neo4j Cypher file for import.
+Generates node and relationship CSVs and neo4j-admin bulk-import files.
 Includes structured and unstructured nurse survey data, peer reviews,
 team info, interventions, clinics, families, incidents, and comments.
 """
 
+import argparse
+import ast
+import json
 import random
+import shutil
+import sys
 import uuid
 import csv
 import os
+from multiprocessing import Pool
 from faker import Faker
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# The Parquet / Arrow sink is shared with simulated_data/nurses_shift.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "simulated_data"))
+from columnar import EXTENSIONS, open_sink
 
 # =============================================================================
 #                                       CONFIGURATION
@@ -27,6 +40,9 @@ NUM_COMMENTS = 1500
 NUM_TEAMS = 12
 NUM_INTERVENTIONS = 10
 NUM_FAMILIES = 300
+NUM_POSTS = 200
+CHUNK_SIZE = 100_000    # rows per write in --stream mode
+TEXT_POOL_DIR = ".cache"   # pre-generated Faker text pools are cached here between runs
 
 departments = ["Emergency", "ICU", "Outpatient", "Pediatrics", "Surgical", "Oncology", "General Medicine", "Maternity"]
 clinic_types = ["Hospital", "Clinic", "Community Center", "Long-term Care"]
@@ -37,52 +53,118 @@ intervention_types = [
 
 fake = Faker(['en_US'])
 
+
+def new_id():
+    """UUID4 drawn from the module RNG so seeded runs produce the same ids."""
+    return str(uuid.UUID(int=random.getrandbits(128), version=4))
+
+
+def seed_everything(seed):
+    random.seed(seed)
+    fake.seed_instance(seed)
+
+# =============================================================================
+#                                 FAKER TEXT POOLS
+# =============================================================================
+
+# Faker dominates generation time. With a text pool, each kind of string is
+# generated once up front and rows sample from it with batched index draws.
+TEXT_KINDS = {
+    "name": lambda f, r: f.name(),
+    "company": lambda f, r: f.company(),
+    "city": lambda f, r: f.city(),
+    "sentence_15": lambda f, r: f.sentence(nb_words=15),
+    "sentence_10_20": lambda f, r: f.sentence(nb_words=r.randint(10, 20)),
+    "sentence_25": lambda f, r: f.sentence(nb_words=25),
+}
+
+_text_pool = None   # None keeps the exact per-row Faker calls
+
+def build_text_pool(size, seed=0):
+    """Pre-generate `size` strings of every TEXT_KINDS entry with a dedicated, seeded Faker."""
+    f, r = Faker(['en_US']), random.Random(seed)
+    f.seed_instance(seed)
+    return {kind: [make(f, r) for _ in range(size)] for kind, make in TEXT_KINDS.items()}
+
+def load_text_pool(size, seed=0, cache_dir=TEXT_POOL_DIR):
+    """Return the pool for (size, seed), building it and caching it as JSON on first use."""
+    path = os.path.join(cache_dir, f"text_pool_{size}_{seed}.json")
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            pool = json.load(f)
+        if set(pool) == set(TEXT_KINDS):
+            return pool
+    pool = build_text_pool(size, seed)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(pool, f)
+    return pool
+
+def use_text_pool(pool):
+    global _text_pool
+    _text_pool = pool
+
+def text_column(kind, n):
+    """Iterator over n strings of one kind, consumed with next() once per row.
+
+    Pooled: one random.choices call draws every index at once. Otherwise a lazy
+    generator calls Faker at the same point in the row as before, so seeded
+    output is unchanged when no pool is in use.
+    """
+    if _text_pool is not None:
+        return iter(random.choices(_text_pool[kind], k=n))
+    make = TEXT_KINDS[kind]
+    return (make(fake, random) for _ in range(n))
+
 # =============================================================================
 #                              NODE GENERATION FUNCTIONS
 # =============================================================================
 
 def generate_clinics(n=NUM_CLINICS):
+    companies, cities = text_column("company", n), text_column("city", n)
     return [{
-        "clinic_id": str(uuid.uuid4()),
-        "clinic_name": fake.company(),
+        "clinic_id": new_id(),
+        "clinic_name": next(companies),
         "clinic_type": random.choice(clinic_types),
-        "location": fake.city(),
+        "location": next(cities),
     } for _ in range(n)]
 
 def generate_families(n=NUM_FAMILIES):
     return [{
-        "family_id": str(uuid.uuid4()),
+        "family_id": new_id(),
         "family_type": random.choice(["Single", "Single Parent", "Married", "Married with Children", "Extended"]),
         "num_dependents": random.randint(0, 5),
     } for _ in range(n)]
 
 def generate_teams(n=NUM_TEAMS):
     return [{
-        "team_id": str(uuid.uuid4()),
+        "team_id": new_id(),
         "team_name": fake.bs().title(),
         "department": random.choice(departments),
     } for _ in range(n)]
 
 def generate_interventions(n=NUM_INTERVENTIONS):
+    descriptions = text_column("sentence_15", n)
     return [{
-        "intervention_id": str(uuid.uuid4()),
+        "intervention_id": new_id(),
         "type": random.choice(intervention_types),
-        "description": fake.sentence(nb_words=15),
+        "description": next(descriptions),
         "scope": random.choice(["Department", "Hospital", "System"])
     } for _ in range(n)]
 
 def generate_nurses(n, clinics, families, teams):
+    names = text_column("name", n)
     nurses = []
     for _ in range(n):
         team = random.choice(teams)
         family = random.choice(families)
         clinic = random.choice(clinics)
         nurses.append({
-            "nurse_id": str(uuid.uuid4()),
+            "nurse_id": new_id(),
             "clinic_id": clinic["clinic_id"],
             "team_id": team["team_id"],
             "family_id": family["family_id"],
-            "name": fake.name(),
+            "name": next(names),
             "age": random.randint(22, 65),
             "gender": random.choice(["Female", "Male", "Other"]),
             "ethnicity": fake.random_element(["White", "Black", "Asian", "Hispanic", "Other"]),
@@ -108,7 +190,7 @@ def generate_nurses(n, clinics, families, teams):
 
 def generate_incidents(n, clinics):
     return [{
-        "incident_id": str(uuid.uuid4()),
+        "incident_id": new_id(),
         "clinic_id": random.choice(clinics)["clinic_id"],
         "department": random.choice(departments),
         "type": random.choice([
@@ -121,11 +203,12 @@ def generate_incidents(n, clinics):
     } for _ in range(n)]
 
 def generate_comments(n, incidents, nurses):
+    sentences = text_column("sentence_10_20", n)
     return [{
-        "comment_id": str(uuid.uuid4()),
+        "comment_id": new_id(),
         "incident_id": random.choice(incidents)["incident_id"],
         "nurse_id": random.choice(nurses)["nurse_id"],
-        "text": fake.sentence(nb_words=random.randint(10, 20)) + " " + random.choice([
+        "text": next(sentences) + " " + random.choice([
             "Felt stressed and unsupported.", "Team pulled together and handled the crisis.",
             "Peer review highlighted strengths in leadership.", "Struggled communicating with management.",
             "Appreciated supervisor's recognition.", "Difficult shift but grateful for colleagues.",
@@ -134,13 +217,25 @@ def generate_comments(n, incidents, nurses):
     } for _ in range(n)]
 
 def generate_peer_ratings(nurses, teams):
-    ratings = []
+    return [r for team_ratings in iter_peer_ratings(nurses, teams) for r in team_ratings]
+
+def iter_peer_ratings(nurses, teams):
+    """Yield each team's ratings: every member rates up to 3 random teammates.
+
+    Members are grouped by team in one pass over nurses, and peers are drawn as
+    positions in the team skipping the rater, so the whole run is linear in the
+    number of nurses instead of O(teams * nurses + sum(team_size ** 2)).
+    """
+    members_by_team = {}
+    for n in nurses:
+        members_by_team.setdefault(n['team_id'], []).append(n)
     for team in teams:
-        members = [n for n in nurses if n['team_id'] == team['team_id']]
-        for n1 in members:
-            peers = [n2 for n2 in members if n1['nurse_id'] != n2['nurse_id']]
-            sample_peers = random.sample(peers, min(3, len(peers)))
-            for n2 in sample_peers:
+        members = members_by_team.get(team['team_id'], [])
+        ratings = []
+        for i, n1 in enumerate(members):
+            # Same draw as random.sample(peers, k): it only depends on len(peers)
+            for j in random.sample(range(len(members) - 1), min(3, len(members) - 1)):
+                n2 = members[j + (j >= i)]
                 ratings.append({
                     "from_nurse_id": n1['nurse_id'],
                     "to_nurse_id": n2['nurse_id'],
@@ -151,7 +246,7 @@ def generate_peer_ratings(nurses, teams):
                         "Effective leader.", "Could communicate more proactively."
                     ])
                 })
-    return ratings
+        yield ratings
 
 
 
@@ -201,25 +296,31 @@ def enrich_nurse_with_research_factors(nurses):
     return nurses
 
 
-def generate_misinformation_posts(n=200):
+def generate_misinformation_posts(n=NUM_POSTS):
     """Generate synthetic health misinformation posts for LLM–KG integration."""
     topics = ["Vaccines", "Mental Health", "Pain Management", "Nutrition", "Substance Use"]
+    texts = text_column("sentence_25", n)
     return [{
-        "post_id": str(uuid.uuid4()),
+        "post_id": new_id(),
         "topic": random.choice(topics),
-        "text": fake.sentence(nb_words=25),
+        "text": next(texts),
         "credibility_score": round(random.uniform(0, 1), 2)
     } for _ in range(n)]
 
 
 def generate_nurse_post_engagement(nurses, posts):
     """Connect nurses to misinformation posts."""
+    return generate_post_engagements(len(nurses) // 2, nurses, posts)
+
+
+def generate_post_engagements(n, nurses, posts):
+    """Draw n random nurse-post engagements."""
     relations = []
-    for _ in range(len(nurses) // 2):
-        n = random.choice(nurses)
+    for _ in range(n):
+        nurse = random.choice(nurses)
         p = random.choice(posts)
         relations.append({
-            "nurse_id": n["nurse_id"],
+            "nurse_id": nurse["nurse_id"],
             "post_id": p["post_id"],
             "engagement_type": random.choice(["commented", "shared", "flagged", "ignored"])
         })
@@ -232,11 +333,25 @@ def generate_nurse_post_engagement(nurses, posts):
 #                             RELATIONSHIP GENERATION
 # =============================================================================
 
+def generate_nurse_incidents(n, nurses, incidents):
+    return [{"nurse_id": random.choice(nurses)["nurse_id"], "incident_id": random.choice(incidents)["incident_id"]} for _ in range(n)]
+
+PER_NURSE_RELATIONSHIPS = ["nurse_intervention", "nurse_family", "nurse_clinic", "nurse_team"]
+
+def generate_nurse_relationships(nurses, interventions):
+    """Relationships that depend on a single nurse row, so they can be built chunk by chunk."""
+    return {
+        "nurse_intervention": [{"nurse_id": n["nurse_id"], "intervention_id": random.choice(interventions)["intervention_id"]} for n in nurses],
+        "nurse_family": [{"nurse_id": n["nurse_id"], "family_id": n["family_id"]} for n in nurses],
+        "nurse_clinic": [{"nurse_id": n["nurse_id"], "clinic_id": n["clinic_id"]} for n in nurses],
+        "nurse_team": [{"nurse_id": n["nurse_id"], "team_id": n["team_id"]} for n in nurses],
+    }
+
 def generate_relationships(nurses, incidents, comments, interventions):
     return {
         "nurse_intervention": [{"nurse_id": n["nurse_id"], "intervention_id": random.choice(interventions)["intervention_id"]} for n in nurses],
         "nurse_family": [{"nurse_id": n["nurse_id"], "family_id": n["family_id"]} for n in nurses],
-        "nurse_incident": [{"nurse_id": random.choice(nurses)["nurse_id"], "incident_id": random.choice(incidents)["incident_id"]} for _ in range(NUM_INCIDENTS)],
+        "nurse_incident": generate_nurse_incidents(len(incidents), nurses, incidents),
         "comment_incident": [{"comment_id": c["comment_id"], "incident_id": c["incident_id"]} for c in comments],
         "nurse_clinic": [{"nurse_id": n["nurse_id"], "clinic_id": n["clinic_id"]} for n in nurses],
         "incident_clinic": [{"incident_id": i["incident_id"], "clinic_id": i["clinic_id"]} for i in incidents],
@@ -258,22 +373,331 @@ def write_csv(filename, data):
             writer.writerow(row)
     print(f"Wrote {filename} with {len(data)} records")
 
+def append_csv(filename, data, header):
+    """Append rows to filename, truncating it and writing the header first when header is True."""
+    with open(os.path.join(OUTPUT_DIR, filename), 'w' if header else 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(data[0].keys()))
+        if header:
+            writer.writeheader()
+        writer.writerows(data)
+
+def write_csv_chunks(filename, chunks):
+    """Stream an iterable of row lists into filename without holding more than one chunk."""
+    total = 0
+    for chunk in chunks:
+        if chunk:
+            append_csv(filename, chunk, header=total == 0)
+            total += len(chunk)
+    if total:
+        print(f"Wrote {filename} with {total} records")
+    else:
+        print(f"Warning: No data to write for {filename}")
+    return total
+
+def iter_chunks(generate, n, chunk_size, *args):
+    """Yield generate(k, *args) batches of at most chunk_size rows until n rows are produced."""
+    for start in range(0, n, chunk_size):
+        yield generate(min(chunk_size, n - start), *args)
+
+# =============================================================================
+#                          NEO4J-ADMIN BULK IMPORT FORMAT
+# =============================================================================
+
+ADMIN_IMPORT_DIR = "neo4j_import"
+
+# generated file -> (label, id column)
+ADMIN_NODES = {
+    "clinics.csv": ("Clinic", "clinic_id"),
+    "families.csv": ("Family", "family_id"),
+    "teams.csv": ("Team", "team_id"),
+    "interventions.csv": ("Intervention", "intervention_id"),
+    "nurses.csv": ("Nurse", "nurse_id"),
+    "incidents.csv": ("Incident", "incident_id"),
+    "comments.csv": ("Comment", "comment_id"),
+    "misinformation_posts.csv": ("MisinformationPost", "post_id"),
+}
+
+# (generated file, type, (start column, label), (end column, label), property columns or None for all the rest)
+ADMIN_RELATIONSHIPS = [
+    ("nurse_intervention.csv", "PARTICIPATES_IN", ("nurse_id", "Nurse"), ("intervention_id", "Intervention"), None),
+    ("nurse_family.csv", "BELONGS_TO", ("nurse_id", "Nurse"), ("family_id", "Family"), None),
+    ("nurse_incident.csv", "INVOLVED_IN", ("nurse_id", "Nurse"), ("incident_id", "Incident"), None),
+    ("comment_incident.csv", "ABOUT", ("comment_id", "Comment"), ("incident_id", "Incident"), None),
+    ("comments.csv", "WROTE", ("nurse_id", "Nurse"), ("comment_id", "Comment"), []),
+    ("nurse_clinic.csv", "WORKS_AT", ("nurse_id", "Nurse"), ("clinic_id", "Clinic"), None),
+    ("incident_clinic.csv", "OCCURRED_AT", ("incident_id", "Incident"), ("clinic_id", "Clinic"), None),
+    ("nurse_team.csv", "MEMBER_OF", ("nurse_id", "Nurse"), ("team_id", "Team"), None),
+    ("peer_ratings.csv", "RATED", ("from_nurse_id", "Nurse"), ("to_nurse_id", "Nurse"), None),
+    ("nurse_post_engagement.csv", "ENGAGED_WITH", ("nurse_id", "Nurse"), ("post_id", "MisinformationPost"), None),
+]
+
+# Typed header suffixes; every other column is imported as a string
+ADMIN_COLUMN_TYPES = {
+    "num_dependents": "int", "age": "int", "years_experience": "int", "severity": "int", "rating": "int",
+    "resilience_score": "int", "peer_recognition": "int", "job_satisfaction": "int", "burnout_score": "int",
+    "stress_score": "int", "physical_health": "int", "mental_health": "int", "work_life_balance": "int",
+    "psychological_distress": "int", "wsi_score": "int", "workload_intensity": "int",
+    "rest_hours_between_shifts": "int", "sleep_quality": "int", "fatigue_score": "int",
+    "autonomy_in_schedule": "int", "depression_score": "int", "doctor_nurse_relationship": "int",
+    "patient_conflict_score": "int", "income_satisfaction": "int", "respect_perception": "int",
+    "work_family_conflict": "int",
+    "has_chronic_disease": "boolean", "violence_experience": "boolean", "support_access": "boolean",
+    "financial_insecurity": "boolean", "intention_to_leave": "boolean", "suicide_risk_flag": "boolean",
+    "support_utilized": "boolean",
+    "credibility_score": "float",
+    "date": "date",
+    "substance_use": "string[]",
+}
+ARRAY_DELIMITER = ";"
+
+def _admin_header(column):
+    kind = ADMIN_COLUMN_TYPES.get(column)
+    return f"{column}:{kind}" if kind else column
+
+def _admin_value(column, value):
+    if ADMIN_COLUMN_TYPES.get(column) == "string[]" and value.startswith("["):
+        return ARRAY_DELIMITER.join(ast.literal_eval(value))
+    return value
+
+def _convert_admin_file(source, target, header, make_row):
+    """Stream one generated CSV into target with a typed header; return the row count."""
+    with open(os.path.join(OUTPUT_DIR, source), newline='', encoding='utf-8') as src, \
+            open(target, 'w', newline='', encoding='utf-8') as dst:
+        reader = csv.DictReader(src)
+        writer = csv.writer(dst)
+        writer.writerow(header(reader.fieldnames))
+        count = 0
+        for row in reader:
+            writer.writerow(make_row(row))
+            count += 1
+    return count
+
+def export_neo4j_admin(import_dir=None):
+    """Write nodes/ and relationships/ in `neo4j-admin database import` format plus import.sh."""
+    import_dir = import_dir or os.path.join(OUTPUT_DIR, ADMIN_IMPORT_DIR)
+    os.makedirs(os.path.join(import_dir, "nodes"), exist_ok=True)
+    os.makedirs(os.path.join(import_dir, "relationships"), exist_ok=True)
+    node_args, rel_args = [], []
+
+    for source, (label, id_col) in ADMIN_NODES.items():
+        if not os.path.exists(os.path.join(OUTPUT_DIR, source)):
+            continue
+        target = os.path.join("nodes", f"{label}.csv")
+        columns = []
+        def header(fields):
+            columns[:] = fields
+            return [f"{c}:ID({label})" if c == id_col else _admin_header(c) for c in fields] + [":LABEL"]
+        count = _convert_admin_file(source, os.path.join(import_dir, target), header,
+                                    lambda row: [_admin_value(c, row[c]) for c in columns] + [label])
+        node_args.append(target)
+        print(f"Wrote {target} with {count} nodes")
+
+    for source, rel_type, (start, start_label), (end, end_label), props in ADMIN_RELATIONSHIPS:
+        if not os.path.exists(os.path.join(OUTPUT_DIR, source)):
+            continue
+        target = os.path.join("relationships", f"{rel_type}.csv")
+        columns = []
+        def header(fields):
+            columns[:] = [c for c in fields if c not in (start, end)] if props is None else props
+            return [f":START_ID({start_label})", f":END_ID({end_label})"] + [_admin_header(c) for c in columns] + [":TYPE"]
+        count = _convert_admin_file(source, os.path.join(import_dir, target), header,
+                                    lambda row: [row[start], row[end]] + [_admin_value(c, row[c]) for c in columns] + [rel_type])
+        rel_args.append(target)
+        print(f"Wrote {target} with {count} relationships")
+
+    lines = ["#!/bin/sh",
+             "# Offline bulk load generated by data_generate_v2.py. The target database must be stopped.",
+             "# Usage: sh import.sh [database-name]",
+             'cd "$(dirname "$0")" || exit 1',
+             'neo4j-admin database import full "${1:-neo4j}" \\',
+             "    --overwrite-destination \\",
+             f'    --array-delimiter="{ARRAY_DELIMITER}" \\']
+    lines += [f"    --nodes={path} \\" for path in node_args]
+    lines += [f"    --relationships={path} \\" for path in rel_args]
+    lines[-1] = lines[-1][:-2]
+    script = os.path.join(import_dir, "import.sh")
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.chmod(script, 0o755)
+    print(f"Wrote {script}")
+
+# =============================================================================
+#                          COLUMNAR (PARQUET / ARROW) OUTPUT
+# =============================================================================
+
+COLUMNAR_BLOCK_SIZE = 16 << 20   # bytes of CSV parsed per record batch
+
+def export_columnar(fmt):
+    """Convert every generated CSV to Parquet or Arrow IPC next to it, one record batch at a time.
+
+    Columns get the types listed in ADMIN_COLUMN_TYPES (ints, bools, floats, dates,
+    substance_use as list<string>) and low-cardinality strings are dictionary-encoded.
+    """
+    arrow_types = {"int": pa.int64(), "boolean": pa.bool_(), "float": pa.float64(), "date": pa.date32(),
+                   "string[]": pa.string()}
+    column_types = {c: arrow_types[t] for c, t in ADMIN_COLUMN_TYPES.items()}
+    for filename in sorted(os.listdir(OUTPUT_DIR)):
+        if not filename.endswith(".csv"):
+            continue
+        path = os.path.join(OUTPUT_DIR, filename)
+        reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=COLUMNAR_BLOCK_SIZE),
+                                convert_options=pacsv.ConvertOptions(column_types=column_types,
+                                                                     strings_can_be_null=False))
+        target = path[:-len(".csv")] + EXTENSIONS[fmt]
+        sink = open_sink(target, fmt)
+        try:
+            for batch in reader:
+                table = pa.Table.from_batches([batch])
+                if "substance_use" in table.column_names:
+                    # "['Alcohol', 'Caffeine']" -> ["Alcohol", "Caffeine"]
+                    raw = pc.replace_substring_regex(table.column("substance_use"), r"[\[\]']", "")
+                    table = table.set_column(table.schema.get_field_index("substance_use"), "substance_use",
+                                             pc.split_pattern(raw, ", "))
+                sink.write(table)
+        finally:
+            sink.close()
+        print(f"Wrote {os.path.basename(target)} with {sink.rows} records")
+
+# =============================================================================
+#                          SHARDED MULTIPROCESS GENERATION
+# =============================================================================
+
+# Lookup tables and id references shared with every worker through the pool initializer
+_shared = {}
+
+def _init_worker(shared):
+    _shared.update(shared)
+    use_text_pool(shared.get("text_pool"))
+
+def _shard_sizes(n, shards):
+    return [n // shards + (i < n % shards) for i in range(shards)]
+
+def _part_name(name, shard):
+    return os.path.join("parts", f"{name}.part{shard:04d}.csv")
+
+def _write_part(name, shard, chunks):
+    for i, chunk in enumerate(c for c in chunks if c):
+        append_csv(_part_name(name, shard), chunk, header=i == 0)
+
+def _run_shard(task):
+    """Generate one shard of one table into its own part-file(s); return slim references."""
+    table, shard, n, seed, chunk_size = task
+    # Each shard has its own seed, so the output only depends on (seed, shard count)
+    seed_everything(f"{seed}:{table}:{shard}")
+    s = _shared
+    refs = []
+    if table == "nurses":
+        for i, chunk in enumerate(iter_chunks(generate_nurses, n, chunk_size, s["clinics"], s["families"], s["teams"])):
+            chunk = enrich_nurse_with_research_factors(chunk)
+            append_csv(_part_name("nurses", shard), chunk, header=i == 0)
+            rels = generate_nurse_relationships(chunk, s["interventions"])
+            for name in PER_NURSE_RELATIONSHIPS:
+                append_csv(_part_name(name, shard), rels[name], header=i == 0)
+            refs.extend(rels["nurse_team"])
+    elif table == "incidents":
+        for i, chunk in enumerate(iter_chunks(generate_incidents, n, chunk_size, s["clinics"])):
+            append_csv(_part_name("incidents", shard), chunk, header=i == 0)
+            append_csv(_part_name("incident_clinic", shard), [{"incident_id": c["incident_id"], "clinic_id": c["clinic_id"]} for c in chunk], header=i == 0)
+            refs.extend({"incident_id": c["incident_id"]} for c in chunk)
+    elif table == "misinformation_posts":
+        for i, chunk in enumerate(iter_chunks(generate_misinformation_posts, n, chunk_size)):
+            append_csv(_part_name("misinformation_posts", shard), chunk, header=i == 0)
+            refs.extend({"post_id": p["post_id"]} for p in chunk)
+    elif table == "comments":
+        for i, chunk in enumerate(iter_chunks(generate_comments, n, chunk_size, s["incident_refs"], s["nurse_refs"])):
+            append_csv(_part_name("comments", shard), chunk, header=i == 0)
+            append_csv(_part_name("comment_incident", shard), [{"comment_id": c["comment_id"], "incident_id": c["incident_id"]} for c in chunk], header=i == 0)
+    elif table == "nurse_incident":
+        _write_part(table, shard, iter_chunks(generate_nurse_incidents, n, chunk_size, s["nurse_refs"], s["incident_refs"]))
+    elif table == "nurse_post_engagement":
+        _write_part(table, shard, iter_chunks(generate_post_engagements, n, chunk_size, s["nurse_refs"], s["post_refs"]))
+    elif table == "peer_ratings":
+        # Peer ratings are sharded by team rather than by row count
+        shards = s["shards"]
+        _write_part(table, shard, iter_peer_ratings(s["nurse_refs"], s["teams"][shard::shards]))
+    return table, shard, refs
+
+def _run_phase(workers, shared, tasks):
+    """Run tasks on a fresh pool; return {table: references concatenated in shard order}."""
+    with Pool(workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        results = sorted(pool.map(_run_shard, tasks, chunksize=1), key=lambda r: (r[0], r[1]))
+    refs = {}
+    for table, _, part_refs in results:
+        refs.setdefault(table, []).extend(part_refs)
+    return refs
+
+def merge_parts(name, shards):
+    """Concatenate {name}.partNNNN.csv files in shard order into {name}.csv, keeping one header."""
+    parts = [os.path.join(OUTPUT_DIR, _part_name(name, i)) for i in range(shards)]
+    parts = [p for p in parts if os.path.exists(p)]
+    if not parts:
+        print(f"Warning: No data to write for {name}.csv")
+        return
+    with open(os.path.join(OUTPUT_DIR, f"{name}.csv"), 'w', newline='', encoding='utf-8') as out:
+        for i, part in enumerate(parts):
+            with open(part, newline='', encoding='utf-8') as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+            os.remove(part)
+    print(f"Merged {name}.csv from {len(parts)} part files")
+
+def main_sharded(num_nurses=NUM_NURSES, num_incidents=NUM_INCIDENTS, num_comments=NUM_COMMENTS,
+                 num_posts=NUM_POSTS, workers=os.cpu_count(), seed=0, chunk_size=CHUNK_SIZE):
+    """Generate the dataset across a process pool, one seeded shard per worker and table.
+
+    Phase 1 shards nurses, incidents and posts; phase 2 shards everything that
+    references them (comments, nurse_incident, engagements, peer ratings).
+    Output is byte-identical for a given seed and worker count.
+    """
+    os.makedirs(os.path.join(OUTPUT_DIR, "parts"), exist_ok=True)
+    seed_everything(f"{seed}:lookups")
+    shared = {
+        "clinics": generate_clinics(),
+        "families": generate_families(),
+        "teams": generate_teams(),
+        "interventions": generate_interventions(),
+        "shards": workers,
+        "text_pool": _text_pool,
+    }
+    write_csv("clinics.csv", shared["clinics"])
+    write_csv("families.csv", shared["families"])
+    write_csv("teams.csv", shared["teams"])
+    write_csv("interventions.csv", shared["interventions"])
+
+    def tasks(table, n):
+        return [(table, i, k, seed, chunk_size) for i, k in enumerate(_shard_sizes(n, workers))]
+
+    refs = _run_phase(workers, shared, tasks("nurses", num_nurses) + tasks("incidents", num_incidents)
+                      + tasks("misinformation_posts", num_posts))
+    shared.update(nurse_refs=refs.get("nurses", []), incident_refs=refs.get("incidents", []),
+                  post_refs=refs.get("misinformation_posts", []))
+    _run_phase(workers, shared, tasks("comments", num_comments) + tasks("nurse_incident", num_incidents)
+               + tasks("nurse_post_engagement", num_nurses // 2)
+               + [("peer_ratings", i, 0, seed, chunk_size) for i in range(workers)])
+
+    for name in ["nurses", *PER_NURSE_RELATIONSHIPS, "incidents", "incident_clinic", "misinformation_posts",
+                 "comments", "comment_incident", "nurse_incident", "nurse_post_engagement", "peer_ratings"]:
+        merge_parts(name, workers)
+    os.rmdir(os.path.join(OUTPUT_DIR, "parts"))
+
 # =============================================================================
 #                                MAIN
 # =============================================================================
 
-def main():
+def main_in_memory(num_nurses=NUM_NURSES, num_incidents=NUM_INCIDENTS, num_comments=NUM_COMMENTS, num_posts=NUM_POSTS):
     clinics = generate_clinics()
     families = generate_families()
     teams = generate_teams()
     interventions = generate_interventions()
-    nurses = generate_nurses(NUM_NURSES, clinics, families, teams)
+    nurses = generate_nurses(num_nurses, clinics, families, teams)
     nurses = enrich_nurse_with_research_factors(nurses)  # <---- NEW LINE
-    incidents = generate_incidents(NUM_INCIDENTS, clinics)
-    comments = generate_comments(NUM_COMMENTS, incidents, nurses)
+    incidents = generate_incidents(num_incidents, clinics)
+    comments = generate_comments(num_comments, incidents, nurses)
     peer_ratings = generate_peer_ratings(nurses, teams)
 
-    posts = generate_misinformation_posts()               # <---- NEW ENTITY
+    posts = generate_misinformation_posts(num_posts)      # <---- NEW ENTITY
     nurse_post_engagement = generate_nurse_post_engagement(nurses, posts)
 
     relationships = generate_relationships(nurses, incidents, comments, interventions)
@@ -295,6 +719,91 @@ def main():
     for name, rel_data in relationships.items():
         write_csv(f"{name}.csv", rel_data)
 
+
+def main_streaming(num_nurses=NUM_NURSES, num_incidents=NUM_INCIDENTS, num_comments=NUM_COMMENTS, num_posts=NUM_POSTS, chunk_size=CHUNK_SIZE):
+    """Same files as main_in_memory, but large tables are generated and appended chunk by chunk.
+
+    Only small lookup tables and slim (nurse_id, team_id) / incident_id references
+    stay in memory, so peak memory no longer grows with the number of comments.
+    """
+    clinics = generate_clinics()
+    families = generate_families()
+    teams = generate_teams()
+    interventions = generate_interventions()
+    write_csv("clinics.csv", clinics)
+    write_csv("families.csv", families)
+    write_csv("teams.csv", teams)
+    write_csv("interventions.csv", interventions)
+
+    # Nurses and the relationships that hang off a single nurse row
+    nurse_refs = []
+    for i, chunk in enumerate(iter_chunks(generate_nurses, num_nurses, chunk_size, clinics, families, teams)):
+        chunk = enrich_nurse_with_research_factors(chunk)
+        append_csv("nurses.csv", chunk, header=i == 0)
+        rels = generate_nurse_relationships(chunk, interventions)
+        for name in PER_NURSE_RELATIONSHIPS:
+            append_csv(f"{name}.csv", rels[name], header=i == 0)
+        nurse_refs.extend(rels["nurse_team"])
+    print(f"Wrote nurses.csv and {', '.join(PER_NURSE_RELATIONSHIPS)} with {len(nurse_refs)} records")
+
+    incident_refs = []
+    for i, chunk in enumerate(iter_chunks(generate_incidents, num_incidents, chunk_size, clinics)):
+        append_csv("incidents.csv", chunk, header=i == 0)
+        append_csv("incident_clinic.csv", [{"incident_id": c["incident_id"], "clinic_id": c["clinic_id"]} for c in chunk], header=i == 0)
+        incident_refs.extend({"incident_id": c["incident_id"]} for c in chunk)
+    print(f"Wrote incidents.csv and incident_clinic with {len(incident_refs)} records")
+
+    total = 0
+    for i, chunk in enumerate(iter_chunks(generate_comments, num_comments, chunk_size, incident_refs, nurse_refs)):
+        append_csv("comments.csv", chunk, header=i == 0)
+        append_csv("comment_incident.csv", [{"comment_id": c["comment_id"], "incident_id": c["incident_id"]} for c in chunk], header=i == 0)
+        total += len(chunk)
+    print(f"Wrote comments.csv and comment_incident with {total} records")
+
+    write_csv_chunks("nurse_incident.csv", iter_chunks(generate_nurse_incidents, num_incidents, chunk_size, nurse_refs, incident_refs))
+    write_csv_chunks("peer_ratings.csv", iter_peer_ratings(nurse_refs, teams))
+
+    posts = generate_misinformation_posts(num_posts)
+    write_csv("misinformation_posts.csv", posts)
+    write_csv_chunks("nurse_post_engagement.csv", iter_chunks(generate_post_engagements, len(nurse_refs) // 2, chunk_size, nurse_refs, posts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the nurse well-being knowledge graph CSVs.")
+    parser.add_argument("--nurses", type=int, default=NUM_NURSES)
+    parser.add_argument("--incidents", type=int, default=NUM_INCIDENTS)
+    parser.add_argument("--comments", type=int, default=NUM_COMMENTS)
+    parser.add_argument("--posts", type=int, default=NUM_POSTS)
+    parser.add_argument("--seed", type=int, help="seed for reproducible output (random if omitted)")
+    parser.add_argument("--stream", action="store_true", help="generate and append large tables in chunks instead of in memory")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk in --stream and --workers modes")
+    parser.add_argument("--workers", type=int, default=1, help="shard generation across N processes")
+    parser.add_argument("--text-pool", type=int, default=0, metavar="SIZE",
+                        help="sample names/sentences/companies/cities from a cached pool of SIZE pre-generated "
+                             "strings per kind (0 = exact per-row Faker calls)")
+    parser.add_argument("--format", choices=["csv", "neo4j-admin", "parquet", "arrow"], default="csv",
+                        help="neo4j-admin also writes typed node/relationship files and import.sh for offline bulk "
+                             "import; parquet/arrow also write typed, dictionary-encoded columnar copies")
+    args = parser.parse_args()
+
+    if args.text_pool:
+        use_text_pool(load_text_pool(args.text_pool, args.seed if args.seed is not None else 0))
+
+    if args.workers > 1:
+        main_sharded(args.nurses, args.incidents, args.comments, args.posts, args.workers,
+                     args.seed if args.seed is not None else 0, args.chunk_size)
+    else:
+        if args.seed is not None:
+            seed_everything(args.seed)
+        if args.stream:
+            main_streaming(args.nurses, args.incidents, args.comments, args.posts, args.chunk_size)
+        else:
+            main_in_memory(args.nurses, args.incidents, args.comments, args.posts)
+    if args.format == "neo4j-admin":
+        export_neo4j_admin()
+    elif args.format in ("parquet", "arrow"):
+        export_columnar(args.format)
+
     print(f"All enriched files generated under {OUTPUT_DIR}")
 
 
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the data generators, the loader and the GraphRAG path.
+
+Suites (each run at every --nurses size):
+    kg_generator    every generator in backend/data_generate_v2.py, in pipeline order
+    nurses_shift    every table block in simulated_data/nurses_shift.py
+    loader          validate_data over the tables, load_nurses_data.load_all into a
+                    stub Neo4j driver, then the wellbeing aggregates (CSV parsing,
+                    batching, row conversion)
+    graph_rag       graph_rag_query end to end against a stub driver (up to one row
+                    per nurse) and the stub LLM server: cold (caches cleared before
+                    every question) and warm (the same questions again)
+
+Every suite/size runs in a fresh subprocess inside a temporary directory, so
+peak RSS (ru_maxrss) belongs to that suite alone and nothing is written to the
+repository. Steps report seconds, rows/sec and the process peak RSS once the
+step has finished; graph_rag reports p50/p95/p99 latencies.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py --nurses 150 1000 --save benchmarks/baselines/local.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baselines/local.json   # exit 1 on regressions
+    python benchmarks/run_benchmarks.py --diff old.json new.json                    # compare two saved runs
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITES = ["kg_generator", "nurses_shift", "loader", "graph_rag"]
+NURSES = [150, 1000]
+SEED = 42
+QUESTIONS = 50
+REPEAT = 3             # runs per suite/size; best-of damps scheduler noise
+LLM_LATENCY = 0.01     # seconds per stub LLM call
+DB_LATENCY = 0.002     # seconds per stub Neo4j query
+THRESHOLD = 0.25       # relative slowdown / growth reported as a regression
+MIN_SECONDS = 0.05     # steps faster than this are too noisy to compare
+
+# Metric -> whether a higher value is better
+METRICS = {"rows_per_sec": True, "peak_rss_mb": False, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+GRAPH_RAG_QUESTIONS = [
+    "Which ICU nurses work the most night shifts?",
+    "How has burnout trended in the ED?",
+    "Is overtime making surgery nurses more stressed?",
+    "Which supervisors give the lowest performance scores?",
+    "Whose certifications expire in the next 60 days?",
+    "What share of Peds nurses intend to leave?",
+    "What are the most common health absences?",
+    "How is N0007 doing?",
+    "Top 5 nurses with the most evening shifts in Medical",
+    "Weekly burnout trend in Surgery",
+]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024    # KiB on Linux
+
+
+def seed(value=SEED):
+    random.seed(value)
+    np.random.seed(value)
+
+
+class Recorder:
+    """Collects one result per timed step."""
+
+    def __init__(self):
+        self.results = {}
+
+    def step(self, name, fn, *args, rows=len):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        seconds = time.perf_counter() - t0
+        n = rows(out) if callable(rows) else rows
+        self.results[name] = {"rows": n, "seconds": round(seconds, 6),
+                              "rows_per_sec": round(n / max(seconds, 1e-9), 1), "peak_rss_mb": round(peak_rss_mb(), 1)}
+        return out
+
+
+# =============================================================================
+#                                   SUITES
+# =============================================================================
+
+def bench_kg_generator(n, rec):
+    sys.path.insert(0, os.path.join(ROOT, "backend"))
+    import data_generate_v2 as g    # creates nurse_kg_data_v1/ in the (temporary) cwd
+
+    seed()
+    g.seed_everything(SEED)
+    incidents_n, comments_n = int(n * 1.4), n * 3     # the module defaults' ratios to NUM_NURSES
+    clinics = rec.step("generate_clinics", g.generate_clinics)
+    families = rec.step("generate_families", g.generate_families)
+    teams = rec.step("generate_teams", g.generate_teams)
+    interventions = rec.step("generate_interventions", g.generate_interventions)
+    nurses = rec.step("generate_nurses", g.generate_nurses, n, clinics, families, teams)
+    nurses = rec.step("enrich_nurse_with_research_factors", g.enrich_nurse_with_research_factors, nurses)
+    incidents = rec.step("generate_incidents", g.generate_incidents, incidents_n, clinics)
+    comments = rec.step("generate_comments", g.generate_comments, comments_n, incidents, nurses)
+    rec.step("generate_peer_ratings", g.generate_peer_ratings, nurses, teams)
+    posts = rec.step("generate_misinformation_posts", g.generate_misinformation_posts)
+    rec.step("generate_nurse_post_engagement", g.generate_nurse_post_engagement, nurses, posts)
+    rec.step("generate_relationships", g.generate_relationships, nurses, incidents, comments, interventions,
+             rows=lambda rels: sum(map(len, rels.values())))
+
+
+def bench_nurses_shift(n, rec):
+    sys.path.insert(0, os.path.join(ROOT, "simulated_data"))
+    import nurses_shift as ns
+
+    seed()
+    nurses = rec.step("generate_nurses", ns.generate_nurses, n)
+    shifts = rec.step("generate_shifts", ns.generate_shifts, nurses["nurse_id"])
+    feedback = rec.step("generate_nurses_feedback", ns.generate_nurses_feedback, shifts)
+    rec.step("generate_supervisors_feedback", ns.generate_supervisors_feedback, feedback)
+    for name, generate in ns.NURSE_TABLES.items():
+        rec.step(generate.__name__, generate, nurses)
+
+
+class StubResult:
+    def __init__(self, records):
+        self.records = records
+
+    def consume(self):
+        return None
+
+    def data(self):
+        return self.records
+
+
+class StubTx:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, parameters=None, **params):
+        params = {**(parameters or {}), **params}
+        self.driver.queries += 1
+        self.driver.rows += len(params.get("rows") or ())
+        if self.driver.latency:
+            time.sleep(self.driver.latency)
+        return StubResult(self.driver.records(query, params))
+
+
+class StubSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **params):
+        return StubTx(self.driver).run(query, parameters, **params)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(StubTx(self.driver), *args, **kwargs)
+
+    execute_write = execute_read
+
+    def close(self):
+        pass
+
+
+class StubDriver:
+    """Accepts every query; reads return `limit` synthetic rows, capped at max_rows."""
+
+    def __init__(self, latency=0.0, max_rows=20):
+        self.latency = latency
+        self.max_rows = max_rows
+        self.queries = 0
+        self.rows = 0
+
+    def session(self, **kwargs):
+        return StubSession(self)
+
+    def records(self, query, params):
+        if "rows" in params:
+            return []
+        units = ["ICU", "Surgery", "Medical", "ED", "Peds"]
+        return [{"nurse_id": f"N{i + 1:04d}", "unit": units[i % len(units)], "shifts": 40 + i % 17,
+                 "pct_high_stress": round(10 + (i * 7) % 30, 1), "avg_satisfaction": round(2 + (i % 9) / 4, 2)}
+                for i in range(min(int(params.get("limit") or self.max_rows), self.max_rows))]
+
+    def close(self):
+        pass
+
+
+def write_nurses_data(n, output_dir):
+    sys.path.insert(0, os.path.join(ROOT, "simulated_data"))
+    import nurses_shift as ns
+
+    seed()
+    nurses = ns.generate_nurses(n)
+    shifts = ns.generate_shifts(nurses["nurse_id"])
+    feedback = ns.generate_nurses_feedback(shifts)
+    tables = {"nurses": nurses, "shifts": shifts, "nurses_feedback": feedback,
+              "supervisors_feedback": ns.generate_supervisors_feedback(feedback)}
+    tables.update({name: generate(nurses) for name, generate in ns.NURSE_TABLES.items()})
+    os.makedirs(output_dir, exist_ok=True)
+    return ns.write_all(tables, output_dir)
+
+
+def bench_loader(n, rec):
+    sys.path.insert(0, os.path.join(ROOT, "graph_rag"))
+    import load_nurses_data
+    import validate_data
+    import wellbeing_aggregates
+
+    write_nurses_data(n, "nurses_data_v3")
+    rec.step("validate_data", validate_data.validate, "nurses_data_v3", "nurses_data_v3",
+             rows=lambda v: sum(v.rows.values()))
+    driver = StubDriver()
+    # The stub returns at once, so writer threads would only contend for the GIL and add noise
+    stats = rec.step("load_all", load_nurses_data.load_all, driver, "nurses_data_v3", load_nurses_data.BATCH_SIZE, 1,
+                     rows=lambda s: sum(r for r, _ in s.values()))
+    for name, (rows, seconds) in stats.items():
+        rec.results[f"load_all/{name}"] = {"rows": rows, "seconds": round(seconds, 6),
+                                           "rows_per_sec": round(rows / max(seconds, 1e-9), 1)}
+    rec.step("wellbeing_aggregates", wellbeing_aggregates.refresh, driver, "nurses_data_v3",
+             rows=lambda s: sum(w for w, _ in s.values()))
+
+
+def percentiles(latencies, rec, name):
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    rec.results[name] = {"questions": len(ms), "p50_ms": round(p50, 2), "p95_ms": round(p95, 2),
+                         "p99_ms": round(p99, 2), "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def bench_graph_rag(n, rec, questions=QUESTIONS, llm_latency=LLM_LATENCY, db_latency=DB_LATENCY):
+    sys.path.insert(0, os.path.join(ROOT, "graph_rag"))
+    import answer_cache
+    import llm_client
+    import neo4j_conn
+    from graph_rag import graph_rag_query
+    from llm_stub_server import start_stub_server
+
+    server, url = start_stub_server(latency=llm_latency)
+    llm_client._client = llm_client.LLMClient(url=url)
+    # One row per nurse at most, so the context builder trims bigger results at bigger sizes
+    neo4j_conn.set_driver(StubDriver(db_latency, max_rows=n))
+    cache = answer_cache.get_cache()
+    asked = [f"{GRAPH_RAG_QUESTIONS[i % len(GRAPH_RAG_QUESTIONS)]} ({i})" for i in range(questions)]
+
+    cold = []
+    for question in asked:
+        cache.clear()
+        t0 = time.perf_counter()
+        graph_rag_query(question)
+        cold.append(time.perf_counter() - t0)
+    percentiles(cold, rec, "graph_rag_query/cold")
+
+    for question in asked:
+        graph_rag_query(question)    # only the last cold question is still cached
+    warm = []
+    for question in asked:
+        t0 = time.perf_counter()
+        graph_rag_query(question)
+        warm.append(time.perf_counter() - t0)
+    percentiles(warm, rec, "graph_rag_query/warm")
+    server.shutdown()
+
+
+BENCHES = {"kg_generator": bench_kg_generator, "nurses_shift": bench_nurses_shift, "loader": bench_loader,
+           "graph_rag": bench_graph_rag}
+
+
+# =============================================================================
+#                           RUNNING, SAVING, COMPARING
+# =============================================================================
+
+def run_child(suite, n):
+    """Entry point of the per-suite subprocess: prints the results as JSON on the last line."""
+    rec = Recorder()
+    BENCHES[suite](n, rec)
+    print(json.dumps(rec.results))
+
+
+def run_suite(suite, n, repeat=REPEAT):
+    """Run one suite/size in fresh subprocesses; keep the best value of every metric."""
+    best = {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            # The answer cache defaults to the repository's .cache; keep it in the temporary directory too
+            env = {**os.environ, "GRAPH_RAG_CACHE": os.path.join(cwd, ".cache", "graph_rag_cache.sqlite")}
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", suite, str(n)], cwd=cwd,
+                                  env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"{suite} @ {n} failed:\n{proc.stderr[-2000:]}")
+        for step, values in json.loads(proc.stdout.strip().splitlines()[-1]).items():
+            kept = best.setdefault(step, values)
+            for metric, higher in METRICS.items():
+                if metric in values:
+                    kept[metric] = (max if higher else min)(kept[metric], values[metric])
+            if "seconds" in values:
+                kept["seconds"] = min(kept["seconds"], values["seconds"])
+    return {f"{suite}/{step}@{n}": values for step, values in best.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_all(suites, sizes, repeat=REPEAT):
+    results = {}
+    for suite in suites:
+        for n in sizes:
+            t0 = time.perf_counter()
+            results.update(run_suite(suite, n, repeat))
+            print(f"{suite:<13} nurses={n:<7} {time.perf_counter() - t0:7.1f}s", file=sys.stderr)
+    return {"meta": {"commit": git_commit(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                     "suites": suites, "nurses": sizes, "repeat": repeat},
+            "results": results}
+
+
+def print_results(report):
+    print(f"{'benchmark':<58}{'rows':>10}{'seconds':>10}{'rows/sec':>13}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'peak MB':>9}")
+    for name, r in report["results"].items():
+        cells = [f"{r['rows']:>10}" if "rows" in r else f"{'':>10}",
+                 f"{r['seconds']:>10.4f}" if "seconds" in r else f"{'':>10}",
+                 f"{r['rows_per_sec']:>13,.0f}" if "rows_per_sec" in r else f"{'':>13}",
+                 *(f"{r[m]:>9.2f}" if m in r else f"{'':>9}" for m in ("p50_ms", "p95_ms", "p99_ms")),
+                 f"{r['peak_rss_mb']:>9.1f}" if "peak_rss_mb" in r else f"{'':>9}"]
+        print(f"{name:<58}{''.join(cells)}")
+
+
+def compare(baseline, current, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """List of (benchmark, metric, old, new, relative change) that got worse by more than threshold."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or min(old.get("seconds", 1), new.get("seconds", 1)) < min_seconds:
+            continue
+        for metric, higher in METRICS.items():
+            if metric not in old or metric not in new or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            if (-change if higher else change) > threshold:
+                regressions.append((name, metric, old[metric], new[metric], change))
+    return regressions
+
+
+def report_regressions(baseline, current, threshold):
+    regressions = compare(baseline, current, threshold)
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('created')}): ", end="")
+    if not regressions:
+        print(f"no regressions beyond {threshold:.0%}")
+        return 0
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+    for name, metric, old, new, change in regressions:
+        print(f"  {name:<58}{metric:<14}{old:>12,.2f} -> {new:>12,.2f}  ({change:+.0%})")
+    return 1
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--nurses", type=int, nargs="+", default=NURSES)
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per suite/size; the best value is kept")
+    parser.add_argument("--save", metavar="JSON", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="baseline to check this run against")
+    parser.add_argument("--diff", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two saved runs; no benchmarking")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative change counted as a regression")
+    parser.add_argument("--child", nargs=2, metavar=("SUITE", "NURSES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+    if args.diff:
+        sys.exit(report_regressions(load_report(args.diff[0]), load_report(args.diff[1]), args.threshold))
+
+    report = run_all(args.suites, args.nurses, args.repeat)
+    print_results(report)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"\nsaved {args.save}")
+    if args.compare:
+        sys.exit(report_regressions(load_report(args.compare), report, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,13 @@
 import os
-from dotenv import load_dotenv
-from neo4j import GraphDatabase
+import sys
 import pandas as pd
 
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph_rag"))
+from neo4j_conn import read, read_df
 
-uri = os.getenv("NEO4J_URI")
-user = os.getenv("NEO4J_USERNAME")
-password = os.getenv("NEO4J_PASSWORD")
 
-driver = GraphDatabase.driver(uri, auth=(user, password))
-
-
-with driver.session() as session:
-    result = session.run("MATCH (n:Nurse) RETURN n LIMIT 5")
-    df = pd.DataFrame([record["n"] for record in result])
+# read() returns each record as a dict (record.data()), in which the node n is already its property dict
+df = pd.DataFrame([record["n"] for record in read("MATCH (n:Nurse) RETURN n LIMIT 5")])
 print(df)
 
 
@@ -25,7 +18,5 @@ MATCH (n:Nurse)
 RETURN n.nurse_id AS nurse_id, n.first_name AS first_name, n.last_name AS last_name, n.age AS age, n.full_time AS full_time
 LIMIT 10
 """
-with driver.session() as session:
-    result = session.run(query)
-    df = pd.DataFrame([record.data() for record in result])
+df = read_df(query)
 print(df)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Two-level on-disk cache for graph_rag_query (SQLite, safe to share between processes).
+
+    context  query + parameters      -> retrieved graph records
+    answers  prompt hash             -> LLM answer
+             (or, when a similarity threshold is set, the most similar earlier
+              question routed to the same template and parameters over the same
+              graph context)
+
+Both levels are bounded (least recently used rows are evicted past
+max_entries) and expire after a TTL. Every row is stamped with the current
+data_version; the loader bumps it after writing to Neo4j, which turns all
+older rows into misses. The cache file lives under the repository's .cache
+(or GRAPH_RAG_CACHE), so the loader and the query processes share it
+wherever they are started from.
+
+The semantic tier is off by default: question similarity is a hashed bag of
+words and bigrams, and two long questions that differ in one word ("highest"
+/ "lowest") still score above any useful threshold. Set
+GRAPH_RAG_SEMANTIC_CACHE=0.92 to turn it on.
+
+    python graph_rag/answer_cache.py stats     # sizes, data_version
+    python graph_rag/answer_cache.py bump      # invalidate everything cached so far
+    python graph_rag/answer_cache.py clear
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(ROOT, ".cache", "graph_rag_cache.sqlite")
+CACHE_ENV = "GRAPH_RAG_CACHE"                  # overrides CACHE_PATH
+SEMANTIC_ENV = "GRAPH_RAG_SEMANTIC_CACHE"      # similarity threshold; unset keeps the semantic tier off
+MAX_ENTRIES = 10_000      # rows per level
+CONTEXT_TTL = 3600        # seconds; graph data only changes when the loader runs
+ANSWER_TTL = 24 * 3600
+SIMILARITY = None         # minimum cosine similarity for a semantic answer hit; None disables the tier
+EMBED_DIM = 512
+STOPWORDS = frozenset("a an the is are was were be been do does did of in on at to for by with and or "
+                      "me my our we you your it its this that these those please".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS context (
+    key TEXT PRIMARY KEY, value TEXT, version INTEGER, created REAL, accessed REAL);
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY, context_key TEXT, vector BLOB, value TEXT, version INTEGER, created REAL, accessed REAL);
+CREATE INDEX IF NOT EXISTS context_accessed ON context (accessed);
+CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed);
+CREATE INDEX IF NOT EXISTS answers_context ON answers (context_key, version);
+"""
+
+
+def digest(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def embed(text, dim=EMBED_DIM):
+    """Hashed bag of words + bigrams (stopwords dropped), L2-normalized (float32)."""
+    words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        h = int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "little")
+        vector[h % dim] += 1.0 if (h >> 63) == 0 else -1.0     # signed hashing keeps collisions unbiased
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def connect(path=CACHE_PATH):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")     # the loader can bump the version while readers are active
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def cache_path():
+    return os.getenv(CACHE_ENV) or CACHE_PATH
+
+
+def bump_data_version(path=None):
+    """Invalidate every cached context and answer; called by the loader after it writes."""
+    conn = connect(path or cache_path())
+    with conn:
+        conn.execute("INSERT INTO meta VALUES ('data_version', 1) "
+                     "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+        version = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+    conn.close()
+    return version
+
+
+class AnswerCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, context_ttl=CONTEXT_TTL, answer_ttl=ANSWER_TTL,
+                 similarity=SIMILARITY):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = {"context": context_ttl, "answers": answer_ttl}
+        self.similarity = similarity
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        self.counters = {"context_hits": 0, "context_misses": 0, "answer_hits": 0, "semantic_hits": 0,
+                         "answer_misses": 0, "evictions": 0, "expired": 0}
+
+    def data_version(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else 0
+
+    def _fresh(self, table, row_version, created, version, now):
+        return row_version == version and now - created <= self.ttl[table]
+
+    def _touch(self, table, key, now):
+        self.conn.execute(f"UPDATE {table} SET accessed = ? WHERE key = ?", (now, key))
+
+    def _evict(self, table):
+        """Drop stale rows, then the least recently used ones beyond max_entries."""
+        now, version = time.time(), self.data_version()
+        expired = self.conn.execute(f"DELETE FROM {table} WHERE version != ? OR created < ?",
+                                    (version, now - self.ttl[table])).rowcount
+        excess = self.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute(f"DELETE FROM {table} WHERE key IN "
+                              f"(SELECT key FROM {table} ORDER BY accessed LIMIT ?)", (excess,))
+        self.counters["expired"] += expired
+        self.counters["evictions"] += max(excess, 0)
+
+    # Level 1: retrieved graph context
+
+    def context_key(self, query, params):
+        return digest(" ".join(query.split()), json.dumps(params, sort_keys=True, default=str))
+
+    def get_context(self, query, params):
+        key = self.context_key(query, params)
+        with self.lock, self.conn:
+            now = time.time()
+            row = self.conn.execute("SELECT value, version, created FROM context WHERE key = ?", (key,)).fetchone()
+            if row and self._fresh("context", row[1], row[2], self.data_version(), now):
+                self._touch("context", key, now)
+                self.counters["context_hits"] += 1
+                return json.loads(row[0])
+            self.counters["context_misses"] += 1
+            return None
+
+    def put_context(self, query, params, records):
+        """Store records (JSON; values JSON cannot hold, e.g. neo4j dates, are stored as strings)."""
+        key = self.context_key(query, params)
+        with self.lock, self.conn:
+            now = time.time()
+            self.conn.execute("INSERT OR REPLACE INTO context VALUES (?, ?, ?, ?, ?)",
+                              (key, json.dumps(records, default=str), self.data_version(), now, now))
+            self._evict("context")
+
+    # Level 2: LLM answers
+
+    def scope_key(self, context, route):
+        """Semantic hits are only looked for among answers with the same route (template, params) and context."""
+        return digest(json.dumps(route, sort_keys=True, default=str), context)
+
+    def get_answer(self, question, prompt, context, route=None):
+        """Exact prompt hit, else (if enabled) the closest earlier question with the same route and context."""
+        key, context_key = digest(prompt), self.scope_key(context, route)
+        with self.lock, self.conn:
+            now, version = time.time(), self.data_version()
+            row = self.conn.execute("SELECT value, version, created FROM answers WHERE key = ?", (key,)).fetchone()
+            if row and self._fresh("answers", row[1], row[2], version, now):
+                self._touch("answers", key, now)
+                self.counters["answer_hits"] += 1
+                return row[0]
+            if self.similarity is not None:
+                rows = self.conn.execute(
+                    "SELECT key, vector, value FROM answers WHERE context_key = ? AND version = ? AND created >= ?",
+                    (context_key, version, now - self.ttl["answers"])).fetchall()
+                if rows:
+                    vectors = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(len(rows), -1)
+                    sims = vectors @ embed(question, vectors.shape[1])
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.similarity:
+                        self._touch("answers", rows[best][0], now)
+                        self.counters["semantic_hits"] += 1
+                        return rows[best][2]
+            self.counters["answer_misses"] += 1
+            return None
+
+    def put_answer(self, question, prompt, context, answer, route=None):
+        with self.lock, self.conn:
+            now = time.time()
+            self.conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (digest(prompt), self.scope_key(context, route), embed(question).tobytes(), answer,
+                               self.data_version(), now, now))
+            self._evict("answers")
+
+    def stats(self):
+        with self.lock:
+            sizes = {f"{t}_rows": self.conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0]
+                     for t in ("context", "answers")}
+            return {**self.counters, **sizes, "data_version": self.data_version()}
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM context")
+            self.conn.execute("DELETE FROM answers")
+
+    def close(self):
+        self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            similarity = os.getenv(SEMANTIC_ENV)
+            _cache = AnswerCache(cache_path(), similarity=float(similarity) if similarity else SIMILARITY)
+        return _cache
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "bump":
+        print(f"data_version -> {bump_data_version()}")
+    elif command == "clear":
+        get_cache().clear()
+        print("cache cleared")
+    else:
+        print(get_cache().stats())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Batch wellbeing summaries, one short narrative per nurse.
+
+Instead of one graph_rag_query per nurse (N Cypher queries, N serial LLM
+calls), this:
+  1. fetches the context for FETCH_BATCH nurses at a time with one
+     `UNWIND $ids` query, pre-aggregated to one row per nurse;
+  2. packs up to PER_PROMPT nurses into each prompt, within the token budget,
+     as a single compact table, and asks for a JSON object {nurse_id: summary};
+  3. runs the prompts concurrently on the pooled LLM client;
+  4. appends each summary to a JSONL file as soon as it arrives. The file is
+     the checkpoint: a restarted run skips nurses that already have a line.
+
+Nurses whose summary is missing from a packed answer are retried alone once;
+anything still missing is left for the next run.
+
+Usage (from the repository root):
+    python graph_rag/batch_summaries.py --output nurse_summaries.jsonl --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+from context_builder import build_context, estimate_tokens
+from llm_client import get_client
+from neo4j_conn import read
+
+NURSES_CSV = os.path.join("nurses_data_v3", "nurses.csv")
+OUTPUT = "nurse_summaries.jsonl"
+FETCH_BATCH = 500       # nurse ids per UNWIND query
+PER_PROMPT = 8          # nurses packed into one prompt at most
+TOKEN_BUDGET = 1500     # context tokens per prompt
+CONCURRENCY = 16
+
+NURSE_CONTEXT_CYPHER = """
+UNWIND $ids AS id
+MATCH (n:Nurse {nurse_id: id})
+OPTIONAL MATCH (n)-[:WORKED]->(s:Shift)
+WITH n, count(s) AS shifts, sum(s.hours) AS hours,
+     sum(CASE WHEN s.overtime THEN 1 ELSE 0 END) AS overtime_shifts,
+     sum(CASE WHEN s.shift_type = 'Night' THEN 1 ELSE 0 END) AS night_shifts
+OPTIONAL MATCH (n)-[:WORKED]->(:Shift)-[:HAS_FEEDBACK]->(f:NurseFeedback)
+WITH n, shifts, hours, overtime_shifts, night_shifts, count(f) AS feedback,
+     round(avg(f.satisfaction), 2) AS avg_satisfaction,
+     sum(CASE WHEN f.reported_stress = 'High' THEN 1 ELSE 0 END) AS high_stress,
+     sum(CASE WHEN f.burnout_freq IN ['Weekly', 'Every day'] THEN 1 ELSE 0 END) AS frequent_burnout,
+     max(CASE WHEN f.intent_to_leave THEN 1 ELSE 0 END) = 1 AS intent_to_leave
+OPTIONAL MATCH (n)-[:HAS_HEALTH_RECORD]->(h:HealthRecord)
+WHERE h.absence_type <> 'None'
+RETURN n.nurse_id AS nurse_id, n.specialty AS specialty, n.years_licensed AS years_licensed,
+       shifts, hours, night_shifts, overtime_shifts, feedback, avg_satisfaction, high_stress,
+       frequent_burnout, intent_to_leave, count(h) AS absences, coalesce(sum(h.days_off), 0) AS days_off
+"""
+
+PROMPT = """You are writing short wellbeing notes for nurse managers.
+For every nurse in the table below write 2-3 sentences on workload, stress/burnout signals and retention risk.
+Reply with only a JSON object mapping nurse_id to its note.
+
+{context}
+"""
+SINGLE_PROMPT = """You are writing a short wellbeing note for a nurse manager.
+In 2-3 sentences, summarise this nurse's workload, stress/burnout signals and retention risk.
+
+{context}
+"""
+
+
+def load_done(path):
+    """nurse_ids that already have a summary in the output file."""
+    done = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["nurse_id"])
+                except (ValueError, KeyError):
+                    pass    # a line cut short by a crash; that nurse is simply redone
+    return done
+
+
+def fetch_contexts(ids):
+    return read(NURSE_CONTEXT_CYPHER, ids=list(ids))
+
+
+def pack(records, per_prompt=PER_PROMPT, budget=TOKEN_BUDGET):
+    """Group records greedily so each group's table stays within budget."""
+    groups, group = [], []
+    for record in records:
+        if group and (len(group) == per_prompt or estimate_tokens(build_context(group + [record], budget=10**9)) > budget):
+            groups.append(group)
+            group = []
+        group.append(record)
+    if group:
+        groups.append(group)
+    return groups
+
+
+def parse_summaries(answer, ids):
+    """{nurse_id: summary} from a JSON answer (tolerating text or code fences around the object)."""
+    match = re.search(r"\{.*\}", answer, re.S)
+    try:
+        parsed = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        return {}
+    return {i: str(parsed[i]).strip() for i in ids if isinstance(parsed, dict) and parsed.get(i)}
+
+
+class SummaryWriter:
+    """Appends one JSON line per nurse and flushes, so progress survives a crash."""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+        self.written = 0
+
+    def write(self, nurse_id, summary):
+        self.file.write(json.dumps({"nurse_id": nurse_id, "summary": summary}) + "\n")
+        self.file.flush()
+        self.written += 1
+
+    def close(self):
+        self.file.close()
+
+
+async def summarize_group(client, limit, group, writer, stats):
+    ids = [r["nurse_id"] for r in group]
+    summaries = {}
+    if len(group) > 1:
+        stats["prompts"] += 1
+        answer = await client.agenerate(PROMPT.format(context=build_context(group, budget=10**9)), limit=limit)
+        summaries = parse_summaries(answer, ids)
+    for nurse_id, summary in summaries.items():
+        writer.write(nurse_id, summary)
+    for record in group:
+        if record["nurse_id"] in summaries:
+            continue
+        # Not in the packed answer: ask for this nurse alone
+        stats["prompts"] += 1
+        stats["single_retries"] += len(group) > 1
+        summary = (await client.agenerate(SINGLE_PROMPT.format(context=build_context([record])), limit=limit)).strip()
+        if summary:
+            writer.write(record["nurse_id"], summary)
+
+
+async def run(ids, output=OUTPUT, fetch_batch=FETCH_BATCH, per_prompt=PER_PROMPT, budget=TOKEN_BUDGET,
+              concurrency=CONCURRENCY, client=None, fetch=fetch_contexts):
+    client = client or get_client()
+    limit = client.limiter(concurrency)    # this run only; the shared client keeps its own limit
+    done = load_done(output)
+    pending = [i for i in dict.fromkeys(ids) if i not in done]
+    stats = {"skipped": len(ids) - len(pending), "queries": 0, "prompts": 0, "single_retries": 0, "failed_prompts": 0}
+    writer = SummaryWriter(output)
+    try:
+        for start in range(0, len(pending), fetch_batch):
+            records = await asyncio.to_thread(fetch, pending[start:start + fetch_batch])
+            stats["queries"] += 1
+            tasks = [summarize_group(client, limit, g, writer, stats) for g in pack(records, per_prompt, budget)]
+            # A failed prompt leaves its nurses unwritten, so the next run picks them up
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                stats["failed_prompts"] += isinstance(result, Exception)
+    finally:
+        writer.close()
+    stats["written"] = writer.written
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a wellbeing summary per nurse (resumable JSONL).")
+    parser.add_argument("--nurses-csv", default=NURSES_CSV, help="CSV with a nurse_id column")
+    parser.add_argument("--ids", nargs="+", help="summarize only these nurse ids")
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--fetch-batch", type=int, default=FETCH_BATCH)
+    parser.add_argument("--per-prompt", type=int, default=PER_PROMPT)
+    parser.add_argument("--budget", type=int, default=TOKEN_BUDGET, help="context tokens per prompt")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+
+    ids = args.ids or pd.read_csv(args.nurses_csv, usecols=["nurse_id"])["nurse_id"].tolist()
+    t0 = time.perf_counter()
+    stats = asyncio.run(run(ids, args.output, args.fetch_batch, args.per_prompt, args.budget, args.concurrency))
+    print(f"{stats} in {time.perf_counter() - t0:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
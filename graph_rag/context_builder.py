@@ -0,0 +1,98 @@
+"""
+Compact, token-budgeted graph context for GraphRAG prompts.
+
+Neo4j records are rendered as one pipe-separated table instead of a dict
+repr per row, so column names are written once:
+
+    unit=ICU
+    month | responses | pct_frequent_burnout | pct_drained
+    2025-10-01 | 212 | 61.3 | 50.9
+    ...
+    (showing 40 of 120 rows; all rows: responses 180..240 mean 205, ...)
+
+Columns with the same value in every row are hoisted into the first line.
+Rows are ranked by how many question words they contain (ties keep the
+query's ORDER BY), and then cut to the token budget. Whatever is cut is
+still represented by the min/max/mean line, so large results stay useful.
+Token counts are estimated at ~4 characters per token; no tokenizer needed.
+"""
+
+import json
+import math
+import re
+
+TOKEN_BUDGET = 1500
+CHARS_PER_TOKEN = 4
+EMPTY = "(no matching graph data)"
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def fmt(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return str(value)
+
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def summarize(records, columns):
+    """min..max and mean of each numeric column over all records."""
+    parts = []
+    for c in columns:
+        values = [r[c] for r in records if _is_number(r.get(c))]
+        if values:
+            parts.append(f"{c} {fmt(min(values))}..{fmt(max(values))} mean {fmt(sum(values) / len(values))}")
+    return ", ".join(parts)
+
+
+def build_context(records, question="", budget=TOKEN_BUDGET):
+    """Render records as a compact table that fits within about `budget` tokens."""
+    if not records:
+        return EMPTY
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    first = records[0]
+    shared = [c for c in columns if len(records) > 1 and all(r.get(c) == first.get(c) for r in records)]
+    varying = [c for c in columns if c not in shared]
+
+    head = []
+    if shared:
+        head.append("; ".join(f"{c}={fmt(first.get(c))}" for c in shared))
+    if varying:
+        head.append(" | ".join(varying))
+    rows = [" | ".join(fmt(r.get(c)) for c in varying) for r in records] if varying else []
+
+    # Most relevant rows first; sorted() is stable, so ties keep the Cypher ORDER BY
+    terms = _words(question)
+    order = sorted(range(len(rows)), key=lambda i: -len(terms & _words(rows[i]))) if terms else range(len(rows))
+
+    summary = summarize(records, varying)
+    reserve = estimate_tokens(f"(showing {len(rows)} of {len(rows)} rows; all rows: {summary})")
+    used = sum(estimate_tokens(line) + 1 for line in head)
+    kept = []
+    for i in order:
+        cost = estimate_tokens(rows[i]) + 1
+        if used + cost > budget - reserve:
+            break
+        kept.append(i)
+        used += cost
+
+    lines = head + [rows[i] for i in sorted(kept)]
+    if len(kept) < len(rows):
+        omitted = f"(showing {len(kept)} of {len(rows)} rows"
+        lines.append(f"{omitted}; all rows: {summary})" if summary else f"{omitted})")
+    return "\n".join(lines)
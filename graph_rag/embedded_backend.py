@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+In-process query backend over the nurses_data_v3 tables; no Neo4j server needed.
+
+Every query_router template has a pandas equivalent here that returns the
+same columns the Cypher returns, so graph_rag_query can answer from the CSVs
+directly (GRAPH_RAG_BACKEND=embedded) and analytics / tests can skip the
+database:
+
+    from embedded_backend import get_backend
+    db = get_backend()
+    db.run("shifts_by_type", shift_type="Night", unit="ICU", limit=5)    # list of dicts
+    db.table("shifts")                                                     # typed DataFrame
+
+Tables are read the way the loader sends them to Neo4j: the same feedback
+columns, dates parsed, duplicate keys collapsed like MERGE does. Low-cardinality
+text columns become categoricals. The typed frames are pickled under
+.cache/embedded and reused until the source file changes, so later processes
+start in milliseconds. Weekly and per-nurse figures come from
+wellbeing_aggregates.compute_aggregates, as they do in the graph.
+
+    python graph_rag/embedded_backend.py "Which ICU nurses work the most night shifts?"
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from load_nurses_data import NURSE_FEEDBACK_COLUMNS, SUPERVISOR_FEEDBACK_COLUMNS
+from query_router import TEMPLATES
+from wellbeing_aggregates import compute_aggregates
+
+DATA_DIR = "nurses_data_v3"
+CACHE_DIR = os.path.join(".cache", "embedded")
+CATEGORY_MAX = 64    # text columns with at most this many distinct values become categoricals
+FRAME_VERSION = 2    # bump when _read changes so stale pickles are rebuilt
+
+# table -> (columns to read or None for all, date columns, key MERGEd on in the graph)
+TABLES = {
+    "nurses": (None, ["hire_date"], "nurse_id"),
+    "shifts": (None, ["date"], "shift_id"),
+    "nurses_feedback": (NURSE_FEEDBACK_COLUMNS, [], "feedback_id"),
+    "supervisors_feedback": (SUPERVISOR_FEEDBACK_COLUMNS, [], "feedback_id"),
+    "health": (None, ["date", "return_date"], "record_id"),
+    "training": (None, ["date", "cert_expiry"], "training_id"),
+}
+
+
+def _pct(part, whole):
+    return (100.0 * part / whole).round(1)
+
+
+def to_records(df):
+    """DataFrame -> list of plain dicts, like neo4j_conn.read (NaN becomes None)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+class EmbeddedBackend:
+    def __init__(self, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._aggregates = None
+        self._lock = threading.RLock()
+
+    # ---- typed, cached loading -------------------------------------------------------------
+
+    def _source(self, name):
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.data_dir, name + ext)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"No {name}.csv or {name}.parquet in {self.data_dir}")
+
+    def _read(self, path, name):
+        columns, dates, key = TABLES[name]
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path, columns=columns)
+            df[dates] = df[dates].apply(pd.to_datetime)
+        else:
+            # Same parsing as the loader: only empty cells are missing ('None' is an absence type)
+            df = pd.read_csv(path, usecols=columns, parse_dates=dates, keep_default_na=False, na_values=[""],
+                             dtype={"nurse_id": str, "shift_id": str})
+        for column in df.select_dtypes(include=["object", "string"]).columns:    # pandas 3 reads text as str
+            if not column.endswith("_id") and df[column].nunique() <= CATEGORY_MAX:
+                df[column] = df[column].astype("category")
+        return df.drop_duplicates(key, keep="last", ignore_index=True)    # MERGE keeps one node per key
+
+    def table(self, name):
+        """Typed DataFrame for one table, from memory, the pickle cache or the source file."""
+        with self._lock:
+            if name in self._tables:
+                return self._tables[name]
+            path = self._source(name)
+            stat = os.stat(path)
+            signature = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, FRAME_VERSION)
+            cached = os.path.join(self.cache_dir, hashlib.sha1(repr(signature[0]).encode()).hexdigest()[:16] + ".pkl")
+            df = None
+            if os.path.exists(cached):
+                with open(cached, "rb") as f:
+                    saved_signature, saved = pickle.load(f)
+                df = saved if saved_signature == signature else None
+            if df is None:
+                df = self._read(path, name)
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cached + ".tmp", "wb") as f:
+                    pickle.dump((signature, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(cached + ".tmp", cached)
+            self._tables[name] = df
+            return df
+
+    def aggregates(self):
+        with self._lock:
+            if self._aggregates is None:
+                self._aggregates = compute_aggregates(self.table("shifts"), self.table("nurses_feedback"),
+                                                      self.table("supervisors_feedback"))
+            return self._aggregates
+
+    def reload(self):
+        """Forget the in-memory tables, e.g. after the CSVs were regenerated or appended to."""
+        with self._lock:
+            self._tables.clear()
+            self._aggregates = None
+
+    def _feedback_on_shifts(self, feedback="nurses_feedback", columns=("nurse_id", "unit", "overtime")):
+        shifts = self.table("shifts")[["shift_id", *columns]]
+        return self.table(feedback).merge(shifts, on="shift_id", how="inner")    # (:Shift)-[:HAS_FEEDBACK]->
+
+    # ---- one method per query_router template ----------------------------------------------
+
+    def shifts_by_type(self, shift_type="Night", unit=None, limit=10):
+        s = self.table("shifts")
+        mask = s["shift_type"] == shift_type
+        if unit is not None:
+            mask &= s["unit"] == unit
+        counts = s[mask].groupby("nurse_id").agg(shifts=("shift_id", "size"), hours=("hours", "sum")).reset_index()
+        out = counts.merge(self.table("nurses")[["nurse_id", "first_name", "last_name"]], on="nurse_id")
+        out = out.sort_values(["shifts", "nurse_id"], ascending=[False, True]).head(limit)
+        return out[["nurse_id", "first_name", "last_name", "shifts", "hours"]]
+
+    def burnout_trend(self, unit=None):
+        w = self.aggregates()["unit_week"]
+        if unit is not None:
+            w = w[w["unit"] == unit]
+        columns = ["unit", "week", "responses", "pct_frequent_burnout", "pct_frequent_burnout_4w", "pct_drained"]
+        return w[columns].astype({"unit": str}).sort_values(["unit", "week"])
+
+    def overtime_stress(self, unit=None):
+        f = self._feedback_on_shifts()
+        if unit is not None:
+            f = f[f["unit"] == unit]
+        out = f.assign(high=f["reported_stress"] == "High", severe=f["reported_fatigue"] == "Severe").groupby(
+            "overtime").agg(responses=("feedback_id", "size"), high=("high", "sum"), severe=("severe", "sum"),
+                            avg_satisfaction=("satisfaction", "mean")).reset_index()
+        out["pct_high_stress"] = _pct(out.pop("high"), out["responses"])
+        out["pct_severe_fatigue"] = _pct(out.pop("severe"), out["responses"])
+        out["avg_satisfaction"] = out["avg_satisfaction"].round(2)
+        return out[["overtime", "responses", "pct_high_stress", "pct_severe_fatigue", "avg_satisfaction"]]
+
+    def supervisor_scores(self, supervisor_id=None, unit=None, limit=20):
+        r = self._feedback_on_shifts("supervisors_feedback", ("unit",))
+        if supervisor_id is not None:
+            r = r[r["supervisor_id"] == supervisor_id]
+        if unit is not None:
+            r = r[r["unit"] == unit]
+        out = r.assign(high=r["teamwork"] == "High").groupby("supervisor_id", observed=True).agg(
+            reviews=("feedback_id", "size"), avg_performance=("performance_score", "mean"),
+            high=("high", "sum")).reset_index()
+        out["avg_performance"] = out["avg_performance"].round(2)
+        out["pct_high_teamwork"] = _pct(out.pop("high"), out["reviews"])
+        out["supervisor_id"] = out["supervisor_id"].astype(str)
+        return out.sort_values(["avg_performance", "supervisor_id"], ascending=[False, True]).head(limit)
+
+    def training_expiry(self, days=90, module=None, limit=25):
+        t = self.table("training")
+        today = pd.Timestamp.today().normalize()
+        mask = (t["cert_expiry"] >= today) & (t["cert_expiry"] <= today + pd.Timedelta(days=days))
+        if module is not None:
+            mask &= t["module"] == module
+        out = t[mask].merge(self.table("nurses")[["nurse_id", "first_name", "last_name"]], on="nurse_id")
+        out = out.sort_values(["cert_expiry", "nurse_id"]).head(limit)
+        return out.assign(module=out["module"].astype(str), cert_expiry=out["cert_expiry"].dt.strftime("%Y-%m-%d"))[
+            ["nurse_id", "first_name", "last_name", "module", "cert_expiry"]]
+
+    def intent_to_leave(self, unit=None):
+        f = self._feedback_on_shifts()
+        if unit is not None:
+            f = f[f["unit"] == unit]
+        per_nurse = f.groupby(["unit", "nurse_id"], observed=True)["intent_to_leave"].any().reset_index()
+        out = per_nurse.groupby("unit", observed=True).agg(nurses=("nurse_id", "size"),
+                                                          intending_to_leave=("intent_to_leave", "sum")).reset_index()
+        out["pct_intending_to_leave"] = _pct(out["intending_to_leave"], out["nurses"])
+        out["unit"] = out["unit"].astype(str)
+        return out.sort_values("pct_intending_to_leave", ascending=False, kind="stable")
+
+    def health_absences(self, limit=20):
+        h = self.table("health")
+        h = h[h["absence_type"] != "None"]
+        out = h.groupby(["absence_type", "health_status"], observed=True).agg(
+            records=("record_id", "size"), days_off=("days_off", "sum")).reset_index()
+        out = out.astype({"absence_type": str, "health_status": str})
+        return out.sort_values("days_off", ascending=False, kind="stable").head(limit)
+
+    def nurse_profile(self, nurse_id=None):
+        nurses = self.table("nurses")
+        n = nurses[nurses["nurse_id"] == nurse_id][["nurse_id", "first_name", "last_name", "specialty",
+                                                    "years_licensed"]]
+        out = n.merge(self.aggregates()["nurse"], on="nurse_id", how="left").astype({"specialty": str})
+        out = out.rename(columns={"shift_count": "shifts", "feedback_count": "feedback"})
+        return out[["nurse_id", "first_name", "last_name", "specialty", "years_licensed", "shifts", "avg_acuity",
+                    "overtime_share", "night_share", "feedback", "avg_satisfaction", "pct_high_stress",
+                    "pct_frequent_burnout", "reported_intent_to_leave", "avg_performance"]]
+
+    def run(self, template, **params):
+        """Records for one query_router template; missing parameters take the template defaults."""
+        if template not in TEMPLATES:
+            raise KeyError(f"Unknown template {template!r}")
+        return to_records(getattr(self, template)(**{**TEMPLATES[template]["params"], **params}))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = EmbeddedBackend(os.getenv("GRAPH_RAG_DATA_DIR", DATA_DIR))
+        return _backend
+
+
+def retrieve(route):
+    """Embedded counterpart of query_router.retrieve."""
+    return get_backend().run(route.name, **route.params)
+
+
+def main():
+    from query_router import route_question
+
+    parser = argparse.ArgumentParser(description="Answer routed questions from the CSVs, without Neo4j.")
+    parser.add_argument("questions", nargs="+")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    global _backend
+    t0 = time.perf_counter()
+    _backend = EmbeddedBackend(args.data_dir)
+    for name in TABLES:
+        _backend.table(name)
+    print(f"tables ready in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        for question in args.questions:
+            route = route_question(question)
+            t0 = time.perf_counter()
+            records = retrieve(route)
+            print(f"\n{question!r} -> {route.name} {route.params}: {len(records)} rows in "
+                  f"{(time.perf_counter() - t0) * 1000:.1f}ms")
+            print(pd.DataFrame(records).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
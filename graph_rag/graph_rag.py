@@ -1,63 +1,123 @@
-from neo4j import GraphDatabase
-import requests  # or Google's official SDK for Gemini
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
-import pandas as pd
+
+from answer_cache import get_cache
+from context_builder import build_context
+from llm_client import get_client
+from neo4j_conn import astream_records, read
+from query_router import route_question
+from tracing import get_tracer, span, trace
 
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-uri = os.getenv("NEO4J_URI")
-user = os.getenv("NEO4J_USERNAME")
-password = os.getenv("NEO4J_PASSWORD")
+# "neo4j", or "embedded" to answer from the nurses_data_v3 files in-process (embedded_backend.py)
+BACKEND = os.getenv("GRAPH_RAG_BACKEND", "neo4j")
 
 
-driver = GraphDatabase.driver(uri, auth=(user, password))
+# Gemini API call placeholder (endpoint: GEMINI_API_URL); pooled session, timeouts and retries live in llm_client
+def gemini_generate(prompt):
+    with span("gemini_generate", prompt_chars=len(prompt)) as s:
+        answer = get_client().generate(prompt)
+        s.set(response_chars=len(answer))
+    return answer
 
 
-# Gemini API call placeholder
-def gemini_generate(prompt):
-    url = "https://your-realm-specific-gemini-api-url"
-    headers = {"Authorization": f"Bearer {GEMINI_API_KEY}"}
-    payload = {
-        "model": "gemini-2.0-flash-exp",
-        "prompt": prompt,
-        "max_tokens": 500,
-        "temperature": 0.7
-    }
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
-
-
-
-def graph_rag_query(user_question):
-    # Translate user question to Cypher or select Cypher query template
-    cypher_query = """
-    MATCH (n:Nurse)-[:WORKED]->(s:Shift)
-    WHERE s.shift_type = 'Night'
-    RETURN n.first_name, n.last_name, s.date, s.hours LIMIT 10
-    """
-    with driver.session() as session:
-        result = session.run(cypher_query)
-        graph_context = "\n".join(str(record.data()) for record in result)
-
-    # Build prompt for Gemini
-    prompt = f"Graph data:\n{graph_context}\nQuestion: {user_question}\nAnswer:"
-    answer = gemini_generate(prompt)
+
+def embedded_records(route):
+    # Read straight from the files, so there is no context cache to go stale
+    from embedded_backend import retrieve
+    with span("embedded.retrieve", template=route.name) as s:
+        records = retrieve(route)
+        s.set(rows=len(records))
+    return records
+
+
+def graph_rag_query(user_question, backend=None):
+    with trace("graph_rag_query", question_chars=len(user_question)) as root:
+        # Pick a parameterized Cypher template for the question (keyword routing, no LLM call)
+        with span("route") as s:
+            route = route_question(user_question)
+            s.set(template=route.name)
+        cache = get_cache()
+        if (backend or BACKEND) == "embedded":
+            records = embedded_records(route)
+        else:
+            with span("context_cache") as s:
+                records = cache.get_context(route.cypher, route.params)
+                s.set(hit=records is not None)
+            if records is None:
+                records = read(route.cypher, **route.params)
+                cache.put_context(route.cypher, route.params, records)
+        with span("build_context", rows=len(records)) as s:
+            graph_context = build_context(records, user_question)
+            s.set(context_chars=len(graph_context))
+
+        # Build prompt for Gemini; repeated questions over the same data reuse the answer
+        prompt = f"Graph data ({route.description}):\n{graph_context}\nQuestion: {user_question}\nAnswer:"
+        with span("answer_cache") as s:
+            answer = cache.get_answer(user_question, prompt, graph_context, (route.name, route.params))
+            s.set(hit=answer is not None)
+        if answer is None:
+            answer = gemini_generate(prompt)
+            cache.put_answer(user_question, prompt, graph_context, answer, (route.name, route.params))
+        root.set(template=route.name, rows=len(records), prompt_chars=len(prompt), response_chars=len(answer))
     return answer
 
-def format_result_as_text(records):
-    lines = []
-    for r in records:
-        nurse = r.get("n.first_name", "") + " " + r.get("n.last_name", "")
-        date = r.get("s.date", "")
-        hours = r.get("s.hours", "")
-        lines.append(f"Nurse {nurse} worked a shift on {date} lasting {hours} hours.")
-    return "\n".join(lines)
+async def graph_rag_stream(user_question, backend=None):
+    """Streaming graph_rag_query: async generator of answer pieces as the model produces them."""
+    # Spans are opened and ended by hand and only made current around blocks without a yield:
+    # a span left current across a yield would leak into the consumer's context
+    root = get_tracer().start("graph_rag_stream", question_chars=len(user_question))
+    error = None
+    try:
+        with root.activate():
+            route = route_question(user_question)
+            cache = get_cache()
+            embedded = (backend or BACKEND) == "embedded"
+            records = await asyncio.to_thread(embedded_records, route) if embedded else \
+                cache.get_context(route.cypher, route.params)
+            root.set(template=route.name, context_hit=records is not None and not embedded)
+            if records is None:
+                with span("neo4j.stream", template=route.name) as s:
+                    records = [record async for record in astream_records(route.cypher, **route.params)]
+                    s.set(rows=len(records))
+                cache.put_context(route.cypher, route.params, records)
+            with span("build_context", rows=len(records)) as s:
+                graph_context = build_context(records, user_question)
+                s.set(context_chars=len(graph_context))
+
+            prompt = f"Graph data ({route.description}):\n{graph_context}\nQuestion: {user_question}\nAnswer:"
+            answer = cache.get_answer(user_question, prompt, graph_context, (route.name, route.params))
+            root.set(prompt_chars=len(prompt), answer_hit=answer is not None)
+        if answer is not None:
+            yield answer
+            return
+        pieces = []
+        s = root.child("gemini_stream", prompt_chars=len(prompt))
+        try:
+            t0 = time.perf_counter()
+            async for piece in get_client().astream(prompt):
+                if not pieces:
+                    s.set(first_token_ms=round((time.perf_counter() - t0) * 1000, 3))
+                pieces.append(piece)
+                yield piece
+        finally:
+            s.set(pieces=len(pieces), response_chars=sum(map(len, pieces)))
+            s.end()
+        cache.put_answer(user_question, prompt, graph_context, "".join(pieces), (route.name, route.params))
+    except GeneratorExit:
+        root.set(stopped_early=True)    # the consumer stopped reading; not an error
+        raise
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        root.end(error)
 
 
 # Example Usage
-user_query = "Who worked night shifts recently?"
-print(format_result_as_text(graph_rag_query(user_query)))
+if __name__ == "__main__":
+    user_query = "Who worked night shifts recently?"
+    print(graph_rag_query(user_query))
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Pooled Gemini client used by graph_rag.gemini_generate.
+
+One requests.Session with a keep-alive connection pool is shared by every
+call, so consecutive prompts reuse the same TLS connection. Requests have a
+timeout and are retried with exponential backoff on 429 / 5xx / connection
+errors (a Retry-After header wins over the computed delay).
+
+The asyncio API runs the blocking calls on the client's own thread pool,
+bounded by a semaphore, so many prompts can be in flight at once:
+
+    client = get_client()
+    answer = client.generate("Summarise ...")
+    answers = client.generate_many(prompts, concurrency=32)
+    answers = await client.agenerate_many(prompts)
+    async for piece in client.astream(prompt): ...      # server-sent events, token by token
+
+Try it against the local stub (no API key needed):
+    python graph_rag/llm_client.py --stub --prompts 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from tracing import annotate
+
+GEMINI_URL = "https://your-realm-specific-gemini-api-url"
+MODEL = "gemini-2.0-flash-exp"
+MAX_TOKENS = 500
+TEMPERATURE = 0.7
+
+POOL_SIZE = 32           # keep-alive connections per host
+CONCURRENCY = 16         # prompts in flight for the async / *_many API
+TIMEOUT = (5, 60)        # (connect, read) seconds
+MAX_RETRIES = 5
+BACKOFF = 0.5            # first retry delay in seconds, doubled per attempt
+MAX_BACKOFF = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(RuntimeError):
+    """Raised when a prompt still fails after all retries."""
+
+
+def retry_after(response):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    def __init__(self, url=None, api_key=None, model=MODEL, pool_size=POOL_SIZE, concurrency=CONCURRENCY,
+                 timeout=TIMEOUT, max_retries=MAX_RETRIES, backoff=BACKOFF):
+        load_dotenv()
+        self.url = url or os.getenv("GEMINI_API_URL") or GEMINI_URL
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.concurrency = concurrency
+
+        self.session = requests.Session()
+        # Retries are handled in _post so Retry-After and the response body are visible there
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        # asyncio.to_thread would share the loop's default executor (min(32, cpus + 4) threads),
+        # which caps concurrency on small machines; a dedicated pool matches the HTTP pool instead
+        self._executor = ThreadPoolExecutor(max_workers=max(pool_size, concurrency), thread_name_prefix="llm")
+        self._semaphores = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _delay(self, attempt, response=None):
+        wait = retry_after(response)
+        if wait is None:
+            wait = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)   # jitter spreads out retry bursts
+        return min(wait, MAX_BACKOFF)
+
+    def _post(self, payload, stream=False):
+        """POST with retries; returns the parsed JSON, or the open response when streaming."""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            self._count("requests")
+            annotate(attempts=attempt + 1)    # on the caller's gemini_generate span, when traced
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response if stream else response.json()
+                response.close()
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            if attempt == self.max_retries:
+                break
+            self._count("retries")
+            time.sleep(self._delay(attempt, response))
+        self._count("failures")
+        raise LLMError(f"LLM request failed after {self.max_retries + 1} attempts: {error}")
+
+    def payload(self, prompt, max_tokens=MAX_TOKENS, temperature=TEMPERATURE):
+        return {"model": self.model, "prompt": prompt, "max_tokens": max_tokens, "temperature": temperature}
+
+    def generate(self, prompt, **params):
+        """Blocking call: prompt -> answer text."""
+        return self._post(self.payload(prompt, **params))["choices"][0]["message"]["content"]
+
+    def stream(self, prompt, **params):
+        """Yield answer text pieces as server-sent events arrive.
+
+        Retries only cover opening the stream; once tokens have been yielded a
+        failure is raised to the caller rather than replaying the answer.
+        """
+        payload = dict(self.payload(prompt, **params), stream=True)
+        with self._post(payload, stream=True) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                piece = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if piece:
+                    yield piece
+
+    def _semaphore(self):
+        # Semaphores belong to one event loop; keep one per loop so asyncio.run() can be called repeatedly
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.concurrency)}
+        return self._semaphores[loop]
+
+    async def _agenerate(self, limit, prompt, params):
+        async with limit:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: self.generate(prompt, **params))
+
+    def limiter(self, concurrency=None):
+        """Semaphore for a batch of agenerate calls: a new one allowing `concurrency`, or the client's own."""
+        return asyncio.Semaphore(concurrency) if concurrency else self._semaphore()
+
+    async def agenerate(self, prompt, limit=None, **params):
+        """Answer one prompt; `limit` (from limiter()) bounds a batch of calls instead of the client's limit."""
+        return await self._agenerate(limit or self._semaphore(), prompt, params)
+
+    async def astream(self, prompt, **params):
+        """Async generator over stream(): the blocking reader runs on the client's thread pool."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()    # set when the consumer stops early, so the reader drops the connection
+
+        def pump():
+            try:
+                for piece in self.stream(prompt, **params):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, piece)
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except Exception as exc:
+                loop.call_soon_threadsafe(queue.put_nowait, exc)
+
+        async with self._semaphore():
+            reader = loop.run_in_executor(self._executor, pump)
+            try:
+                while (item := await queue.get()) is not done:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+            await reader
+
+    async def agenerate_many(self, prompts, return_exceptions=False, concurrency=None, **params):
+        """Answer every prompt concurrently (at most `concurrency` at a time), in input order.
+
+        A concurrency given here limits this call only; the client's own limit is left alone.
+        """
+        limit = self.limiter(concurrency)
+        return await asyncio.gather(*(self._agenerate(limit, p, params) for p in prompts),
+                                    return_exceptions=return_exceptions)
+
+    def generate_many(self, prompts, concurrency=None, return_exceptions=False, **params):
+        """Synchronous wrapper around agenerate_many for scripts without an event loop."""
+        return asyncio.run(self.agenerate_many(prompts, return_exceptions, concurrency, **params))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client, created on first use so the connection pool is shared."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput check for the pooled LLM client.")
+    parser.add_argument("--url", help="endpoint (default: GEMINI_API_URL or the stub with --stub)")
+    parser.add_argument("--stub", action="store_true", help="start llm_stub_server in-process and use it")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub response latency in seconds")
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--stream", action="store_true", help="also measure time to first streamed token")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.stub:
+        from llm_stub_server import start_stub_server
+        server, url = start_stub_server(latency=args.latency)
+
+    prompts = [f"Question {i}: how is nurse N{i:04d} doing?" for i in range(args.prompts)]
+    with LLMClient(url=url, concurrency=args.concurrency) as client:
+        t0 = time.perf_counter()
+        client.generate(prompts[0])
+        single = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        client.generate_many(prompts)
+        elapsed = time.perf_counter() - t0
+        print(f"1 prompt: {single:.3f}s | {len(prompts)} prompts at concurrency {args.concurrency}: "
+              f"{elapsed:.2f}s ({len(prompts) / elapsed:,.1f} prompts/sec) | stats {client.stats}")
+        if args.stream:
+            t0 = time.perf_counter()
+            pieces = iter(client.stream(prompts[0]))
+            next(pieces)
+            first = time.perf_counter() - t0
+            rest = sum(1 for _ in pieces) + 1
+            print(f"stream: first token after {first:.3f}s, {rest} pieces in {time.perf_counter() - t0:.3f}s")
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini endpoint, for exercising llm_client without an API key.
+
+Answers POSTs with the same JSON shape gemini_generate reads
+({"choices": [{"message": {"content": ...}}]}) after a configurable latency,
+and can inject 429 / 503 responses to exercise the retry path. Requests with
+"stream": true get the answer as server-sent events, one word per event
+({"choices": [{"delta": {"content": ...}}]}, then "data: [DONE]").
+
+    python graph_rag/llm_stub_server.py --port 8765 --latency 0.2 --fail-every 10
+    GEMINI_API_URL=http://127.0.0.1:8765 python graph_rag/graph_rag.py
+
+or in-process:
+    server, url = start_stub_server(latency=0.05)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive, so the client's pooled connections are reused
+    disable_nagle_algorithm = True   # headers and body go out in separate writes; avoid the 40ms delayed-ACK stall
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        n = next(server.counter)
+        time.sleep(server.latency)
+        if server.fail_every and n % server.fail_every == server.fail_every - 1:
+            # Alternate rate limiting (with Retry-After) and a transient server error
+            if (n // server.fail_every) % 2 == 0:
+                return self._send(429, {"error": "rate limited"}, [("Retry-After", str(server.retry_after))])
+            return self._send(503, {"error": "unavailable"})
+        prompt = payload.get("prompt", "")
+        content = f"[stub answer #{n}] {prompt[-80:]}"
+        if payload.get("stream"):
+            return self._stream(content)
+        self._send(200, {"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    def _stream(self, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = content.split(" ")
+        events = [{"choices": [{"delta": {"content": w if i == 0 else " " + w}}]} for i, w in enumerate(words)]
+        for i, event in enumerate(events + [None]):
+            if i:
+                time.sleep(self.server.token_latency)
+            data = f"data: {json.dumps(event) if event else '[DONE]'}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream (or closing idle keep-alive connections) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.05, fail_every=0, retry_after=0, token_latency=0.02):
+    """Serve on a background thread; port=0 picks a free port. Returns (server, url).
+
+    latency is the delay before the first byte; token_latency the gap between streamed words.
+    """
+    server = StubServer((host, port), StubHandler)
+    server.latency, server.fail_every, server.retry_after = latency, fail_every, retry_after
+    server.token_latency = token_latency
+    server.counter = itertools.count()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Gemini endpoint for local testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response")
+    parser.add_argument("--fail-every", type=int, default=0, help="fail every Nth request with 429/503 (0: never)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds between streamed words")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.host, args.port, args.latency, args.fail_every, args.retry_after,
+                                    args.token_latency)
+    print(f"Stub LLM listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
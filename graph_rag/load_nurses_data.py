@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Batched loader for the nurses_data_v3 CSVs into Neo4j.
+
+Reads every table in chunks and pushes rows with parameterized
+`UNWIND $rows` statements inside explicit write transactions, after
+creating the uniqueness constraints the MERGEs rely on.
+
+Graph model:
+    (:Nurse)-[:WORKED]->(:Shift)-[:HAS_FEEDBACK]->(:NurseFeedback)
+    (:Supervisor)-[:REVIEWED {performance_score, ...}]->(:Shift)
+    (:Nurse)-[:HAS_HEALTH_RECORD]->(:HealthRecord)
+    (:Nurse)-[:TOOK_TRAINING]->(:Training)
+    pay, telehealth and practice_multistate columns are set on :Nurse.
+
+Before anything is written the tables are checked for duplicate keys,
+dangling references and inconsistent dates (see validate_data.py); key and
+reference errors stop the load unless --no-validate is given.
+
+After a load the precomputed wellbeing aggregates are refreshed (see
+wellbeing_aggregates.py; --no-aggregates skips it) and the graph_rag answer
+cache's data_version is bumped, so cached answers about the previous data
+are not served.
+
+Usage (from the repository root):
+    python graph_rag/load_nurses_data.py --batch-size 5000 --workers 4
+    python graph_rag/load_nurses_data.py --data-dir nurses_data_v3/deltas/2026-01-07 --aggregates-dir nurses_data_v3
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from answer_cache import bump_data_version
+from neo4j_conn import close_driver, get_driver, session
+from validate_data import format_report, validate
+
+DATA_DIR = "nurses_data_v3"
+BATCH_SIZE = 5000
+WORKERS = 4
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT nurse_id IF NOT EXISTS FOR (n:Nurse) REQUIRE n.nurse_id IS UNIQUE",
+    "CREATE CONSTRAINT shift_id IF NOT EXISTS FOR (s:Shift) REQUIRE s.shift_id IS UNIQUE",
+    "CREATE CONSTRAINT nurse_feedback_id IF NOT EXISTS FOR (f:NurseFeedback) REQUIRE f.feedback_id IS UNIQUE",
+    "CREATE CONSTRAINT supervisor_id IF NOT EXISTS FOR (s:Supervisor) REQUIRE s.supervisor_id IS UNIQUE",
+    "CREATE CONSTRAINT health_record_id IF NOT EXISTS FOR (h:HealthRecord) REQUIRE h.record_id IS UNIQUE",
+    "CREATE CONSTRAINT training_id IF NOT EXISTS FOR (t:Training) REQUIRE t.training_id IS UNIQUE",
+]
+
+NURSE_FEEDBACK_COLUMNS = ['feedback_id', 'shift_id', 'reported_stress', 'reported_fatigue', 'burnout_freq',
+                          'emotionally_drained', 'used_up', 'workload_change', 'intent_to_leave',
+                          'satisfaction', 'comments']
+SUPERVISOR_FEEDBACK_COLUMNS = ['feedback_id', 'shift_id', 'supervisor_id', 'performance_score', 'reliability',
+                               'teamwork', 'clinical_decision', 'remarks']
+
+# Load order matters: nodes before the relationships that MATCH them.
+# Each entry: (csv file, columns to read or None for all, partition key, Cypher).
+# Rows sharing a partition key always go to the same worker, and every relationship
+# a batch creates touches only nodes owned by its key, so parallel batches never
+# contend for the same node locks.
+TABLES = [
+    ("nurses.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MERGE (n:Nurse {nurse_id: row.nurse_id})
+        SET n += row, n.hire_date = date(row.hire_date)
+    """),
+    ("pay.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        SET n += row
+    """),
+    ("telehealth.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        SET n.used_telehealth = row.used_telehealth, n.telehealth_mode = row.mode
+    """),
+    ("practice_multistate.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        SET n += row
+    """),
+    ("shifts.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        MERGE (s:Shift {shift_id: row.shift_id})
+        SET s += row, s.date = date(row.date)
+        MERGE (n)-[:WORKED]->(s)
+    """),
+    ("nurses_feedback.csv", NURSE_FEEDBACK_COLUMNS, "shift_id", """
+        UNWIND $rows AS row
+        MATCH (s:Shift {shift_id: row.shift_id})
+        MERGE (f:NurseFeedback {feedback_id: row.feedback_id})
+        SET f += row
+        MERGE (s)-[:HAS_FEEDBACK]->(f)
+    """),
+    ("supervisors_feedback.csv", SUPERVISOR_FEEDBACK_COLUMNS, "supervisor_id", """
+        UNWIND $rows AS row
+        MATCH (s:Shift {shift_id: row.shift_id})
+        MERGE (sup:Supervisor {supervisor_id: row.supervisor_id})
+        MERGE (sup)-[r:REVIEWED {feedback_id: row.feedback_id}]->(s)
+        SET r += row
+    """),
+    ("health.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        MERGE (h:HealthRecord {record_id: row.record_id})
+        SET h += row, h.date = date(row.date), h.return_date = date(row.return_date)
+        MERGE (n)-[:HAS_HEALTH_RECORD]->(h)
+    """),
+    ("training.csv", None, "nurse_id", """
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        MERGE (t:Training {training_id: row.training_id})
+        SET t += row, t.date = date(row.date), t.cert_expiry = date(row.cert_expiry)
+        MERGE (n)-[:TOOK_TRAINING]->(t)
+    """),
+]
+
+
+def create_constraints(driver):
+    with session(driver) as s:
+        for statement in CONSTRAINTS:
+            s.run(statement).consume()
+
+
+def to_rows(df):
+    """DataFrame -> list of plain dicts the driver can send (NaN becomes null)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def partition(df, key, parts):
+    """Split df into `parts` frames so each value of `key` lands in exactly one of them."""
+    if parts == 1:
+        return [df]
+    bucket = pd.util.hash_array(df[key].to_numpy(dtype=object)) % parts
+    return [df[bucket == i] for i in range(parts)]
+
+
+def write_batches(driver, cypher, df, batch_size):
+    """Send df in UNWIND batches, one explicit write transaction per batch."""
+    with session(driver) as s:
+        for start in range(0, len(df), batch_size):
+            rows = to_rows(df.iloc[start:start + batch_size])
+            s.execute_write(lambda tx: tx.run(cypher, rows=rows).consume())
+    return len(df)
+
+
+def load_table(driver, path, columns, key, cypher, batch_size=BATCH_SIZE, workers=WORKERS, executor=None):
+    """Stream one CSV through the loader; return (rows, seconds)."""
+    t0 = time.perf_counter()
+    total = 0
+    # Every value is sent as read (strings, ints, bools); Cypher converts the date columns
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=batch_size * workers, keep_default_na=False,
+                             na_values=[""], dtype={"nurse_id": str, "shift_id": str}):
+        parts = [p for p in partition(chunk, key, workers) if len(p)]
+        if executor is None or len(parts) == 1:
+            total += sum(write_batches(driver, cypher, p, batch_size) for p in parts)
+        else:
+            # The whole chunk finishes before the next one starts, so a key never runs on two threads at once
+            total += sum(executor.map(lambda p: write_batches(driver, cypher, p, batch_size), parts))
+    return total, time.perf_counter() - t0
+
+
+def load_all(driver, data_dir=DATA_DIR, batch_size=BATCH_SIZE, workers=WORKERS, tables=None):
+    """Create constraints, load the requested tables in dependency order, return per-table stats."""
+    create_constraints(driver)
+    stats = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for filename, columns, key, cypher in TABLES:
+            name = filename[:-len(".csv")]
+            path = os.path.join(data_dir, filename)
+            if (tables and name not in tables) or not os.path.exists(path):
+                continue
+            rows, seconds = load_table(driver, path, columns, key, cypher, batch_size, workers,
+                                       executor if workers > 1 else None)
+            stats[name] = (rows, seconds)
+            print(f"Loaded {name:<22} {rows:>10} rows in {seconds:8.2f}s  ({rows / max(seconds, 1e-9):,.0f} rows/sec)")
+    if stats:
+        bump_data_version()    # cached graph_rag contexts and answers describe the old data
+    return stats
+
+
+def print_report(stats):
+    rows = sum(r for r, _ in stats.values())
+    seconds = sum(s for _, s in stats.values())
+    print(f"\nTotal: {rows} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load nurses_data_v3 CSVs into Neo4j with batched UNWIND writes.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per UNWIND transaction")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="parallel writer threads per table")
+    parser.add_argument("--tables", nargs="+", help="only load these tables (file names without .csv)")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="load even if validate_data finds duplicate keys or dangling references")
+    parser.add_argument("--no-aggregates", action="store_true",
+                        help="skip refreshing the precomputed wellbeing aggregates after the load")
+    parser.add_argument("--aggregates-dir", help="full dataset the aggregates are computed from, when --data-dir "
+                                                 "only holds a delta (default: --data-dir)")
+    args = parser.parse_args()
+
+    if not args.no_validate:
+        validator = validate(args.data_dir)    # schema detected from the tables present (e.g. a delta)
+        print(format_report(validator))
+        if validator.errors:
+            raise SystemExit(f"{len(validator.errors)} integrity errors in {args.data_dir}; fix the data or pass "
+                             f"--no-validate to load it anyway")
+
+    driver = get_driver()
+    try:
+        stats = load_all(driver, args.data_dir, args.batch_size, args.workers, args.tables)
+        if stats and not args.no_aggregates:
+            from wellbeing_aggregates import refresh    # imports this module for write_batches
+            for name, (written, deleted) in refresh(driver, args.aggregates_dir or args.data_dir).items():
+                print(f"Aggregates {name:<11} {written:>8} windows written, {deleted:>6} deleted")
+    finally:
+        close_driver()
+    print_report(stats)
+
+
+if __name__ == "__main__":
+    main()
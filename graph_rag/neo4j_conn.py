@@ -0,0 +1,188 @@
+"""
+Shared Neo4j connection for the graph_rag, cypher_python and loader scripts.
+
+The driver is created on first use (never at import time), with a tuned
+connection pool, and closed automatically at exit. Reads go through
+session.execute_read, so they are retried on transient errors and routed
+to read replicas on a cluster. Writes go through execute_write.
+
+    from neo4j_conn import read, read_df, write
+    rows = read("MATCH (n:Nurse) RETURN n.nurse_id AS id LIMIT $k", k=5)
+
+    from neo4j_conn import aread                    # asyncio variant
+    rows = await aread("MATCH (n:Nurse) RETURN count(n) AS n")
+    async for row in astream_records(query): ...    # lazily, straight off the cursor
+
+Tests can swap in their own driver with set_driver(...) and undo it with
+close_driver().
+"""
+
+import atexit
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from neo4j import READ_ACCESS, AsyncGraphDatabase, GraphDatabase
+
+from tracing import span
+
+MAX_POOL_SIZE = 50           # concurrent sessions the service can hold open
+ACQUISITION_TIMEOUT = 30     # seconds to wait for a free pooled connection
+CONNECTION_LIFETIME = 3600   # recycle connections before load balancers drop them
+FETCH_SIZE = 1000            # records pulled per round trip
+
+_driver = None
+_async_driver = None
+_settings = None
+_lock = threading.Lock()
+
+
+def settings():
+    """(uri, auth, database) from the environment / .env, read once and then cached.
+
+    close_driver() forgets them, so the next driver picks up a changed environment.
+    """
+    global _settings
+    if _settings is None:
+        load_dotenv()
+        user = os.getenv("NEO4J_USERNAME") or os.getenv("NEO4J_USER")
+        _settings = (os.getenv("NEO4J_URI"), (user, os.getenv("NEO4J_PASSWORD")), os.getenv("NEO4J_DATABASE"))
+    return _settings
+
+
+def driver_config(**overrides):
+    config = {
+        "max_connection_pool_size": MAX_POOL_SIZE,
+        "connection_acquisition_timeout": ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": CONNECTION_LIFETIME,
+        "fetch_size": FETCH_SIZE,
+    }
+    config.update(overrides)
+    return config
+
+
+def get_driver(uri=None, auth=None, **config):
+    """Process-wide driver; arguments only matter on the first call."""
+    global _driver
+    with _lock:
+        if _driver is None:
+            env_uri, env_auth, _ = settings()
+            _driver = GraphDatabase.driver(uri or env_uri, auth=auth or env_auth, **driver_config(**config))
+        return _driver
+
+
+def set_driver(driver):
+    """Use an existing (or stub) driver instead of creating one."""
+    global _driver
+    with _lock:
+        _driver = driver
+
+
+def close_driver():
+    global _driver, _settings
+    with _lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+        _settings = None
+
+
+atexit.register(close_driver)
+
+
+def session(driver=None, **kwargs):
+    """Session on NEO4J_DATABASE, from the shared driver or the one passed in (e.g. the loader's)."""
+    kwargs.setdefault("database", settings()[2])
+    return (driver or get_driver()).session(**kwargs)
+
+
+def execute_read(work, *args, **kwargs):
+    """Run work(tx, *args, **kwargs) in a managed read transaction."""
+    with session() as s:
+        return s.execute_read(work, *args, **kwargs)
+
+
+def execute_write(work, *args, **kwargs):
+    with session() as s:
+        return s.execute_write(work, *args, **kwargs)
+
+
+def read(query, **params):
+    """Run a read query; return the records as dicts.
+
+    Traced as neo4j.read, with connect_ms (session + connection + BEGIN, before
+    the query is sent) and child spans neo4j.run (until the first response)
+    and neo4j.fetch (pulling and materializing the records).
+    """
+    with span("neo4j.read") as s:
+        t0 = time.perf_counter()
+        attempts = 0
+
+        def work(tx):
+            nonlocal attempts
+            attempts += 1
+            s.set(connect_ms=round((time.perf_counter() - t0) * 1000, 3), attempts=attempts)
+            with span("neo4j.run"):
+                result = tx.run(query, params)
+            with span("neo4j.fetch") as f:
+                records = result.data()
+                f.set(rows=len(records))
+            return records
+
+        records = execute_read(work)
+        s.set(rows=len(records))
+    return records
+
+
+def write(query, **params):
+    return execute_write(lambda tx: tx.run(query, params).data())
+
+
+def read_df(query, **params):
+    import pandas as pd
+    return pd.DataFrame(read(query, **params))
+
+
+# asyncio variants. An async driver belongs to the event loop it was first used on,
+# so call close_async_driver() before that loop ends.
+
+def get_async_driver(uri=None, auth=None, **config):
+    global _async_driver
+    if _async_driver is None:
+        env_uri, env_auth, _ = settings()
+        _async_driver = AsyncGraphDatabase.driver(uri or env_uri, auth=auth or env_auth, **driver_config(**config))
+    return _async_driver
+
+
+def set_async_driver(driver):
+    global _async_driver
+    _async_driver = driver
+
+
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
+
+
+async def aread(query, **params):
+    async def work(tx):
+        result = await tx.run(query, params)
+        return await result.data()
+
+    async with get_async_driver().session(database=settings()[2]) as s:
+        return await s.execute_read(work)
+
+
+async def astream_records(query, **params):
+    """Yield records as dicts while the cursor fetches them (fetch_size at a time).
+
+    Runs as an auto-commit read, since a managed transaction would buffer the
+    whole result before returning; transient failures are not retried here.
+    """
+    async with get_async_driver().session(database=settings()[2], default_access_mode=READ_ACCESS) as s:
+        result = await s.run(query, params)
+        async for record in result:
+            yield record.data()
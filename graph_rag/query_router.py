@@ -0,0 +1,246 @@
+"""
+Question -> Cypher template router for graph_rag_query.
+
+Questions are matched to a library of parameterized Cypher templates by
+keyword scoring (no LLM call), and parameters such as the unit, shift type,
+nurse / supervisor id, training module, "top N" and "next N days" are
+pulled out with regexes. Routing decisions are cached per normalized
+question. The Cypher text of a template never changes (values only ever
+arrive as $parameters), so Neo4j reuses one cached plan per template.
+
+    route = route_question("Which ICU nurses work the most night shifts?")
+    route.name, route.params     # ('shifts_by_type', {'shift_type': 'Night', 'unit': 'ICU', 'limit': 10})
+    rows = retrieve(route)
+
+    python graph_rag/query_router.py "Whose certifications expire in the next 60 days?"
+"""
+
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+ROUTE_CACHE_SIZE = 4096
+DEFAULT_TEMPLATE = "shifts_by_type"    # the query graph_rag_query used to hard-code
+MIN_SCORE = 1.0
+MAX_LIMIT = 100
+
+Route = namedtuple("Route", "name description cypher params score")
+
+# name -> description, keyword weights, parameter defaults, Cypher.
+# Optional filters are written as `$x IS NULL OR ...` so one plan serves every value.
+TEMPLATES = {
+    "shifts_by_type": {
+        "description": "nurses ranked by number of shifts of one type",
+        "keywords": {"night": 2, "overnight": 2, "evening": 2, "day shift": 2, "shift": 1, "worked": 1, "most": 0.5},
+        "params": {"shift_type": "Night", "unit": None, "limit": 10},
+        "cypher": """
+            MATCH (n:Nurse)-[:WORKED]->(s:Shift)
+            WHERE s.shift_type = $shift_type AND ($unit IS NULL OR s.unit = $unit)
+            RETURN n.nurse_id AS nurse_id, n.first_name AS first_name, n.last_name AS last_name,
+                   count(s) AS shifts, sum(s.hours) AS hours
+            ORDER BY shifts DESC, nurse_id LIMIT $limit
+        """,
+    },
+    "burnout_trend": {
+        "description": "weekly burnout and emotional exhaustion rates per unit",
+        "keywords": {"burnout": 3, "burn": 2, "burned": 2, "burnt": 2, "drained": 2, "exhausted": 1.5,
+                     "trend": 1.5, "week": 1, "weekly": 1, "month": 1, "monthly": 1, "over time": 1, "unit": 0.5},
+        "params": {"unit": None},
+        # Precomputed by wellbeing_aggregates.py
+        "cypher": """
+            MATCH (w:UnitWeek)
+            WHERE $unit IS NULL OR w.unit = $unit
+            RETURN w.unit AS unit, toString(w.week) AS week, w.responses AS responses,
+                   w.pct_frequent_burnout AS pct_frequent_burnout, w.pct_frequent_burnout_4w AS pct_frequent_burnout_4w,
+                   w.pct_drained AS pct_drained
+            ORDER BY unit, week
+        """,
+    },
+    "overtime_stress": {
+        "description": "stress, fatigue and satisfaction on overtime vs regular shifts",
+        "keywords": {"overtime": 3, "stress": 1.5, "stressed": 1.5, "fatigue": 1.5, "tired": 1, "extra hour": 2,
+                     "satisfaction": 0.5},
+        "params": {"unit": None},
+        "cypher": """
+            MATCH (s:Shift)-[:HAS_FEEDBACK]->(f:NurseFeedback)
+            WHERE $unit IS NULL OR s.unit = $unit
+            RETURN s.overtime AS overtime, count(f) AS responses,
+                   round(100.0 * sum(CASE WHEN f.reported_stress = 'High' THEN 1 ELSE 0 END) / count(f), 1) AS pct_high_stress,
+                   round(100.0 * sum(CASE WHEN f.reported_fatigue = 'Severe' THEN 1 ELSE 0 END) / count(f), 1)
+                       AS pct_severe_fatigue,
+                   round(avg(f.satisfaction), 2) AS avg_satisfaction
+            ORDER BY overtime
+        """,
+    },
+    "supervisor_scores": {
+        "description": "supervisor review counts and average performance scores",
+        "keywords": {"supervisor": 3, "review": 1.5, "reviewed": 1.5, "performance": 2, "score": 1, "rating": 1,
+                     "teamwork": 1.5, "reliability": 1.5},
+        "params": {"supervisor_id": None, "unit": None, "limit": 20},
+        "cypher": """
+            MATCH (sup:Supervisor)-[r:REVIEWED]->(s:Shift)
+            WHERE ($supervisor_id IS NULL OR sup.supervisor_id = $supervisor_id) AND ($unit IS NULL OR s.unit = $unit)
+            RETURN sup.supervisor_id AS supervisor_id, count(r) AS reviews,
+                   round(avg(r.performance_score), 2) AS avg_performance,
+                   round(100.0 * sum(CASE WHEN r.teamwork = 'High' THEN 1 ELSE 0 END) / count(r), 1) AS pct_high_teamwork
+            ORDER BY avg_performance DESC, supervisor_id LIMIT $limit
+        """,
+    },
+    "training_expiry": {
+        "description": "training certifications expiring soon",
+        "keywords": {"training": 2, "certification": 3, "certificate": 3, "cert": 3, "expire": 3, "expiring": 3,
+                     "expiry": 3, "renew": 2, "module": 1},
+        "params": {"days": 90, "module": None, "limit": 25},
+        "cypher": """
+            MATCH (n:Nurse)-[:TOOK_TRAINING]->(t:Training)
+            WHERE t.cert_expiry >= date() AND t.cert_expiry <= date() + duration({days: $days})
+              AND ($module IS NULL OR t.module = $module)
+            RETURN n.nurse_id AS nurse_id, n.first_name AS first_name, n.last_name AS last_name,
+                   t.module AS module, toString(t.cert_expiry) AS cert_expiry
+            ORDER BY t.cert_expiry, nurse_id LIMIT $limit
+        """,
+    },
+    "intent_to_leave": {
+        "description": "share of nurses per unit who reported intent to leave",
+        "keywords": {"leave": 2, "leaving": 2, "quit": 3, "quitting": 3, "turnover": 3, "retention": 3,
+                     "intent": 1.5, "resign": 3},
+        "params": {"unit": None},
+        "cypher": """
+            MATCH (n:Nurse)-[:WORKED]->(s:Shift)-[:HAS_FEEDBACK]->(f:NurseFeedback)
+            WHERE $unit IS NULL OR s.unit = $unit
+            WITH s.unit AS unit, n, max(CASE WHEN f.intent_to_leave THEN 1 ELSE 0 END) AS leaving
+            RETURN unit, count(n) AS nurses, sum(leaving) AS intending_to_leave,
+                   round(100.0 * sum(leaving) / count(n), 1) AS pct_intending_to_leave
+            ORDER BY pct_intending_to_leave DESC
+        """,
+    },
+    "health_absences": {
+        "description": "health-related absences by type and status",
+        "keywords": {"absence": 3, "absent": 3, "sick": 2.5, "injured": 2.5, "injury": 2.5, "health": 1.5,
+                     "days off": 2, "leave": 0.5},
+        "params": {"limit": 20},
+        "cypher": """
+            MATCH (:Nurse)-[:HAS_HEALTH_RECORD]->(h:HealthRecord)
+            WHERE h.absence_type <> 'None'
+            RETURN h.absence_type AS absence_type, h.health_status AS health_status,
+                   count(h) AS records, sum(h.days_off) AS days_off
+            ORDER BY days_off DESC LIMIT $limit
+        """,
+    },
+    "nurse_profile": {
+        "description": "workload and wellbeing summary for one nurse",
+        "keywords": {"profile": 2, "summary": 1, "summarize": 1, "doing": 1, "how is": 1},
+        "params": {"nurse_id": None},
+        "requires": ["nurse_id"],
+        # Totals precomputed on the Nurse node by wellbeing_aggregates.py
+        "cypher": """
+            MATCH (n:Nurse {nurse_id: $nurse_id})
+            RETURN n.nurse_id AS nurse_id, n.first_name AS first_name, n.last_name AS last_name,
+                   n.specialty AS specialty, n.years_licensed AS years_licensed,
+                   n.shift_count AS shifts, n.avg_acuity AS avg_acuity, n.overtime_share AS overtime_share,
+                   n.night_share AS night_share, n.feedback_count AS feedback, n.avg_satisfaction AS avg_satisfaction,
+                   n.pct_high_stress AS pct_high_stress, n.pct_frequent_burnout AS pct_frequent_burnout,
+                   n.reported_intent_to_leave AS reported_intent_to_leave, n.avg_performance AS avg_performance
+        """,
+    },
+}
+
+UNIT_ALIASES = {"icu": "ICU", "intensive care": "ICU", "surgery": "Surgery", "surgical": "Surgery",
+                "medical": "Medical", "ed": "ED", "er": "ED", "emergency department": "ED", "emergency room": "ED",
+                "peds": "Peds", "pediatric": "Peds", "paediatric": "Peds", "pediatrics": "Peds"}
+SHIFT_ALIASES = {"night": "Night", "nights": "Night", "overnight": "Night", "evening": "Evening",
+                 "evenings": "Evening", "day shift": "Day", "day shifts": "Day", "daytime": "Day"}
+MODULE_ALIASES = {"resilience": "Resilience", "infection control": "Infection control", "ethics": "Ethics",
+                  "leadership": "Leadership", "tech": "Tech", "patient safety": "Patient Safety",
+                  "emergency response": "Emergency Response"}
+DAYS_PER = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def normalize(question):
+    """Lowercase, strip punctuation (keeping ids like N0012 / SUP3) and collapse whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", question.lower()).split())
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _find(aliases, text):
+    """Longest alias that occurs as whole words in text."""
+    for alias in sorted(aliases, key=len, reverse=True):
+        if re.search(rf"\b{alias}\b", text):
+            return aliases[alias]
+    return None
+
+
+def extract_params(text):
+    params = {}
+    module = _find(MODULE_ALIASES, text)
+    if module:
+        params["module"] = module
+        text = text.replace(module.lower(), " ")    # "emergency response" must not also match the ED unit
+    for key, aliases in (("unit", UNIT_ALIASES), ("shift_type", SHIFT_ALIASES)):
+        value = _find(aliases, text)
+        if value:
+            params[key] = value
+    if m := re.search(r"\bn ?(\d{1,6})\b", text):
+        params["nurse_id"] = f"N{int(m.group(1)):04d}"
+    if m := re.search(r"\bsup ?(\d{1,4})\b", text):
+        params["supervisor_id"] = f"SUP{int(m.group(1))}"
+    if m := re.search(r"\b(?:top|first|best|worst) (\d+)\b", text):
+        params["limit"] = min(int(m.group(1)), MAX_LIMIT)
+    if m := re.search(r"\b(\d+) (day|week|month|year)s?\b", text):
+        params["days"] = int(m.group(1)) * DAYS_PER[m.group(2)]
+    return params
+
+
+def score(template, text, words):
+    total = 0.0
+    for term, weight in template["keywords"].items():
+        if (" " in term and term in text) or _stem(term) in words:
+            total += weight
+    return total
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _route(text):
+    words = {_stem(w) for w in text.split()}
+    extracted = extract_params(text)
+    best, best_score = DEFAULT_TEMPLATE, 0.0
+    for name, template in TEMPLATES.items():
+        if any(key not in extracted for key in template.get("requires", ())):
+            continue
+        s = score(template, text, words)
+        # A required id that is present is strong evidence for that template
+        s += 2.0 * len(template.get("requires", ()))
+        if s > best_score:
+            best, best_score = name, s
+    if best_score < MIN_SCORE:
+        best = DEFAULT_TEMPLATE
+    defaults = TEMPLATES[best]["params"]
+    params = {key: extracted.get(key, default) for key, default in defaults.items()}
+    return best, tuple(params.items()), best_score
+
+
+def route_question(question):
+    """Pick the template for a question; identical questions up to case/punctuation hit the cache."""
+    name, params, best_score = _route(normalize(question))
+    template = TEMPLATES[name]
+    return Route(name, template["description"], template["cypher"], dict(params), best_score)
+
+
+def route_cache_info():
+    return _route.cache_info()
+
+
+def retrieve(route):
+    """Run a routed template against Neo4j; returns the records as dicts."""
+    from neo4j_conn import read
+    return read(route.cypher, **route.params)
+
+
+if __name__ == "__main__":
+    for q in sys.argv[1:] or ["Who worked night shifts recently?"]:
+        r = route_question(q)
+        print(f"{q!r} -> {r.name} {r.params} (score {r.score})")
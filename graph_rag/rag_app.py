@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Retrieve -> generate RAG app on LangGraph (formerly temp.py).
+
+Everything expensive happens once per process, and the network parts once per
+machine:
+  * the rlm/rag-prompt template is pulled from the LangChain hub once and
+    cached under .cache/rag_app/ (a built-in copy is used if the hub is unreachable);
+  * the source documents are fetched and split once, and the chunks cached;
+  * chunks are embedded into a local vector_index.VectorIndex saved on disk;
+  * the StateGraph is compiled once and shared.
+
+Both nodes are async (the vector search runs in a worker thread, the LLM
+call goes through the pooled llm_client), so concurrent questions share one
+compiled graph:
+
+    from rag_app import ask, ask_many
+    answer = await ask("What is task decomposition?")
+
+Measure cold start and per-question latency (--stub: local LLM stand-in):
+    python graph_rag/rag_app.py --stub --questions 50 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from functools import lru_cache
+
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from langgraph.graph import START, StateGraph
+from typing_extensions import List, TypedDict
+
+from llm_client import get_client
+from vector_index import VectorIndex, open_index
+
+CACHE_DIR = os.path.join(".cache", "rag_app")
+PROMPT_CACHE = os.path.join(CACHE_DIR, "rag_prompt.json")
+CHUNKS_CACHE = os.path.join(CACHE_DIR, "chunks.json")
+INDEX_DIR = os.path.join(CACHE_DIR, "index")
+SOURCE_URLS = ("https://lilianweng.github.io/posts/2023-06-23-agent/",)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+TOP_K = 4
+
+# Local copy of rlm/rag-prompt, used when the hub cannot be reached
+RAG_PROMPT = ("You are an assistant for question-answering tasks. Use the following pieces of retrieved context "
+              "to answer the question. If you don't know the answer, just say that you don't know. Use three "
+              "sentences maximum and keep the answer concise.\nQuestion: {question} \nContext: {context} \nAnswer:")
+ROLES = {"HumanMessagePromptTemplate": "human", "SystemMessagePromptTemplate": "system",
+         "AIMessagePromptTemplate": "ai"}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+@lru_cache(maxsize=None)
+def get_prompt():
+    """The RAG prompt, from the local cache, else the hub (then cached), else the built-in copy.
+
+    Only a pulled prompt is cached; the built-in fallback stays in memory so later runs try the hub again.
+    """
+    if os.path.exists(PROMPT_CACHE):
+        with open(PROMPT_CACHE, encoding="utf-8") as f:
+            return ChatPromptTemplate.from_messages([tuple(m) for m in json.load(f)])
+    try:
+        from langchain import hub
+        # N.B. for non-US LangSmith endpoints, you may need to specify
+        # api_url="https://api.smith.langchain.com" in hub.pull.
+        prompt = hub.pull("rlm/rag-prompt")
+        messages = [[ROLES[type(m).__name__], m.prompt.template] for m in prompt.messages]
+    except Exception:
+        messages = [["human", RAG_PROMPT]]
+    else:
+        _write_json(PROMPT_CACHE, messages)
+    return ChatPromptTemplate.from_messages([tuple(m) for m in messages])
+
+
+def load_chunks(urls=SOURCE_URLS):
+    """Split source documents, cached as JSON so later runs skip the download and the splitter."""
+    if os.path.exists(CHUNKS_CACHE):
+        with open(CHUNKS_CACHE, encoding="utf-8") as f:
+            return [Document(page_content=c["page_content"], metadata=c["metadata"]) for c in json.load(f)]
+    import bs4
+    from langchain_community.document_loaders import WebBaseLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    # Load and chunk contents of the blog
+    loader = WebBaseLoader(
+        web_paths=urls,
+        bs_kwargs=dict(
+            parse_only=bs4.SoupStrainer(
+                class_=("post-content", "post-title", "post-header")
+            )
+        ),
+    )
+    docs = loader.load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    all_splits = text_splitter.split_documents(docs)
+    _write_json(CHUNKS_CACHE, [{"page_content": d.page_content, "metadata": d.metadata} for d in all_splits])
+    return all_splits
+
+
+_index_dir = INDEX_DIR
+
+
+def use_index(index_dir):
+    """Answer from another saved index, e.g. vector_index.INDEX_DIR for the nurse / supervisor text."""
+    global _index_dir
+    _index_dir = index_dir
+    get_index.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_index():
+    """Vector index over the chunks; built and saved on first use."""
+    index = open_index(_index_dir)
+    if not len(index):
+        if _index_dir != INDEX_DIR:
+            raise FileNotFoundError(f"No vector index in {_index_dir}; build it with vector_index.py first")
+        chunks = load_chunks()
+        index = VectorIndex()
+        index.upsert([f"chunk:{i}" for i in range(len(chunks))], [c.page_content for c in chunks])
+        index.save(_index_dir)
+    return index
+
+
+# Define state for application
+class State(TypedDict):
+    question: str
+    context: List[Document]
+    answer: str
+
+
+# Define application steps
+async def retrieve(state: State):
+    hits = await asyncio.to_thread(get_index().search, [state["question"]], TOP_K)
+    return {"context": [Document(page_content=text, metadata={"key": key, "score": score})
+                        for key, text, score in hits[0]]}
+
+
+async def generate(state: State):
+    docs_content = "\n\n".join(doc.page_content for doc in state["context"])
+    messages = get_prompt().invoke({"question": state["question"], "context": docs_content})
+    response = await get_client().agenerate(messages.to_string())
+    return {"answer": response}
+
+
+@lru_cache(maxsize=None)
+def get_graph():
+    """Compile the retrieve -> generate graph once per process."""
+    graph_builder = StateGraph(State).add_sequence([retrieve, generate])
+    graph_builder.add_edge(START, "retrieve")
+    return graph_builder.compile()
+
+
+def warm_up():
+    """Load the prompt, index and graph up front so the first question is not the slow one."""
+    get_prompt()
+    get_index()
+    return get_graph()
+
+
+async def ask(question):
+    state = await get_graph().ainvoke({"question": question})
+    return state["answer"]
+
+
+async def ask_many(questions):
+    return await asyncio.gather(*(ask(q) for q in questions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and per-question latency of the RAG app.")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="vector index to answer from")
+    parser.add_argument("--stub", action="store_true", help="answer with llm_stub_server instead of Gemini")
+    args = parser.parse_args()
+
+    if args.stub:
+        import llm_client
+        from llm_stub_server import start_stub_server
+        _, url = start_stub_server(latency=0.2)
+        llm_client._client = llm_client.LLMClient(url=url)
+    get_client().concurrency = args.concurrency
+    use_index(args.index_dir)
+
+    t0 = time.perf_counter()
+    warm_up()
+    print(f"cold start: {time.perf_counter() - t0:.2f}s ({len(get_index())} chunks indexed)")
+
+    questions = [f"What is task decomposition? ({i})" for i in range(args.questions)]
+
+    async def timed(q):
+        t = time.perf_counter()
+        await ask(q)
+        return time.perf_counter() - t
+
+    async def run():
+        t = time.perf_counter()
+        await timed(questions[0])
+        first = time.perf_counter() - t
+        t = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(timed(q) for q in questions)))
+        return first, latencies, time.perf_counter() - t
+
+    first, latencies, wall = asyncio.run(run())
+    p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+    print(f"first question: {first * 1000:.0f}ms | {len(questions)} concurrent: p50 {p50 * 1000:.0f}ms "
+          f"p95 {p95 * 1000:.0f}ms, {len(questions) / wall:.1f} questions/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing for the GraphRAG hot path.
+
+A trace is one graph_rag_query call; spans inside it time each stage
+(routing, cache lookups, Neo4j connection / Cypher execution / record
+fetching, context and prompt building, the Gemini call) and carry
+attributes such as row counts, prompt / response sizes and cache hits.
+Finished traces go to an exporter:
+
+    JsonlExporter(path)     one JSON line per trace, appended
+    MemoryExporter()        the last N traces in a list, for tests and notebooks
+
+Tracing is off unless configured, and then only a sample of traces is
+recorded. Outside a sampled trace span() costs a context-variable lookup.
+Async generators cannot keep a span current across a yield (the consumer
+would run inside it); they open spans with Tracer.start() / Span.child(),
+activate() them only around blocks that do not yield, and end() them.
+
+    configure("memory", sample_rate=1.0)
+    graph_rag_query("Who worked night shifts recently?")
+    print(format_summary(summarize(get_tracer().exporter.traces)))
+
+Or from the environment (GRAPH_RAG_TRACE=.cache/traces.jsonl,
+GRAPH_RAG_TRACE_SAMPLE=0.05), and afterwards:
+    python graph_rag/tracing.py summary .cache/traces.jsonl
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+TRACE_ENV = "GRAPH_RAG_TRACE"              # JSONL path, or "memory"
+SAMPLE_ENV = "GRAPH_RAG_TRACE_SAMPLE"
+TRACE_PATH = os.path.join(".cache", "traces.jsonl")
+SAMPLE_RATE = 1.0
+MEMORY_TRACES = 1000
+
+_current = contextvars.ContextVar("graph_rag_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace", "parent", "start", "duration", "attrs")
+
+    def __init__(self, name, trace, parent, attrs):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.duration = None
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def child(self, name, **attrs):
+        """Child span opened by hand (not made current); end() it when done."""
+        return Span(name, self.trace, self, attrs)
+
+    def end(self, error=None):
+        """Close the span; closing a root span exports its trace. Later calls do nothing."""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.start
+        if error:
+            self.attrs["error"] = error
+        if self.parent is None:
+            self.trace.export(self)
+        else:
+            self.trace.spans.append(self)
+
+    @contextmanager
+    def activate(self):
+        """Make this the current span for a block, so span() / annotate() inside it attach here.
+
+        Never hold it across a yield: the token belongs to the context that set it.
+        """
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def record(self):
+        return {"name": self.name, "parent": self.parent.name if self.parent else None,
+                "start_ms": round((self.start - self.trace.start) * 1000, 3),
+                "duration_ms": round(self.duration * 1000, 3), **({"attrs": self.attrs} if self.attrs else {})}
+
+
+class _NoSpan:
+    """Stands in for a span when nothing is being recorded."""
+
+    def set(self, **attrs):
+        pass
+
+    def child(self, name, **attrs):
+        return self
+
+    def end(self, error=None):
+        pass
+
+    @contextmanager
+    def activate(self):
+        yield self
+
+
+NO_SPAN = _NoSpan()
+
+
+class _Trace:
+    def __init__(self, name, exporter):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.exporter = exporter
+        self.start = time.perf_counter()
+        self.wall = time.time()
+        self.spans = []
+
+    def export(self, root):
+        self.exporter.export({"trace_id": self.id, "name": self.name, "time": self.wall,
+                              "duration_ms": round(root.duration * 1000, 3), "attrs": root.attrs,
+                              "spans": [s.record() for s in self.spans]})
+
+
+class JsonlExporter:
+    def __init__(self, path=TRACE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def export(self, trace):
+        line = json.dumps(trace, default=str) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class MemoryExporter:
+    def __init__(self, max_traces=MEMORY_TRACES):
+        self.traces = deque(maxlen=max_traces)
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+    def clear(self):
+        self.traces.clear()
+
+
+@contextmanager
+def _closing(s):
+    """Run a block with s current and end s afterwards, recording the exception type if it fails."""
+    error = None
+    try:
+        with s.activate():
+            yield s
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        s.end(error)
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate=SAMPLE_RATE):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start(self, name, **attrs):
+        """Root span opened by hand, for code that cannot keep a `with` block open (async generators).
+
+        A child of the current span if one is open, NO_SPAN if this trace is not sampled.
+        Call end() when done, and activate() only around blocks that do not yield.
+        """
+        parent = _current.get()
+        if parent is not None:
+            return parent.child(name, **attrs)
+        if self.exporter is None or random.random() >= self.sample_rate:
+            return NO_SPAN
+        return Span(name, _Trace(name, self.exporter), None, attrs)
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """Root span; starts a new trace if this one is sampled (and none is open already)."""
+        with _closing(self.start(name, **attrs)) as s:
+            yield s
+
+
+@contextmanager
+def span(name, **attrs):
+    """Child span of the current one; a no-op outside a sampled trace."""
+    parent = _current.get()
+    with _closing(parent.child(name, **attrs) if parent is not None else NO_SPAN) as s:
+        yield s
+
+
+def annotate(**attrs):
+    """Set attributes on the innermost open span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def make_exporter(target):
+    if not target:
+        return None
+    if target == "memory":
+        return MemoryExporter()
+    return JsonlExporter(target)
+
+
+_tracer = None
+_lock = threading.Lock()
+
+
+def get_tracer():
+    """Process-wide tracer, configured from GRAPH_RAG_TRACE / GRAPH_RAG_TRACE_SAMPLE on first use."""
+    global _tracer
+    with _lock:
+        if _tracer is None:
+            _tracer = Tracer(make_exporter(os.getenv(TRACE_ENV)), float(os.getenv(SAMPLE_ENV, SAMPLE_RATE)))
+        return _tracer
+
+
+def configure(exporter, sample_rate=SAMPLE_RATE):
+    """Replace the process-wide tracer; exporter is an exporter object, a JSONL path, "memory" or None."""
+    global _tracer
+    with _lock:
+        _tracer = Tracer(make_exporter(exporter) if isinstance(exporter, str) or exporter is None else exporter,
+                         sample_rate)
+        return _tracer
+
+
+def trace(name, **attrs):
+    return get_tracer().trace(name, **attrs)
+
+
+def read_traces(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                pass    # a line cut short by a crash
+
+
+def summarize(traces):
+    """Per stage: count, latency percentiles, and the mean / rate of each numeric / boolean attribute."""
+    durations, attrs = defaultdict(list), defaultdict(lambda: defaultdict(list))
+    for t in traces:
+        for name, duration, values in [(t["name"], t["duration_ms"], t.get("attrs", {}))] + \
+                [(s["name"], s["duration_ms"], s.get("attrs", {})) for s in t.get("spans", [])]:
+            durations[name].append(duration)
+            for key, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    attrs[name][key].append(float(value))
+    summary = {}
+    for name, values in durations.items():
+        ms = np.asarray(values)
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        summary[name] = {"count": len(ms), "mean_ms": round(ms.mean(), 3), "p50_ms": round(p50, 3),
+                         "p95_ms": round(p95, 3), "p99_ms": round(p99, 3), "max_ms": round(ms.max(), 3),
+                         "attrs": {k: round(float(np.mean(v)), 3) for k, v in attrs[name].items()}}
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'stage':<22}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  attributes (mean)"]
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+        extra = ", ".join(f"{k}={v:g}" for k, v in s["attrs"].items())
+        lines.append(f"{name:<22}{s['count']:>7}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}"
+                     f"{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}  {extra}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize GraphRAG traces written by JsonlExporter.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("summary", help="per-stage latency percentiles and attribute means")
+    report.add_argument("path", nargs="?", default=TRACE_PATH)
+    report.add_argument("--name", help="only traces with this root name, e.g. graph_rag_query")
+    report.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    traces = [t for t in read_traces(args.path) if not args.name or t["name"] == args.name]
+    if not traces:
+        print(f"no traces in {args.path}")
+        return
+    summary = summarize(traces)
+    print(json.dumps(summary, indent=1) if args.json else f"{len(traces)} traces\n{format_summary(summary)}")
+
+
+if __name__ == "__main__":
+    main()
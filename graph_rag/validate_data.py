@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Referential-integrity and consistency checks for the generated datasets.
+
+Checks every table of nurses_data_v3 (simulated_data/nurses_shift.py) or
+nurse_kg_data_v1 (backend/data_generate_v2.py) against SCHEMAS:
+
+    null        key / reference columns must be filled
+    unique      primary keys (and e.g. one feedback row per shift) never repeat
+    reference   every foreign key exists in its parent table
+    ordered     date pairs are in order (return_date >= date, cert_expiry >= date)
+    after       a date is not before a parent's date (health / training / shifts after hire_date)
+    future      dates are not after --today
+    distinct    column pairs differ (nobody rates themselves)
+    parse       the file can be read (dates parse)
+
+Tables are streamed in record batches (pyarrow's CSV reader, or Parquet row
+groups) reading only the columns a check needs. Key values are reduced to
+64-bit hashes, so a parent table costs 8 bytes per row:
+  * uniqueness sorts each table's key hashes once and compares neighbours;
+  * references dictionary-encode each batch's column and binary-search only
+    the distinct values in the parent's sorted unique hashes;
+  * `after` checks look the parent date up through the same sorted array.
+Example values for duplicate keys are collected by a second pass over the key
+column, and only when duplicates were found. Tables missing from the directory
+(e.g. a delta written by nurses_shift.py --append-weeks) are skipped, along
+with the references into them.
+
+key / reference failures are errors (MERGE would silently fold duplicate
+keys, and MATCH drops rows with dangling references); date and pair
+checks are warnings. load_nurses_data.py runs this before writing anything.
+
+    python graph_rag/validate_data.py nurses_data_v3
+    python graph_rag/validate_data.py nurse_kg_data_v1 --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+BLOCK_SIZE = 32 << 20    # bytes of CSV parsed per record batch
+MAX_EXAMPLES = 5
+
+# dataset -> table -> checks, tables listed parents first.
+#   key: primary key; unique: other columns that must not repeat; refs: {column: parent table}
+#   (the parent's key); ordered: [(earlier, later)]; after: {column: (reference column, parent date column)};
+#   future: dates that must not be after today; distinct: [(a, b)]
+SCHEMAS = {
+    "nurses_data_v3": {
+        "nurses": {"key": "nurse_id", "future": ["hire_date"]},
+        "shifts": {"key": "shift_id", "refs": {"nurse_id": "nurses"}, "after": {"date": ("nurse_id", "hire_date")}},
+        "nurses_feedback": {"key": "feedback_id", "unique": ["shift_id"], "refs": {"shift_id": "shifts"}},
+        "supervisors_feedback": {"key": "feedback_id", "unique": ["shift_id"],
+                                 "refs": {"feedback_id": "nurses_feedback", "shift_id": "shifts"}},
+        "health": {"key": "record_id", "refs": {"nurse_id": "nurses"}, "ordered": [("date", "return_date")],
+                   "after": {"date": ("nurse_id", "hire_date")}, "future": ["date"]},
+        "training": {"key": "training_id", "refs": {"nurse_id": "nurses"}, "ordered": [("date", "cert_expiry")],
+                     "after": {"date": ("nurse_id", "hire_date")}, "future": ["date"]},
+        "pay": {"key": "nurse_id", "refs": {"nurse_id": "nurses"}},
+        "telehealth": {"key": "nurse_id", "refs": {"nurse_id": "nurses"}},
+        "practice_multistate": {"key": "nurse_id", "refs": {"nurse_id": "nurses"}},
+    },
+    "nurse_kg_data_v1": {
+        "clinics": {"key": "clinic_id"},
+        "families": {"key": "family_id"},
+        "teams": {"key": "team_id"},
+        "interventions": {"key": "intervention_id"},
+        "misinformation_posts": {"key": "post_id"},
+        "nurses": {"key": "nurse_id", "refs": {"clinic_id": "clinics", "team_id": "teams", "family_id": "families"}},
+        "incidents": {"key": "incident_id", "refs": {"clinic_id": "clinics"}, "future": ["date"]},
+        "comments": {"key": "comment_id", "refs": {"incident_id": "incidents", "nurse_id": "nurses"}},
+        "peer_ratings": {"refs": {"from_nurse_id": "nurses", "to_nurse_id": "nurses"},
+                         "distinct": [("from_nurse_id", "to_nurse_id")]},
+        "nurse_clinic": {"key": "nurse_id", "refs": {"nurse_id": "nurses", "clinic_id": "clinics"}},
+        "nurse_family": {"key": "nurse_id", "refs": {"nurse_id": "nurses", "family_id": "families"}},
+        "nurse_team": {"key": "nurse_id", "refs": {"nurse_id": "nurses", "team_id": "teams"}},
+        "nurse_intervention": {"key": "nurse_id", "refs": {"nurse_id": "nurses", "intervention_id": "interventions"}},
+        "nurse_incident": {"refs": {"nurse_id": "nurses", "incident_id": "incidents"}},
+        "nurse_post_engagement": {"refs": {"nurse_id": "nurses", "post_id": "misinformation_posts"}},
+        "comment_incident": {"key": "comment_id", "refs": {"comment_id": "comments", "incident_id": "incidents"}},
+        "incident_clinic": {"key": "incident_id", "refs": {"incident_id": "incidents", "clinic_id": "clinics"}},
+    },
+}
+ERRORS = {"null", "unique", "reference", "parse"}
+
+
+def detect_dataset(data_dir):
+    """The schema most of whose tables are in data_dir (a delta directory holds only a few)."""
+    present = {name: sum(_source(data_dir, table) is not None for table in schema) for name, schema in SCHEMAS.items()}
+    name = max(present, key=present.get)
+    if not present[name]:
+        raise ValueError(f"{data_dir} does not look like any of {sorted(SCHEMAS)}")
+    return name
+
+
+def _source(data_dir, table):
+    for ext in (".csv", ".parquet"):    # the CSV is what the loaders read
+        path = os.path.join(data_dir, table + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _columns(spec):
+    ids = ([spec["key"]] if "key" in spec else []) + spec.get("unique", []) + list(spec.get("refs", {})) + \
+          [ref for ref, _ in spec.get("after", {}).values()] + [c for pair in spec.get("distinct", []) for c in pair]
+    dates = [c for pair in spec.get("ordered", []) for c in pair] + list(spec.get("after", {})) + \
+            spec.get("future", [])
+    return list(dict.fromkeys(ids)), list(dict.fromkeys(dates))
+
+
+def iter_batches(path, ids, dates, block_size=BLOCK_SIZE):
+    """Yield ({column: array}, rows) per record batch: ids stay Arrow string arrays, dates become datetime64[s]."""
+    columns = list(dict.fromkeys(ids + dates))
+    if path.endswith(".parquet"):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=1 << 20, columns=columns)
+    else:
+        types = {c: pa.string() for c in ids}
+        types.update({c: pa.timestamp("s") for c in dates})
+        batches = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=block_size),
+                                 convert_options=pacsv.ConvertOptions(include_columns=columns, column_types=types,
+                                                                      strings_can_be_null=True))
+    for batch in batches:
+        out = {}
+        for name in columns:
+            column = batch.column(name)
+            if name in dates:
+                out[name] = column.cast(pa.timestamp("s")).to_numpy(zero_copy_only=False).astype("datetime64[s]")
+            else:
+                out[name] = column.cast(pa.string())
+        yield out, batch.num_rows
+
+
+def hash_ids(column):
+    """uint64 hash per value of an Arrow string array."""
+    # Keys are mostly distinct, so hashing every value beats factorizing first (pandas' default)
+    return pd.util.hash_array(column.to_numpy(zero_copy_only=False), categorize=False)
+
+
+def encode_ids(column):
+    """(hash per distinct value, code per row): far less hashing for reference columns, which repeat a lot.
+
+    Missing values get the last code, which no parent key matches.
+    """
+    encoded = column.dictionary_encode()
+    hashes = hash_ids(pa.concat_arrays([encoded.dictionary, pa.nulls(1, pa.string())]))
+    return hashes, encoded.indices.fill_null(len(encoded.dictionary)).to_numpy(zero_copy_only=False)
+
+
+def sorted_lookup(hashes, values=None):
+    """Sorted unique hashes (and the values aligned with them) for binary-search membership / lookups."""
+    order = np.argsort(hashes, kind="stable")
+    hashes = hashes[order]
+    first = np.ones(len(hashes), dtype=bool)
+    first[1:] = hashes[1:] != hashes[:-1]
+    return hashes[first], None if values is None else values[order][first]
+
+
+def member(sorted_hashes, hashes):
+    """Boolean mask: which hashes occur in sorted_hashes; and their positions there."""
+    # Searching in sorted order walks the parent array front to back instead of jumping around memory
+    order = np.argsort(hashes)
+    pos = np.empty(len(hashes), dtype=np.intp)
+    pos[order] = np.searchsorted(sorted_hashes, hashes[order])
+    pos[pos == len(sorted_hashes)] = 0
+    return (sorted_hashes[pos] == hashes) if len(sorted_hashes) else np.zeros(len(hashes), dtype=bool), pos
+
+
+def _take(values, index):
+    if isinstance(values, np.ndarray):
+        return values[index].tolist()
+    return values.take(pa.array(index, type=pa.int64())).to_pylist()
+
+
+class Validator:
+    def __init__(self, data_dir, dataset=None, today=None, block_size=BLOCK_SIZE, max_examples=MAX_EXAMPLES):
+        self.data_dir = data_dir
+        self.dataset = dataset or detect_dataset(data_dir)
+        self.schema = SCHEMAS[self.dataset]
+        self.today = np.datetime64(today or date.today(), "s") + np.timedelta64(1, "D")   # end of today
+        self.block_size = block_size
+        self.max_examples = max_examples
+        self.keys = {}          # table -> sorted unique key hashes
+        self.dates = {}         # (table, column) -> dates aligned with self.keys[table]
+        self.issues = []
+        self.rows = {}
+
+    def _needed_dates(self, table):
+        """Date columns of `table` that a child's `after` check looks up."""
+        return [column for spec in self.schema.values() for ref, column in spec.get("after", {}).values()
+                if spec.get("refs", {}).get(ref) == table]
+
+    def issue(self, table, check, column, count, examples=()):
+        if count:
+            self.issues.append({"table": table, "check": check, "column": column, "count": int(count),
+                                "severity": "error" if check in ERRORS else "warning",
+                                "examples": [str(e) for e in list(examples)[:self.max_examples]]})
+
+    def check_table(self, table):
+        spec = self.schema[table]
+        path = _source(self.data_dir, table)
+        if path is None:
+            return    # e.g. a delta directory; references into this table are not checked either
+        ids, dates = _columns(spec)
+        lookup_dates = self._needed_dates(table)
+        dates = list(dict.fromkeys(dates + lookup_dates))
+        refs = spec.get("refs", {})
+        unique = ([spec["key"]] if "key" in spec else []) + spec.get("unique", [])
+        seen = {c: [] for c in unique}
+        parent_dates = {c: [] for c in lookup_dates}
+        counts, examples = {}, {}
+
+        def tally(check, column, mask, values, prefix=""):
+            n = int(np.count_nonzero(mask))
+            if n:
+                key = (check, column)
+                counts[key] = counts.get(key, 0) + n
+                found = examples.setdefault(key, [])
+                if len(found) < self.max_examples:
+                    found.extend(f"{prefix}{v}" for v in
+                                 _take(values, np.flatnonzero(mask)[:self.max_examples - len(found)]))
+
+        rows = 0
+        for batch, n in iter_batches(path, ids, dates, self.block_size):
+            first_line = rows + 2    # CSV line of the batch's first row, after the header
+            rows += n
+            hashes, codes, missing = {}, {}, {}
+            for column in ids:
+                missing[column] = batch[column].is_null().to_numpy(zero_copy_only=False)
+                if missing[column].any():
+                    tally("null", column, missing[column], np.arange(first_line, first_line + n), "line ")
+                if column in refs and column not in unique:
+                    codes[column] = encode_ids(batch[column])
+                else:
+                    hashes[column] = hash_ids(batch[column])
+                    codes[column] = (hashes[column], np.arange(n))
+            label = batch[spec["key"]] if "key" in spec else None
+            for column in unique:
+                seen[column].append(hashes[column][~missing[column]])
+            for column in lookup_dates:
+                parent_dates[column].append(batch[column][~missing[spec["key"]]])
+            for column, parent in refs.items():
+                if parent in self.keys:
+                    found, _ = member(self.keys[parent], codes[column][0])
+                    tally("reference", column, ~found[codes[column][1]] & ~missing[column], batch[column])
+            for earlier, later in spec.get("ordered", []):
+                tally("ordered", f"{later} >= {earlier}", batch[later] < batch[earlier], label)
+            for column, (ref, parent_column) in spec.get("after", {}).items():
+                parent = refs[ref]
+                if (parent, parent_column) in self.dates:
+                    found, pos = member(self.keys[parent], codes[ref][0])
+                    row_codes = codes[ref][1]
+                    before = found[row_codes] & (batch[column] < self.dates[parent, parent_column][pos][row_codes])
+                    tally("after", f"{column} >= {parent}.{parent_column}", before, batch[ref] if label is None else label)
+            for column in spec.get("future", []):
+                tally("future", column, batch[column] >= self.today, batch[column] if label is None else label)
+            for a, b in spec.get("distinct", []):
+                same = codes[a][0][codes[a][1]] == codes[b][0][codes[b][1]]
+                tally("distinct", f"{a} != {b}", same & ~missing[a], batch[a])
+        self.rows[table] = rows
+
+        for column in unique:
+            all_hashes = np.concatenate(seen[column]) if seen[column] else np.empty(0, dtype=np.uint64)
+            ordered = np.sort(all_hashes)
+            repeated = ordered[1:][ordered[1:] == ordered[:-1]]
+            if len(repeated):
+                counts["unique", column] = len(repeated)
+                examples["unique", column] = self._duplicate_examples(path, column, np.unique(repeated))
+            if column == spec.get("key"):
+                if lookup_dates:
+                    for date_column in lookup_dates:
+                        values = np.concatenate(parent_dates[date_column]) if rows else np.empty(0, "datetime64[s]")
+                        self.keys[table], self.dates[table, date_column] = sorted_lookup(all_hashes, values)
+                else:
+                    self.keys[table] = ordered[np.r_[True, ordered[1:] != ordered[:-1]]] if len(ordered) else ordered
+        for (check, column), count in counts.items():
+            self.issue(table, check, column, count, examples.get((check, column), ()))
+
+    def _duplicate_examples(self, path, column, repeated):
+        """Second pass over one column, only when it has duplicates: the first few repeated values."""
+        found = []
+        for batch, _ in iter_batches(path, [column], [], self.block_size):
+            hit = np.flatnonzero(np.isin(hash_ids(batch[column]), repeated))
+            found.extend(v for v in dict.fromkeys(_take(batch[column], hit[:1000])) if v not in found)
+            if len(found) >= self.max_examples:
+                break
+        return found[:self.max_examples]
+
+    def run(self):
+        for table in self.schema:
+            try:
+                self.check_table(table)
+            except pa.ArrowInvalid as exc:    # e.g. a date pyarrow cannot parse; the loader would fail on it too
+                self.issue(table, "parse", None, 1, [str(exc).splitlines()[0]])
+        return self.issues
+
+    @property
+    def errors(self):
+        return [i for i in self.issues if i["severity"] == "error"]
+
+
+def validate(data_dir, dataset=None, today=None, block_size=BLOCK_SIZE):
+    validator = Validator(data_dir, dataset, today, block_size)
+    validator.run()
+    return validator
+
+
+def format_report(validator, seconds=None):
+    lines = [f"{validator.dataset} in {validator.data_dir}: {sum(validator.rows.values()):,} rows in "
+             f"{len(validator.rows)} tables" + (f", checked in {seconds:.2f}s" if seconds is not None else "")]
+    for i in validator.issues:
+        examples = f"  e.g. {', '.join(i['examples'])}" if i["examples"] else ""
+        lines.append(f"  {i['severity']:<8}{i['table']:<22}{i['check']:<10}{str(i['column']):<34}"
+                     f"{i['count']:>10,}{examples}")
+    if not validator.issues:
+        lines.append("  no issues")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check keys, references and dates across the generated tables.")
+    parser.add_argument("data_dir", nargs="?", default="nurses_data_v3")
+    parser.add_argument("--dataset", choices=sorted(SCHEMAS), help="schema to check against (default: detected)")
+    parser.add_argument("--today", type=date.fromisoformat, help="dates after this are in the future (default: today)")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="CSV bytes per record batch")
+    parser.add_argument("--json", metavar="PATH", help="also write the issues as JSON")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    validator = validate(args.data_dir, args.dataset, args.today, args.block_size)
+    print(format_report(validator, time.perf_counter() - t0))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"dataset": validator.dataset, "rows": validator.rows, "issues": validator.issues}, f, indent=1)
+    sys.exit(1 if validator.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Local vector index over the free text we generate, for hybrid (vector + graph) retrieval.
+
+Indexed text:
+    nurses_data_v3/nurses_feedback.csv         comments    (NurseFeedback, by feedback_id)
+    nurses_data_v3/supervisors_feedback.csv    remarks     (REVIEWED relationship, by feedback_id)
+    nurse_kg_data_v1/comments.csv              text        (Comment, by comment_id)
+    nurse_kg_data_v1/misinformation_posts.csv  text        (MisinformationPost, by post_id)
+
+The index is an IVF (inverted file) index in numpy, CPU only. Vectors are
+clustered around sqrt(N) spherical k-means centroids and stored on disk
+grouped by cluster, so a query scans only the `nprobe` nearest clusters of a
+memory-mapped array. Upserts and deletes go to a small flat delta segment
+plus tombstones; once the delta grows past COMPACT_RATIO of the main index,
+they are folded back into the clusters (centroids are retrained only when
+the data has doubled since the last training).
+
+Embeddings are batched. The default embed_fn is a signed hashed bag of words
++ bigrams (no model download). Any callable texts -> (n, dim) float32 array,
+e.g. a sentence-transformers model's encode, can be passed instead.
+
+Usage (from the repository root):
+    python graph_rag/vector_index.py build                 # index new text from the CSVs
+    python graph_rag/vector_index.py search "felt unsupported by management" --graph
+    python graph_rag/vector_index.py benchmark --n 1000000
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import zlib
+from functools import partial
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+INDEX_DIR = os.path.join(".cache", "vector_index")
+DIM = 256
+EMBED_BATCH = 10_000
+NPROBE = 8
+COMPACT_RATIO = 0.2       # fold the delta segment into the clusters past this fraction of the main index
+COMPACT_MIN = 10_000      # ...but never for fewer rows than this
+KMEANS_SAMPLE = 100_000
+KMEANS_ITERATIONS = 10
+SEARCH_BATCH = 4096       # main-index rows scored per matmul when assigning clusters
+
+# source -> (csv path, id column, text column)
+SOURCES = {
+    "nurse_comment": (os.path.join("nurses_data_v3", "nurses_feedback.csv"), "feedback_id", "comments"),
+    "supervisor_remark": (os.path.join("nurses_data_v3", "supervisors_feedback.csv"), "feedback_id", "remarks"),
+    "comment": (os.path.join("nurse_kg_data_v1", "comments.csv"), "comment_id", "text"),
+    "post": (os.path.join("nurse_kg_data_v1", "misinformation_posts.csv"), "post_id", "text"),
+}
+
+# source -> Cypher returning the graph neighbourhood of each hit (one UNWIND query per source)
+NEIGHBORHOODS = {
+    "nurse_comment": """
+        UNWIND $ids AS id
+        MATCH (n:Nurse)-[:WORKED]->(s:Shift)-[:HAS_FEEDBACK]->(f:NurseFeedback {feedback_id: id})
+        RETURN id, n.nurse_id AS nurse_id, s.unit AS unit, s.shift_type AS shift_type, toString(s.date) AS date,
+               f.reported_stress AS stress, f.burnout_freq AS burnout_freq, f.intent_to_leave AS intent_to_leave
+    """,
+    "supervisor_remark": """
+        UNWIND $ids AS id
+        MATCH (sup:Supervisor)-[r:REVIEWED {feedback_id: id}]->(s:Shift)<-[:WORKED]-(n:Nurse)
+        RETURN id, sup.supervisor_id AS supervisor_id, n.nurse_id AS nurse_id, s.unit AS unit,
+               r.performance_score AS performance_score, r.teamwork AS teamwork
+    """,
+    "comment": """
+        UNWIND $ids AS id
+        MATCH (c:Comment {comment_id: id})
+        OPTIONAL MATCH (n:Nurse)-[:WROTE]->(c)
+        OPTIONAL MATCH (c)-[:ABOUT]->(i:Incident)
+        RETURN id, n.nurse_id AS nurse_id, i.type AS incident_type, i.severity AS severity,
+               i.department AS department
+    """,
+    "post": """
+        UNWIND $ids AS id
+        MATCH (p:MisinformationPost {post_id: id})
+        OPTIONAL MATCH (n:Nurse)-[e:ENGAGED_WITH]->(p)
+        RETURN id, p.topic AS topic, p.credibility_score AS credibility_score, count(n) AS engaged_nurses,
+               collect(DISTINCT e.engagement_type) AS engagement_types
+    """,
+}
+
+TOKEN = re.compile(r"[a-z0-9]+")
+_slots = {}
+
+
+def _slot(term, dim):
+    """(column, sign) of a term; memoized since the same words and bigrams recur constantly."""
+    slot = _slots.get((term, dim))
+    if slot is None:
+        if len(_slots) > 2_000_000:
+            _slots.clear()
+        h = zlib.crc32(term.encode())
+        slot = _slots[(term, dim)] = (h % dim, -1.0 if h & 0x80000000 else 1.0)
+    return slot
+
+
+def hashed_embeddings(texts, dim=DIM):
+    """Signed hashed bag of words + bigrams, L2-normalized, shape (len(texts), dim)."""
+    flat, signs = [], []
+    for row, text in enumerate(texts):
+        words = TOKEN.findall(str(text).lower())
+        base = row * dim
+        for term in chain(words, map(" ".join, zip(words, words[1:]))):
+            column, sign = _slot(term, dim)
+            flat.append(base + column)
+            signs.append(sign)
+    vectors = np.bincount(np.array(flat, dtype=np.int64), weights=signs, minlength=len(texts) * dim)
+    vectors = vectors.reshape(len(texts), dim).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embed_batched(texts, embed_fn=hashed_embeddings, batch=EMBED_BATCH):
+    texts = list(texts)
+    return np.vstack([np.asarray(embed_fn(texts[i:i + batch]), np.float32) for i in range(0, len(texts), batch)])
+
+
+def spherical_kmeans(vectors, k, iterations=KMEANS_ITERATIONS, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)]
+    k = min(k, len(sample))
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]    # reseed empty clusters
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms == 0, 1, norms)
+    return centroids.astype(np.float32)
+
+
+def assign(vectors, centroids):
+    return np.concatenate([np.argmax(vectors[i:i + SEARCH_BATCH] @ centroids.T, axis=1)
+                           for i in range(0, len(vectors), SEARCH_BATCH)]) if len(vectors) else np.zeros(0, int)
+
+
+def _top_k(scores, k):
+    k = min(k, len(scores))
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+class VectorIndex:
+    def __init__(self, dim=DIM, embed_fn=None):
+        self.dim = dim
+        self.embed_fn = embed_fn or partial(hashed_embeddings, dim=dim)
+        self.centroids = np.zeros((0, dim), np.float32)
+        self.offsets = np.zeros(1, np.int64)
+        self.vectors = np.zeros((0, dim), np.float32)     # main index, grouped by cluster
+        self.docs = []                                    # [key, text] aligned with self.vectors
+        self.alive = np.zeros(0, bool)
+        self.trained_on = 0
+        self.delta = np.zeros((0, dim), np.float32)       # flat segment for upserts since the last compaction
+        self.delta_docs = []
+        self.delta_alive = np.zeros(0, bool)
+        self.locations = {}                               # key -> ("main" | "delta", row)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def embed(self, texts):
+        return embed_batched(texts, self.embed_fn)
+
+    # Writes
+
+    def upsert(self, keys, texts, vectors=None):
+        """Insert or replace documents; returns the number written."""
+        keys, texts = list(keys), list(texts)
+        if not keys:
+            return 0
+        vectors = self.embed(texts) if vectors is None else np.asarray(vectors, np.float32)
+        self.delete(keys)
+        start = len(self.delta_docs)
+        self.delta = np.vstack([self.delta, vectors]) if len(self.delta) else vectors
+        self.delta_alive = np.concatenate([self.delta_alive, np.ones(len(keys), bool)])
+        for i, (key, text) in enumerate(zip(keys, texts)):
+            if key in self.locations:        # repeated within this batch: the last one wins
+                self.delta_alive[self.locations[key][1]] = False
+            self.delta_docs.append([key, text])
+            self.locations[key] = ("delta", start + i)
+        if len(self.delta_docs) > max(COMPACT_MIN, COMPACT_RATIO * len(self.docs)):
+            self.compact()
+        return len(keys)
+
+    def delete(self, keys):
+        for key in keys:
+            where = self.locations.pop(key, None)
+            if where:
+                (self.alive if where[0] == "main" else self.delta_alive)[where[1]] = False
+
+    def _live(self):
+        """(vectors, docs) of every live document, main index first."""
+        main = np.flatnonzero(self.alive)
+        delta = np.flatnonzero(self.delta_alive)
+        if not len(main) and len(delta) == len(self.delta_docs):
+            return self.delta, list(self.delta_docs)      # bulk load: skip a full copy
+        vectors = np.vstack([np.asarray(self.vectors)[main], self.delta[delta]])
+        return vectors, [self.docs[i] for i in main] + [self.delta_docs[i] for i in delta]
+
+    def compact(self, retrain=False):
+        """Fold the delta segment and tombstones into the clustered main index."""
+        vectors, docs = self._live()
+        if retrain or len(self.centroids) == 0 or len(vectors) > 2 * self.trained_on:
+            if len(vectors):
+                self.centroids = spherical_kmeans(vectors, max(1, int(np.sqrt(len(vectors)))))
+            self.trained_on = len(vectors)
+        labels = assign(vectors, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        self.delta = self.vectors = None      # release the old segments before the sorted copy is made
+        self.vectors = vectors[order]
+        del vectors
+        self.docs = [docs[i] for i in order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(self.centroids)))])
+        self.alive = np.ones(len(self.docs), bool)
+        self.delta, self.delta_docs, self.delta_alive = np.zeros((0, self.dim), np.float32), [], np.zeros(0, bool)
+        self.locations = {key: ("main", i) for i, (key, _) in enumerate(self.docs)}
+
+    # Reads
+
+    def search(self, queries, k=10, nprobe=NPROBE):
+        """For each query text: [(key, text, score), ...] best first."""
+        q = self.embed_fn(list(queries))
+        probe = np.argsort(-(q @ self.centroids.T), axis=1)[:, :nprobe] if len(self.centroids) else None
+        delta_scores = self.delta @ q.T if len(self.delta_docs) else None
+        results = []
+        for qi, vector in enumerate(q):
+            candidates, scores = [], []
+            if probe is not None:
+                idx = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe[qi]])
+                idx = idx[self.alive[idx]]
+                candidates += [self.docs[i] for i in idx]
+                scores.append(np.asarray(self.vectors[idx]) @ vector)
+            if delta_scores is not None:
+                live = np.flatnonzero(self.delta_alive)
+                candidates += [self.delta_docs[i] for i in live]
+                scores.append(delta_scores[live, qi])
+            scores = np.concatenate(scores) if scores else np.zeros(0)
+            results.append([(candidates[i][0], candidates[i][1], float(scores[i])) for i in _top_k(scores, k)]
+                           if len(scores) else [])
+        return results
+
+    def exact_search(self, queries, k=10):
+        """Brute force over every live vector (recall reference for benchmarks)."""
+        vectors, docs = self._live()
+        return [[(docs[i][0], docs[i][1], float(s[i])) for i in _top_k(s, k)]
+                for s in self.embed_fn(list(queries)) @ vectors.T]
+
+    # Persistence
+
+    def save(self, path=INDEX_DIR):
+        """Write the index; the delta segment is saved as is, with tombstoned rows dropped.
+
+        Every file is written to <name>.tmp and renamed over the old one: a loaded index
+        still memory-maps the old vectors.npy, which must not be truncated under it.
+        """
+        os.makedirs(path, exist_ok=True)
+        live = np.flatnonzero(self.delta_alive)
+
+        def replace(name, write):
+            target = os.path.join(path, name)
+            with open(target + ".tmp", "wb") as f:
+                write(f)
+            os.replace(target + ".tmp", target)
+
+        for name, array in (("centroids.npy", self.centroids), ("offsets.npy", self.offsets),
+                            ("vectors.npy", self.vectors), ("alive.npy", self.alive),
+                            ("delta.npy", self.delta[live])):
+            replace(name, partial(np.save, arr=np.asarray(array)))
+        for name, docs in (("docs.jsonl", self.docs), ("delta.jsonl", [self.delta_docs[i] for i in live])):
+            replace(name, lambda f: f.writelines((json.dumps(d) + "\n").encode() for d in docs))
+        # meta.json last: open_index only sees the index once every other file is in place
+        replace("meta.json", lambda f: f.write(json.dumps({"dim": self.dim, "trained_on": self.trained_on,
+                                                            "count": len(self)}).encode()))
+
+    @classmethod
+    def load(cls, path=INDEX_DIR, embed_fn=None):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], embed_fn)
+        index.trained_on = meta["trained_on"]
+        index.centroids = np.load(os.path.join(path, "centroids.npy"))
+        index.offsets = np.load(os.path.join(path, "offsets.npy"))
+        index.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")   # pages in only probed clusters
+        index.alive = np.load(os.path.join(path, "alive.npy"))
+        index.delta = np.load(os.path.join(path, "delta.npy"))
+        for name, target in (("docs.jsonl", index.docs), ("delta.jsonl", index.delta_docs)):
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                target.extend(json.loads(line) for line in f)
+        index.delta_alive = np.ones(len(index.delta_docs), bool)
+        index.locations = {key: ("main", i) for i, (key, _) in enumerate(index.docs) if index.alive[i]}
+        index.locations.update({key: ("delta", i) for i, (key, _) in enumerate(index.delta_docs)})
+        return index
+
+
+def open_index(path=INDEX_DIR, embed_fn=None, dim=DIM):
+    return VectorIndex.load(path, embed_fn) if os.path.exists(os.path.join(path, "meta.json")) \
+        else VectorIndex(dim, embed_fn)
+
+
+def read_source(source):
+    """(keys, texts) of the non-empty texts in one source CSV; keys are 'source:id'."""
+    path, id_column, text_column = SOURCES[source]
+    if not os.path.exists(path):
+        return [], []
+    df = pd.read_csv(path, usecols=[id_column, text_column], dtype=str, keep_default_na=False)
+    df = df[df[text_column].str.strip() != ""]
+    return (source + ":" + df[id_column]).tolist(), df[text_column].tolist()
+
+
+def build(index, sources=SOURCES, refresh=False):
+    """Upsert every source's text; only keys not yet indexed unless refresh."""
+    added = {}
+    for source in sources:
+        keys, texts = read_source(source)
+        if not refresh:
+            new = [i for i, key in enumerate(keys) if key not in index.locations]
+            keys, texts = [keys[i] for i in new], [texts[i] for i in new]
+        added[source] = index.upsert(keys, texts)
+    return added
+
+
+def graph_neighborhoods(hits):
+    """Attach each hit's Neo4j neighbourhood: one UNWIND query per source present in the hits."""
+    from neo4j_conn import read
+    by_source = {}
+    for key, _, _ in hits:
+        source, _, id_ = key.partition(":")
+        by_source.setdefault(source, []).append(id_)
+    context = {}
+    for source, ids in by_source.items():
+        for row in read(NEIGHBORHOODS[source], ids=ids):
+            context[f"{source}:{row.pop('id')}"] = row
+    return context
+
+
+def hybrid_search(index, question, k=10, nprobe=NPROBE):
+    """Vector hits for a question, each merged with its graph neighbourhood, as flat records."""
+    hits = index.search([question], k, nprobe)[0]
+    neighborhoods = graph_neighborhoods(hits)
+    return [{"source": key.partition(":")[0], "score": round(score, 3), "text": text, **neighborhoods.get(key, {})}
+            for key, text, score in hits]
+
+
+def synthetic_texts(n, seed=0):
+    """Comment-like sentences for benchmarks (the generator's Faker sentences plus its stock phrases)."""
+    rng = np.random.default_rng(seed)
+    words = np.array(("patient shift staff night unit care team support nurse manager workload stress break "
+                      "overtime family pain medication safety training rest sleep leadership ward emergency "
+                      "surgery doctor schedule handover equipment pressure recognition feedback peer ethics "
+                      "policy communication tired grateful crisis burnout difficult help morale").split())
+    phrases = ["Felt stressed and unsupported.", "Team pulled together and handled the crisis.",
+               "Peer review highlighted strengths in leadership.", "Struggled communicating with management.",
+               "Appreciated supervisor's recognition.", "Difficult shift but grateful for colleagues.",
+               "Needed more support from peer team.", "Peer feedback: manages patient loads well."]
+    lengths = rng.integers(10, 21, n)
+    picks = rng.integers(0, len(words), lengths.sum())
+    ends = rng.integers(0, len(phrases), n)
+    out, pos = [], 0
+    for length, end in zip(lengths, ends):
+        out.append(" ".join(words[picks[pos:pos + length]]) + ". " + phrases[end])
+        pos += length
+    return out
+
+
+def benchmark(n, queries=200, k=10, nprobe=NPROBE, path=None):
+    t0 = time.perf_counter()
+    texts = synthetic_texts(n)
+    print(f"generated {n:,} texts in {time.perf_counter() - t0:.1f}s")
+    t0 = time.perf_counter()
+    vectors = embed_batched(texts)
+    print(f"embedded in {time.perf_counter() - t0:.1f}s ({n / (time.perf_counter() - t0):,.0f} texts/s)")
+    index = VectorIndex()
+    t0 = time.perf_counter()
+    index.upsert([f"comment:{i}" for i in range(n)], texts, vectors)
+    index.compact()
+    print(f"built IVF ({len(index.centroids)} clusters) in {time.perf_counter() - t0:.1f}s")
+    del vectors
+    if path:
+        index.save(path)
+        index = VectorIndex.load(path)
+    probes = synthetic_texts(queries, seed=1)
+    latencies = []
+    found = []
+    for q in probes:
+        t0 = time.perf_counter()
+        found.append(index.search([q], k, nprobe)[0])
+        latencies.append(time.perf_counter() - t0)
+    exact = index.exact_search(probes[:20], k)
+    recall = np.mean([len({h[0] for h in a} & {h[0] for h in b}) / k for a, b in zip(found, exact)])
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(f"search nprobe={nprobe} k={k}: p50 {p50:.1f}ms  p95 {p95:.1f}ms  recall@{k} {recall:.2f} (vs exact, 20 queries)")
+    t0 = time.perf_counter()
+    index.upsert([f"comment:new{i}" for i in range(1000)], synthetic_texts(1000, seed=2))
+    print(f"upserted 1,000 texts in {(time.perf_counter() - t0) * 1000:.0f}ms (delta segment, no rebuild)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local IVF vector index over nurse / supervisor / comment text.")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="index text from the generated CSVs (incremental)")
+    build_cmd.add_argument("--refresh", action="store_true", help="re-embed texts that are already indexed")
+    build_cmd.add_argument("--compact", action="store_true", help="fold the delta segment into the clusters now")
+    search_cmd = commands.add_parser("search")
+    search_cmd.add_argument("question")
+    search_cmd.add_argument("--k", type=int, default=10)
+    search_cmd.add_argument("--nprobe", type=int, default=NPROBE)
+    search_cmd.add_argument("--graph", action="store_true", help="attach Neo4j neighbourhoods (hybrid retrieval)")
+    bench_cmd = commands.add_parser("benchmark", help="build and query a synthetic index")
+    bench_cmd.add_argument("--n", type=int, default=1_000_000)
+    bench_cmd.add_argument("--nprobe", type=int, default=NPROBE)
+    bench_cmd.add_argument("--save", action="store_true", help="round-trip through --index-dir before querying")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.n, nprobe=args.nprobe, path=args.index_dir if args.save else None)
+        return
+    index = open_index(args.index_dir)
+    if args.command == "build":
+        t0 = time.perf_counter()
+        added = build(index, refresh=args.refresh)
+        if args.compact:
+            index.compact()
+        index.save(args.index_dir)
+        print(f"indexed {added} in {time.perf_counter() - t0:.1f}s; {len(index)} documents in {args.index_dir}")
+    else:
+        if args.graph:
+            for record in hybrid_search(index, args.question, args.k, args.nprobe):
+                print(record)
+        else:
+            for key, text, score in index.search([args.question], args.k, args.nprobe)[0]:
+                print(f"{score:.3f}  {key}  {text[:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Precomputed wellbeing aggregates for dashboards and GraphRAG point lookups.
+
+Vectorized pandas groupbys over shifts.csv, nurses_feedback.csv and
+supervisors_feedback.csv (wide or --normalized layout) produce:
+
+    (:UnitWeek {window_id: "ICU|2025-10-06"})     per unit per ISO week (Monday start):
+        shifts, hours, avg_acuity, avg_patients, overtime_share, responses,
+        pct_high_stress, pct_frequent_burnout, pct_frequent_burnout_4w (rolling
+        4 weeks), pct_drained, pct_intent_to_leave, avg_satisfaction, reviews,
+        avg_performance
+    (:Nurse)-[:HAS_WEEK]->(:NurseWeek {window_id: "N0001|2025-10-06"})
+        the same measures per nurse per week
+    :Nurse properties shift_count, avg_acuity, overtime_share, night_share,
+        feedback_count, pct_high_stress, pct_frequent_burnout,
+        reported_intent_to_leave, avg_satisfaction, avg_performance
+
+Each run recomputes everything in memory (a few seconds for millions of
+shifts), hashes every window row and compares the hashes with the ones saved
+by the previous run. Only new or changed windows are written to Neo4j, and
+windows that disappeared are deleted. When the loader appends a week, only
+that week (plus the next 3 weeks' rolling values) goes over the wire.
+
+Usage (from the repository root, after load_nurses_data.py):
+    python graph_rag/wellbeing_aggregates.py --data-dir nurses_data_v3
+    python graph_rag/wellbeing_aggregates.py --dry-run      # show what would change
+    python graph_rag/wellbeing_aggregates.py --full         # rewrite every window
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from answer_cache import bump_data_version
+from load_nurses_data import write_batches
+from neo4j_conn import close_driver, get_driver, session
+
+DATA_DIR = "nurses_data_v3"
+STATE_DIR = os.path.join(".cache", "wellbeing_aggregates")
+BATCH_SIZE = 5000
+ROLLING_WEEKS = 4
+FREQUENT_BURNOUT = ["Weekly", "Every day"]
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT unit_week_id IF NOT EXISTS FOR (u:UnitWeek) REQUIRE u.window_id IS UNIQUE",
+    "CREATE CONSTRAINT nurse_week_id IF NOT EXISTS FOR (w:NurseWeek) REQUIRE w.window_id IS UNIQUE",
+]
+
+KEYS = {"unit_week": "window_id", "nurse_week": "window_id", "nurse": "nurse_id"}
+
+# name -> (upsert Cypher, delete Cypher); deletes get a list of KEYS[name] values
+WRITES = {
+    "unit_week": ("""
+        UNWIND $rows AS row
+        MERGE (u:UnitWeek {window_id: row.window_id})
+        SET u += row, u.week = date(row.week)
+    """, "UNWIND $rows AS id MATCH (u:UnitWeek {window_id: id}) DETACH DELETE u"),
+    "nurse_week": ("""
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        MERGE (w:NurseWeek {window_id: row.window_id})
+        SET w += row, w.week = date(row.week)
+        MERGE (n)-[:HAS_WEEK]->(w)
+    """, "UNWIND $rows AS id MATCH (w:NurseWeek {window_id: id}) DETACH DELETE w"),
+    "nurse": ("""
+        UNWIND $rows AS row
+        MATCH (n:Nurse {nurse_id: row.nurse_id})
+        SET n += row
+    """, """
+        UNWIND $rows AS id MATCH (n:Nurse {nurse_id: id})
+        REMOVE n.shift_count, n.avg_acuity, n.overtime_share, n.night_share, n.feedback_count, n.pct_high_stress,
+               n.pct_frequent_burnout, n.reported_intent_to_leave, n.avg_satisfaction, n.avg_performance
+    """),
+}
+
+
+def read_inputs(data_dir=DATA_DIR):
+    """Only the columns the aggregates need, one row per graph key; feedback is joined to its shift by shift_id."""
+    shifts = pd.read_csv(os.path.join(data_dir, "shifts.csv"), parse_dates=["date"],
+                         usecols=["shift_id", "nurse_id", "date", "unit", "shift_type", "hours", "patients",
+                                  "acuity", "overtime"])
+    feedback = pd.read_csv(os.path.join(data_dir, "nurses_feedback.csv"),
+                           usecols=["shift_id", "feedback_id", "reported_stress", "burnout_freq",
+                                    "emotionally_drained", "intent_to_leave", "satisfaction"])
+    reviews = pd.read_csv(os.path.join(data_dir, "supervisors_feedback.csv"),
+                          usecols=["shift_id", "feedback_id", "performance_score"])
+    # One row per key, the last one winning, as MERGE leaves it in the graph (and embedded_backend reads it)
+    return (shifts.drop_duplicates("shift_id", keep="last", ignore_index=True),
+            feedback.drop_duplicates("feedback_id", keep="last", ignore_index=True),
+            reviews.drop_duplicates("feedback_id", keep="last", ignore_index=True))
+
+
+def week_start(dates):
+    return (dates - pd.to_timedelta(dates.dt.weekday, unit="D")).dt.strftime("%Y-%m-%d")
+
+
+def _measures(shifts, feedback, reviews, keys):
+    """Per-window measures for one grouping; counts stay 0 where a window has no feedback/reviews."""
+    # observed=True: categorical units only yield the windows that actually occur
+    out = shifts.groupby(keys, observed=True).agg(
+        shifts=("shift_id", "size"), hours=("hours", "sum"), avg_acuity=("acuity", "mean"),
+        avg_patients=("patients", "mean"), overtime_share=("overtime", "mean"))
+    fb = feedback.groupby(keys, observed=True).agg(
+        responses=("feedback_id", "size"), high_stress=("high_stress", "sum"),
+        frequent_burnout=("frequent_burnout", "sum"), drained=("drained", "sum"),
+        intent_to_leave=("intent_to_leave", "sum"), avg_satisfaction=("satisfaction", "mean"))
+    rv = reviews.groupby(keys, observed=True).agg(
+        reviews=("performance_score", "size"), avg_performance=("performance_score", "mean"))
+    out = out.join(fb, how="left").join(rv, how="left")
+    counts = ["responses", "high_stress", "frequent_burnout", "drained", "intent_to_leave", "reviews"]
+    out[counts] = out[counts].fillna(0).astype(np.int64)
+    return out
+
+
+def _pct(part, whole):
+    return (100.0 * part / whole.where(whole > 0)).round(1)
+
+
+def compute_aggregates(shifts, feedback, reviews):
+    """{"unit_week" | "nurse_week" | "nurse": DataFrame}, keyed by KEYS[name]."""
+    shifts = shifts.assign(week=week_start(shifts["date"]), night=shifts["shift_type"].astype(str) == "Night")
+    context = shifts[["shift_id", "nurse_id", "unit", "week"]]
+    feedback = feedback.merge(context, on="shift_id", how="inner").assign(
+        high_stress=lambda d: d["reported_stress"] == "High",
+        frequent_burnout=lambda d: d["burnout_freq"].isin(FREQUENT_BURNOUT),
+        drained=lambda d: d["emotionally_drained"].astype(bool),
+        intent_to_leave=lambda d: d["intent_to_leave"].astype(bool))
+    reviews = reviews.merge(context, on="shift_id", how="inner")
+
+    tables = {}
+    for name, keys in (("unit_week", ["unit", "week"]), ("nurse_week", ["nurse_id", "week"])):
+        m = _measures(shifts, feedback, reviews, keys).reset_index()
+        # Burnout rate over this week and the ROLLING_WEEKS - 1 calendar weeks before it, weighted by responses
+        m = m.sort_values(keys, ignore_index=True).assign(start=lambda d: pd.to_datetime(d["week"]))
+        rolled = (m.groupby(keys[0], observed=True).rolling(f"{7 * ROLLING_WEEKS}D", on="start")
+                  [["frequent_burnout", "responses"]].sum())
+        m["pct_frequent_burnout_4w"] = _pct(pd.Series(rolled["frequent_burnout"].to_numpy()),
+                                            pd.Series(rolled["responses"].to_numpy()))
+        m = m.drop(columns="start")
+        for column, count in (("pct_high_stress", "high_stress"), ("pct_frequent_burnout", "frequent_burnout"),
+                              ("pct_drained", "drained"), ("pct_intent_to_leave", "intent_to_leave")):
+            m[column] = _pct(m[count], m["responses"])
+        m["window_id"] = m[keys[0]].astype(str) + "|" + m["week"]
+        tables[name] = m.round({"avg_acuity": 2, "avg_patients": 2, "overtime_share": 3, "avg_satisfaction": 2,
+                                "avg_performance": 2})
+
+    per_nurse = shifts.groupby("nurse_id").agg(shift_count=("shift_id", "size"), avg_acuity=("acuity", "mean"),
+                                               overtime_share=("overtime", "mean"), night_share=("night", "mean"))
+    fb = feedback.groupby("nurse_id").agg(feedback_count=("feedback_id", "size"), high_stress=("high_stress", "sum"),
+                                          frequent_burnout=("frequent_burnout", "sum"),
+                                          reported_intent_to_leave=("intent_to_leave", "any"),
+                                          avg_satisfaction=("satisfaction", "mean"))
+    rv = reviews.groupby("nurse_id").agg(avg_performance=("performance_score", "mean"))
+    nurse = per_nurse.join(fb, how="left").join(rv, how="left").reset_index()
+    nurse["feedback_count"] = nurse["feedback_count"].fillna(0).astype(np.int64)
+    nurse["reported_intent_to_leave"] = nurse["reported_intent_to_leave"].fillna(False).astype(bool)
+    nurse["pct_high_stress"] = _pct(nurse.pop("high_stress"), nurse["feedback_count"])
+    nurse["pct_frequent_burnout"] = _pct(nurse.pop("frequent_burnout"), nurse["feedback_count"])
+    nurse = nurse.round({"avg_acuity": 2, "overtime_share": 3, "night_share": 3, "avg_satisfaction": 2,
+                         "avg_performance": 2})
+    tables["nurse"] = nurse
+    return tables
+
+
+def row_hashes(df, key):
+    return pd.Series(pd.util.hash_pandas_object(df.drop(columns=key), index=False).to_numpy(),
+                     index=df[key].to_numpy())
+
+
+def diff(name, df, state_dir=STATE_DIR, full=False):
+    """(changed or new rows, keys that no longer exist, current hashes) against the saved state."""
+    current = row_hashes(df, KEYS[name])
+    path = os.path.join(state_dir, f"{name}.csv")
+    if full or not os.path.exists(path):
+        return df, [], current
+    previous = pd.read_csv(path, dtype={"key": str, "hash": np.uint64}).set_index("key")["hash"]
+    before = previous.reindex(current.index)
+    changed = df[(before.isna() | (before.to_numpy() != current.to_numpy())).to_numpy()]
+    removed = previous.index.difference(current.index).tolist()
+    return changed, removed, current
+
+
+def save_state(name, hashes, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    hashes.rename("hash").rename_axis("key").reset_index().to_csv(os.path.join(state_dir, f"{name}.csv"),
+                                                                        index=False)
+
+
+def refresh(driver=None, data_dir=DATA_DIR, state_dir=STATE_DIR, full=False, dry_run=False, batch_size=BATCH_SIZE):
+    """Recompute the aggregates and write only the windows that changed; returns {name: (written, deleted)}."""
+    tables = compute_aggregates(*read_inputs(data_dir))
+    plan = {name: diff(name, df, state_dir, full) for name, df in tables.items()}
+    stats = {name: (len(changed), len(removed)) for name, (changed, removed, _) in plan.items()}
+    if dry_run:
+        return stats
+
+    if any(written or deleted for written, deleted in stats.values()):
+        with session(driver) as s:
+            for statement in CONSTRAINTS:
+                s.run(statement).consume()
+        for name, (changed, removed, hashes) in plan.items():
+            upsert, delete = WRITES[name]
+            write_batches(driver, upsert, changed, batch_size)
+            with session(driver) as s:
+                for start in range(0, len(removed), batch_size):
+                    ids = removed[start:start + batch_size]
+                    s.execute_write(lambda tx: tx.run(delete, rows=ids).consume())
+            save_state(name, hashes, state_dir)
+        bump_data_version()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute per-unit / per-nurse weekly wellbeing aggregates.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--state-dir", default=STATE_DIR, help="where the previous run's window hashes are kept")
+    parser.add_argument("--full", action="store_true", help="rewrite every window (e.g. after a graph reset)")
+    parser.add_argument("--dry-run", action="store_true", help="compute and diff only; do not touch Neo4j")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.dry_run:
+        stats = refresh(data_dir=args.data_dir, state_dir=args.state_dir, full=args.full, dry_run=True)
+    else:
+        try:
+            stats = refresh(get_driver(), args.data_dir, args.state_dir, args.full)
+        finally:
+            close_driver()
+    for name, (written, deleted) in stats.items():
+        print(f"{name:<11} {written:>8} windows written, {deleted:>6} deleted")
+    print(f"done in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark the vectorized health/training generators against the original iterrows loops.
+
+Run from the repository root:
+    python simulated_data/benchmark_health_training.py --nurses 1000 10000 50000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from nurses_shift import (
+    generate_nurses, generate_health, generate_health_loop,
+    generate_training, generate_training_loop,
+)
+
+PAIRS = {
+    "health": (generate_health_loop, generate_health),
+    "training": (generate_training_loop, generate_training),
+}
+
+
+def time_call(fn, nurses, repeat):
+    best, rows = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = len(fn(nurses))
+        best = min(best, time.perf_counter() - t0)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nurses", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'table':<10}{'nurses':>9}{'loop s':>10}{'vector s':>10}{'speedup':>9}{'loop rows':>11}{'vec rows':>10}")
+    for n in args.nurses:
+        np.random.seed(args.seed)
+        random.seed(args.seed)
+        nurses = generate_nurses(n)
+        for table, (loop, vectorized) in PAIRS.items():
+            loop_s, loop_rows = time_call(loop, nurses, args.repeat)
+            vec_s, vec_rows = time_call(vectorized, nurses, args.repeat)
+            print(f"{table:<10}{n:>9}{loop_s:>10.3f}{vec_s:>10.4f}{loop_s / vec_s:>8.0f}x{loop_rows:>11}{vec_rows:>10}")
+
+
+if __name__ == "__main__":
+    main()
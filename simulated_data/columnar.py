@@ -0,0 +1,131 @@
+"""
+Columnar (Parquet / Arrow IPC) output for the simulated tables.
+
+Low-cardinality string columns are dictionary-encoded, dates are stored as
+date32 and booleans as bool. Tables can be written whole or chunk by chunk:
+each column keeps one vocabulary that only ever grows, so every chunk's
+dictionary extends the previous one. Parquet and Arrow IPC files both accept
+that (IPC files allow dictionary deltas but not replacements).
+
+    sink = open_sink("shifts.parquet", "parquet")
+    for chunk in chunks:
+        sink.write(chunk)
+    sink.close()
+
+    shifts = read_arrow("shifts.arrow")    # memory-mapped, zero-copy
+"""
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+MAX_DICTIONARY_RATIO = 0.5    # encode a string column when distinct values <= 50% of rows
+
+
+def _to_arrow(df):
+    """pandas -> Arrow with plain string columns and datetime columns narrowed to date32."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if pa.types.is_dictionary(field.type) or pa.types.is_large_string(field.type):
+            # pandas categoricals are re-encoded against the sink's own vocabulary
+            column = column.cast(pa.string())
+        elif pa.types.is_timestamp(field.type):
+            column = column.cast(pa.date32())
+        if column.type != field.type:
+            table = table.set_column(i, field.name, column)
+    return table
+
+
+class ColumnarSink:
+    """Writes a stream of DataFrame / Arrow chunks to one Parquet or Arrow IPC file."""
+
+    def __init__(self, path, fmt, dictionary_columns=None):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown columnar format {fmt!r}; expected one of {sorted(EXTENSIONS)}")
+        self.path, self.fmt = path, fmt
+        self.dictionary_columns = dictionary_columns   # None: pick from the first chunk
+        self.vocabularies = {}
+        self.schema = None
+        self.writer = None
+        self.empty = None
+        self.rows = 0
+
+    def _pick_dictionary_columns(self, table):
+        picked = []
+        for field in table.schema:
+            if pa.types.is_string(field.type) and table.num_rows:
+                distinct = len(pc.unique(table.column(field.name)))
+                if distinct <= MAX_DICTIONARY_RATIO * table.num_rows:
+                    picked.append(field.name)
+        return picked
+
+    def _encode(self, table):
+        for name in self.dictionary_columns:
+            vocab = self.vocabularies.setdefault(name, {})
+            values = table.column(name).combine_chunks()
+            # New values are appended, so earlier indices never change between chunks
+            for value in pc.unique(values).to_pylist():
+                if value is not None and value not in vocab:
+                    vocab[value] = len(vocab)
+            dictionary = pa.array(list(vocab), pa.string())
+            indices = pc.index_in(values, value_set=dictionary).cast(pa.int32())
+            encoded = pa.DictionaryArray.from_arrays(indices, dictionary)
+            table = table.set_column(table.schema.get_field_index(name), name, encoded)
+        return table
+
+    def _open(self, schema):
+        self.schema = schema
+        if self.fmt == "parquet":
+            self.writer = pq.ParquetWriter(self.path, schema, compression="zstd")
+        else:
+            options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self.writer = ipc.new_file(self.path, schema, options=options)
+
+    def write(self, chunk):
+        table = chunk if isinstance(chunk, pa.Table) else _to_arrow(chunk)
+        if self.writer is None and table.num_rows == 0:
+            # An empty first chunk has no usable types yet; keep it in case nothing else arrives
+            self.empty = table
+            return
+        if self.dictionary_columns is None:
+            self.dictionary_columns = self._pick_dictionary_columns(table)
+        table = self._encode(table)
+        if self.writer is None:
+            self._open(table.schema)
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        self.writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self.writer is None and self.empty is not None:
+            self._open(self.empty.schema)
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path, fmt, dictionary_columns=None):
+    return ColumnarSink(path, fmt, dictionary_columns)
+
+
+def write_table(df, path, fmt, dictionary_columns=None):
+    sink = open_sink(path, fmt, dictionary_columns)
+    sink.write(df)
+    sink.close()
+    return sink.rows
+
+
+def read_arrow(path):
+    """Memory-map an Arrow IPC file: buffers point into the page cache instead of being copied."""
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def read_table(path, columns=None):
+    """Read a .parquet or .arrow file as an Arrow table (Arrow files are memory-mapped)."""
+    if path.endswith(EXTENSIONS["arrow"]):
+        table = read_arrow(path)
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
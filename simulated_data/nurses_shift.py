@@ -1,143 +1,426 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
 
-np.random.seed(42)
-random.seed(42)
+from columnar import EXTENSIONS, open_sink, write_table
+
+OUTPUT_DIR = "nurses_data_v3"
 N_NURSES = 150
 N_SUPERVISORS = 12
+CHUNK_SIZE = 200_000    # rows per write in --stream mode
 
 # 1. nurses.csv - Demographics and professional identity
-nurse_genders = np.random.choice(['Female', 'Male', 'Nonbinary'], N_NURSES, p=[.88,.11,.01])
-nurses = pd.DataFrame({
-    'nurse_id': [f"N{str(i+1).zfill(4)}" for i in range(N_NURSES)],
-    'first_name': np.random.choice(['Alex','Taylor','Jamie','Morgan','Sam','Jordan','Chris','Jess','Drew','Casey'], N_NURSES),
-    'last_name': np.random.choice(['Smith','Brown','Lee','Patel','Garcia','Davis','Chen','Nguyen','Wong','Martinez'], N_NURSES),
-    'gender': nurse_genders,
-    'age': np.random.choice(range(21,65),N_NURSES),
-    'race_ethnicity': np.random.choice(['White','Black','Asian','Hispanic','Other','Multiracial'], N_NURSES, p=[0.73, 0.09, 0.09, 0.07, 0.01, 0.01]), 
-    'education_nurse': np.random.choice(['Diploma','Associate','Baccalaureate','Masters','Doctorate'], N_NURSES, p=[0.04,0.20,0.60,0.13,0.03]),
-    'years_licensed': np.random.choice(range(1,42),N_NURSES),
-    'license_type': np.random.choice(['RN','APRN','LPN'],N_NURSES,p=[0.80,0.13,0.07]),
-    'primary_setting': np.random.choice(['Hospital','Nursing home','Home health','Clinic','Ambulatory'],N_NURSES, p=[0.60,0.13,0.11,0.09,0.07]),
-    'specialty': np.random.choice(['Med-surg','Emergency','Geriatrics','Pediatrics','Psychiatry','Cardiac','Other'],N_NURSES),
-    'multistate_license': np.random.choice([True,False],N_NURSES,p=[.35,.65]),
-    'full_time': np.random.choice([True,False],N_NURSES,p=[.72,.28]),
-    'hire_date': [datetime(2008,1,1) + timedelta(days=random.randint(0, 16*365)) for _ in range(N_NURSES)],
-})
+def generate_nurses(n=N_NURSES):
+    nurse_genders = np.random.choice(['Female', 'Male', 'Nonbinary'], n, p=[.88,.11,.01])
+    return pd.DataFrame({
+        'nurse_id': [f"N{str(i+1).zfill(4)}" for i in range(n)],
+        'first_name': np.random.choice(['Alex','Taylor','Jamie','Morgan','Sam','Jordan','Chris','Jess','Drew','Casey'], n),
+        'last_name': np.random.choice(['Smith','Brown','Lee','Patel','Garcia','Davis','Chen','Nguyen','Wong','Martinez'], n),
+        'gender': nurse_genders,
+        'age': np.random.choice(range(21,65),n),
+        'race_ethnicity': np.random.choice(['White','Black','Asian','Hispanic','Other','Multiracial'], n, p=[0.73, 0.09, 0.09, 0.07, 0.01, 0.01]), 
+        'education_nurse': np.random.choice(['Diploma','Associate','Baccalaureate','Masters','Doctorate'], n, p=[0.04,0.20,0.60,0.13,0.03]),
+        'years_licensed': np.random.choice(range(1,42),n),
+        'license_type': np.random.choice(['RN','APRN','LPN'],n,p=[0.80,0.13,0.07]),
+        'primary_setting': np.random.choice(['Hospital','Nursing home','Home health','Clinic','Ambulatory'],n, p=[0.60,0.13,0.11,0.09,0.07]),
+        'specialty': np.random.choice(['Med-surg','Emergency','Geriatrics','Pediatrics','Psychiatry','Cardiac','Other'],n),
+        'multistate_license': np.random.choice([True,False],n,p=[.35,.65]),
+        'full_time': np.random.choice([True,False],n,p=[.72,.28]),
+        'hire_date': [datetime(2008,1,1) + timedelta(days=random.randint(0, 16*365)) for _ in range(n)],
+    })
 
 # 2. shifts.csv - Timeline, schedule, workload
-shifts_list = []
-for nurse in nurses['nurse_id']:
-    for week in range(40,53):    # simulate last 3 months only for CPU/time
-        dt = datetime(2025,1,1) + timedelta(weeks=week)
-        for s in range(np.random.choice([3,4,5,6])):
-            t0 = dt + timedelta(days=random.choice(range(7)), hours=random.choice([7,19]))
-            shifts_list.append({
-                'shift_id':f"S{nurse}-{t0:%j%H}",
-                'nurse_id':nurse,
-                'date':t0.date(),
-                'unit':np.random.choice(['ICU','Surgery','Medical','ED','Peds']),
-                'shift_type':np.random.choice(['Day','Evening','Night'],p=[.45,.12,.43]),
-                'hours': np.random.choice([8,10,12], p=[.21,.08,.71]),
-                'patients': np.random.randint(2,9),
-                'acuity': np.random.randint(1,11),
-                'admissions': np.random.poisson(1.1),
-                'discharges': np.random.poisson(0.7),
-                'overtime': random.random()<0.09,
-                'call_in': random.random()<0.04,
-            })
-shifts = pd.DataFrame(shifts_list)
+SHIFT_START = datetime(2025,1,1)
+SHIFT_WEEKS = range(40,53)    # last 3 months; range(0,52) simulates a full year
+UNITS = ['ICU','Surgery','Medical','ED','Peds']
+SHIFT_TYPES = ['Day','Evening','Night']
+
+def _distinct_slots(group, n_slots, max_rows=6):
+    """Draw a (day, hour) slot per row, unique within each group so shift_id never repeats."""
+    slot = np.random.randint(0, n_slots, len(group))
+    while True:
+        # Groups are contiguous and hold at most max_rows rows, so comparing
+        # against the previous few rows finds every repeat without sorting
+        dup = np.zeros(len(group), dtype=bool)
+        for lag in range(1, max_rows):
+            dup[lag:] |= (slot[lag:] == slot[:-lag]) & (group[lag:] == group[:-lag])
+        if not dup.any():
+            return slot
+        slot[dup] = np.random.randint(0, n_slots, dup.sum())
+
+def generate_shifts(nurse_ids, weeks=SHIFT_WEEKS, start=SHIFT_START):
+    """Build the shifts table column by column: one batched NumPy draw per field."""
+    nurse_ids = np.asarray(nurse_ids)
+    weeks = np.asarray(weeks)
+    # One group per (nurse, week); rows are laid out group after group like the old nested loop
+    counts = np.random.choice([3,4,5,6], len(nurse_ids) * len(weeks))
+    group = np.repeat(np.arange(len(counts)), counts)
+    n = len(group)
+    week = weeks[group % len(weeks)]
+    slot = _distinct_slots(group, 14)
+    day, hour = slot // 2, np.where(slot % 2, 19, 7)
+    t0 = pd.to_datetime(np.datetime64(start, 'h')
+                        + (week * 7 + day).astype('timedelta64[D]')
+                        + hour.astype('timedelta64[h]'))
+    nurse_idx = group // len(weeks)
+    # shift_id = S{nurse}-{day:03}{hour:02}, assembled from small lookup tables. The day is the
+    # day of the start year and keeps counting past Dec 31, so appended weeks never reuse an id
+    day_number = (t0.normalize() - pd.Timestamp(start.year, 1, 1)).days.to_numpy() + 1
+    prefix = np.char.add(np.char.add('S', nurse_ids.astype(str)), '-')
+    suffix = np.array([f"{d:03d}{h:02d}" for d in range(day_number.max(initial=0) + 1) for h in range(24)])
+    return pd.DataFrame({
+        'shift_id': np.char.add(prefix[nurse_idx], suffix[day_number * 24 + t0.hour]),
+        'nurse_id': nurse_ids[nurse_idx],
+        'date': t0.normalize(),
+        'unit': pd.Categorical.from_codes(np.random.randint(0, len(UNITS), n), UNITS),
+        'shift_type': pd.Categorical.from_codes(np.random.choice(3, n, p=[.45,.12,.43]), SHIFT_TYPES),
+        'hours': np.random.choice([8,10,12], n, p=[.21,.08,.71]),
+        'patients': np.random.randint(2,9, n),
+        'acuity': np.random.randint(1,11, n),
+        'admissions': np.random.poisson(1.1, n),
+        'discharges': np.random.poisson(0.7, n),
+        'overtime': np.random.random(n)<0.09,
+        'call_in': np.random.random(n)<0.04,
+    })
 
 # 3. nurses_feedback.csv - Self-reported wellbeing per shift
-nurses_feedback = shifts.sample(frac=0.6).copy()
-nurses_feedback['feedback_id'] = [f"F{i+1}" for i in range(len(nurses_feedback))]
-nurses_feedback['reported_stress'] = np.random.choice(['Low','Medium','High'],len(nurses_feedback),p=[.38,.41,.21])
-nurses_feedback['reported_fatigue'] = np.random.choice(['None','Moderate','Severe'],len(nurses_feedback),p=[.33,.53,.14])
-nurses_feedback['burnout_freq'] = np.random.choice(['Never','Monthly','Weekly','Every day'],len(nurses_feedback),p=[.19,.19,.27,.35])
-nurses_feedback['emotionally_drained'] = np.random.choice([True,False],len(nurses_feedback),p=[.18,.82])
-nurses_feedback['used_up'] = np.random.choice([True,False],len(nurses_feedback),p=[.23,.77])
-nurses_feedback['workload_change'] = np.random.choice(['More','No change','Less'],len(nurses_feedback),p=[.53,.37,.10])
-nurses_feedback['intent_to_leave'] = np.random.choice([True,False],len(nurses_feedback),p=[.33,.67])
-nurses_feedback['satisfaction'] = np.random.randint(1, 6, size=len(nurses_feedback))
-nurses_feedback['comments'] = ""
+def generate_nurses_feedback(shifts, start_id=1, normalized=False):
+    # Normalized: keep only the shift_id key instead of copying every shift column (see feedback_view)
+    nurses_feedback = (shifts[['shift_id']] if normalized else shifts).sample(frac=0.6).copy()
+    nurses_feedback['feedback_id'] = [f"F{i}" for i in range(start_id, start_id + len(nurses_feedback))]
+    nurses_feedback['reported_stress'] = np.random.choice(['Low','Medium','High'],len(nurses_feedback),p=[.38,.41,.21])
+    nurses_feedback['reported_fatigue'] = np.random.choice(['None','Moderate','Severe'],len(nurses_feedback),p=[.33,.53,.14])
+    nurses_feedback['burnout_freq'] = np.random.choice(['Never','Monthly','Weekly','Every day'],len(nurses_feedback),p=[.19,.19,.27,.35])
+    nurses_feedback['emotionally_drained'] = np.random.choice([True,False],len(nurses_feedback),p=[.18,.82])
+    nurses_feedback['used_up'] = np.random.choice([True,False],len(nurses_feedback),p=[.23,.77])
+    nurses_feedback['workload_change'] = np.random.choice(['More','No change','Less'],len(nurses_feedback),p=[.53,.37,.10])
+    nurses_feedback['intent_to_leave'] = np.random.choice([True,False],len(nurses_feedback),p=[.33,.67])
+    nurses_feedback['satisfaction'] = np.random.randint(1, 6, size=len(nurses_feedback))
+    nurses_feedback['comments'] = ""
+    return nurses_feedback
 
 # 4. supervisors_feedback.csv - Objective/external feedback
-supervisors_feedback = nurses_feedback.sample(frac=0.45).copy()
-supervisors_feedback['supervisor_id'] = [f"SUP{random.randint(1, N_SUPERVISORS)}" for _ in range(len(supervisors_feedback))]
-supervisors_feedback['performance_score'] = np.random.randint(2,6,len(supervisors_feedback))
-supervisors_feedback['reliability'] = np.random.choice(['Below avg','Average','Good','Excellent'],len(supervisors_feedback),p=[.06,.27,.39,.28])
-supervisors_feedback['teamwork'] = np.random.choice(['Low','Moderate','High'],len(supervisors_feedback),p=[.06,.35,.59])
-supervisors_feedback['clinical_decision'] = np.random.choice(['Appropriate','Needs improvement','Outstanding'],len(supervisors_feedback),p=[.69,.15,.16])
-supervisors_feedback['remarks'] = ""
+def generate_supervisors_feedback(nurses_feedback, normalized=False):
+    base = nurses_feedback[['shift_id','feedback_id']] if normalized else nurses_feedback
+    supervisors_feedback = base.sample(frac=0.45).copy()
+    supervisors_feedback['supervisor_id'] = [f"SUP{random.randint(1, N_SUPERVISORS)}" for _ in range(len(supervisors_feedback))]
+    supervisors_feedback['performance_score'] = np.random.randint(2,6,len(supervisors_feedback))
+    supervisors_feedback['reliability'] = np.random.choice(['Below avg','Average','Good','Excellent'],len(supervisors_feedback),p=[.06,.27,.39,.28])
+    supervisors_feedback['teamwork'] = np.random.choice(['Low','Moderate','High'],len(supervisors_feedback),p=[.06,.35,.59])
+    supervisors_feedback['clinical_decision'] = np.random.choice(['Appropriate','Needs improvement','Outstanding'],len(supervisors_feedback),p=[.69,.15,.16])
+    supervisors_feedback['remarks'] = ""
+    return supervisors_feedback
+
+def feedback_view(shifts, nurses_feedback, supervisors_feedback=None):
+    """Rebuild the wide nurses_feedback (or supervisors_feedback) layout from normalized tables.
+
+    Rows are gathered by position through a hash index on the unique key, so the
+    join is a single vectorized take per table and keeps the feedback row order.
+    """
+    def attach(left, right, key):
+        pos = pd.Index(left[key]).get_indexer(right[key])
+        if (pos < 0).any():
+            raise KeyError(f"{(pos < 0).sum()} feedback rows reference an unknown {key}")
+        own = right.drop(columns=[c for c in right.columns if c in left.columns]).reset_index(drop=True)
+        wide = pd.concat([left.take(pos).reset_index(drop=True), own], axis=1)
+        wide.index = right.index
+        return wide
+
+    wide = attach(shifts, nurses_feedback, 'shift_id')
+    return wide if supervisors_feedback is None else attach(wide, supervisors_feedback, 'feedback_id')
 
 # 5. health.csv - Health (including absence/leave, incident)
-health_list = []
-for idx, nurse in nurses.iterrows():
-    for m in range(random.randint(0,4)):
-        absence_start = nurses['hire_date'].iloc[idx] + timedelta(days=random.randint(100,6000))
-        ndays = random.choice([1,2,3,5,7,14])
-        health_list.append({
-            'record_id':f"HL{idx:04d}{m+1}",
-            'nurse_id':nurse.nurse_id,
-            'date': absence_start,
-            'health_status': np.random.choice(['Healthy','Sick','Injured','Exhausted'],p=[.82,.12,.02,.04]),
-            'absence_type': np.random.choice(['None','Sick leave','Vacation','Family','Health incident'],p=[.63,.18,.13,.05,.01]),
-            'days_off': ndays,
-            'return_date': absence_start + timedelta(days=ndays)
-        })
-health = pd.DataFrame(health_list)
+HEALTH_COLUMNS = ['record_id','nurse_id','date','health_status','absence_type','days_off','return_date']
+HEALTH_STATUSES = ['Healthy','Sick','Injured','Exhausted']
+ABSENCE_TYPES = ['None','Sick leave','Vacation','Family','Health incident']
+
+def _expand(counts):
+    """For per-nurse record counts return (row -> nurse position, row -> index within its nurse)."""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, within
+
+def generate_health(nurses):
+    """Vectorized health records: sample counts per nurse, expand with np.repeat, datetime64 dates."""
+    owner, m = _expand(np.random.randint(0, 5, len(nurses)))
+    n = len(owner)
+    hire = nurses['hire_date'].to_numpy().astype('datetime64[D]')
+    absence_start = hire[owner] + np.random.randint(100, 6001, n).astype('timedelta64[D]')
+    ndays = np.random.choice([1,2,3,5,7,14], n)
+    labels = np.char.zfill(nurses.index.to_numpy()[owner].astype(str), 4)
+    return pd.DataFrame({
+        'record_id': np.char.add(np.char.add('HL', labels), (m + 1).astype(str)),
+        'nurse_id': nurses['nurse_id'].to_numpy()[owner],
+        'date': pd.to_datetime(absence_start),
+        'health_status': pd.Categorical.from_codes(np.random.choice(4, n, p=[.82,.12,.02,.04]), HEALTH_STATUSES),
+        'absence_type': pd.Categorical.from_codes(np.random.choice(5, n, p=[.63,.18,.13,.05,.01]), ABSENCE_TYPES),
+        'days_off': ndays,
+        'return_date': pd.to_datetime(absence_start + ndays.astype('timedelta64[D]')),
+    }, columns=HEALTH_COLUMNS)
+
+def generate_health_loop(nurses):
+    """Original row-by-row implementation, kept as the benchmark baseline for generate_health."""
+    health_list = []
+    for idx, nurse in nurses.iterrows():
+        for m in range(random.randint(0,4)):
+            absence_start = nurse.hire_date + timedelta(days=random.randint(100,6000))
+            ndays = random.choice([1,2,3,5,7,14])
+            health_list.append({
+                'record_id':f"HL{idx:04d}{m+1}",
+                'nurse_id':nurse.nurse_id,
+                'date': absence_start,
+                'health_status': np.random.choice(HEALTH_STATUSES,p=[.82,.12,.02,.04]),
+                'absence_type': np.random.choice(ABSENCE_TYPES,p=[.63,.18,.13,.05,.01]),
+                'days_off': ndays,
+                'return_date': absence_start + timedelta(days=ndays)
+            })
+    return pd.DataFrame(health_list, columns=HEALTH_COLUMNS)
 
 # 6. pay.csv - Detailed compensation
-pay = nurses[['nurse_id','primary_setting','specialty','education_nurse','full_time']].copy()
-pay['annual_salary'] = (np.random.normal(88500,17000,len(pay))*(pay.full_time.map({True:1,False:.60}))).astype(int)
-pay['overtime_rate'] = np.random.uniform(1.1,1.8,len(pay))
-pay['bonus'] = np.random.choice([0,500,900,1800], len(pay), p=[.64,.21,.1,.05])
+def generate_pay(nurses):
+    pay = nurses[['nurse_id','primary_setting','specialty','education_nurse','full_time']].copy()
+    pay['annual_salary'] = (np.random.normal(88500,17000,len(pay))*(pay.full_time.map({True:1,False:.60}))).astype(int)
+    pay['overtime_rate'] = np.random.uniform(1.1,1.8,len(pay))
+    pay['bonus'] = np.random.choice([0,500,900,1800], len(pay), p=[.64,.21,.1,.05])
+    return pay
 
 # 7. telehealth.csv - Technology adoption
-telehealth = nurses[['nurse_id']].copy()
-telehealth['used_telehealth'] = np.random.choice([True,False],len(telehealth),p=[.22,.78])
-telehealth['mode'] = np.where(telehealth['used_telehealth'], np.random.choice(['Phone','Video','Text','Mixed'],len(telehealth)), "")
+def generate_telehealth(nurses):
+    telehealth = nurses[['nurse_id']].copy()
+    telehealth['used_telehealth'] = np.random.choice([True,False],len(telehealth),p=[.22,.78])
+    telehealth['mode'] = np.where(telehealth['used_telehealth'], np.random.choice(['Phone','Video','Text','Mixed'],len(telehealth)), "")
+    return telehealth
 
 # 8. training.csv - Ongoing training/education
-trainings = []
-modules = ['Resilience','Infection control','Ethics','Leadership','Tech','Patient Safety','Emergency Response']
-for idx, nurse in nurses.iterrows():
-    for m in np.random.choice(modules, random.randint(1,4), replace=False):
-        trainings.append({
-            'training_id':f"T{idx+1}{m[0:2].upper()}",
-            'nurse_id':nurse.nurse_id,
-            'date': nurse.hire_date + timedelta(days=random.randint(300,5500)),
-            'module': m,
-            'completed': random.random()>0.07,
-            'cert_expiry': datetime(2026,12,31) + timedelta(days=random.randint(0,720)),
-        })
-training = pd.DataFrame(trainings)
+MODULES = ['Resilience','Infection control','Ethics','Leadership','Tech','Patient Safety','Emergency Response']
+MODULE_CODES = np.array([m[0:2].upper() for m in MODULES])
+
+def generate_training(nurses):
+    """Vectorized training records: 1-4 distinct modules per nurse via a per-row random permutation."""
+    owner, rank = _expand(np.random.randint(1, 5, len(nurses)))
+    n = len(owner)
+    # argsort of uniform keys gives each nurse an independent module permutation; take its first k
+    module = np.argsort(np.random.random((len(nurses), len(MODULES))), axis=1)[owner, rank]
+    hire = nurses['hire_date'].to_numpy().astype('datetime64[D]')
+    labels = (nurses.index.to_numpy()[owner] + 1).astype(str)
+    return pd.DataFrame({
+        'training_id': np.char.add(np.char.add('T', labels), MODULE_CODES[module]),
+        'nurse_id': nurses['nurse_id'].to_numpy()[owner],
+        'date': pd.to_datetime(hire[owner] + np.random.randint(300, 5501, n).astype('timedelta64[D]')),
+        'module': pd.Categorical.from_codes(module, MODULES),
+        'completed': np.random.random(n) > 0.07,
+        'cert_expiry': pd.to_datetime(np.datetime64('2026-12-31') + np.random.randint(0, 721, n).astype('timedelta64[D]')),
+    })
+
+def generate_training_loop(nurses):
+    """Original row-by-row implementation, kept as the benchmark baseline for generate_training."""
+    trainings = []
+    for idx, nurse in nurses.iterrows():
+        for m in np.random.choice(MODULES, random.randint(1,4), replace=False):
+            trainings.append({
+                'training_id':f"T{idx+1}{m[0:2].upper()}",
+                'nurse_id':nurse.nurse_id,
+                'date': nurse.hire_date + timedelta(days=random.randint(300,5500)),
+                'module': m,
+                'completed': random.random()>0.07,
+                'cert_expiry': datetime(2026,12,31) + timedelta(days=random.randint(0,720)),
+            })
+    return pd.DataFrame(trainings)
 
 # 9. practice_multistate.csv - Multistate practice info
-practice_multistate = nurses[['nurse_id','multistate_license']].copy()
-practice_multistate['used_multistate_license'] = np.where(practice_multistate['multistate_license'], np.random.choice([True,False],len(practice_multistate)), False)
-practice_multistate['purpose'] = np.where(practice_multistate['used_multistate_license'], np.random.choice(['Telehealth','Education','Disaster response','Other'],len(practice_multistate)), "")
-
-# Save to CSV
-nurses.to_csv("nurses_data_v3/nurses.csv",index=False)
-shifts.to_csv("nurses_data_v3/shifts.csv",index=False)
-nurses_feedback.to_csv("nurses_data_v3/nurses_feedback.csv",index=False)
-supervisors_feedback.to_csv("nurses_data_v3/supervisors_feedback.csv",index=False)
-health.to_csv("nurses_data_v3/health.csv",index=False)
-pay.to_csv("nurses_data_v3/pay.csv",index=False)
-telehealth.to_csv("nurses_data_v3/telehealth.csv",index=False)
-training.to_csv("nurses_data_v3/training.csv",index=False)
-practice_multistate.to_csv("nurses_data_v3/practice_multistate.csv",index=False)
-
-print("\n✓ All files written:")
-print(" - nurses.csv")
-print(" - shifts.csv")
-print(" - nurses_feedback.csv")
-print(" - supervisors_feedback.csv")
-print(" - health.csv")
-print(" - pay.csv")
-print(" - telehealth.csv")
-print(" - training.csv")
-print(" - practice_multistate.csv")
+def generate_practice_multistate(nurses):
+    practice_multistate = nurses[['nurse_id','multistate_license']].copy()
+    practice_multistate['used_multistate_license'] = np.where(practice_multistate['multistate_license'], np.random.choice([True,False],len(practice_multistate)), False)
+    practice_multistate['purpose'] = np.where(practice_multistate['used_multistate_license'], np.random.choice(['Telehealth','Education','Disaster response','Other'],len(practice_multistate)), "")
+    return practice_multistate
+
+NURSE_TABLES = {
+    "health": generate_health,
+    "pay": generate_pay,
+    "telehealth": generate_telehealth,
+    "training": generate_training,
+    "practice_multistate": generate_practice_multistate,
+}
+
+# Streaming: build each table in fixed-size chunks and append them to disk as they are produced
+def iter_shift_chunks(nurses, chunk_size=CHUNK_SIZE, weeks=SHIFT_WEEKS, normalized=False, start_id=1):
+    """Yield (shifts, nurses_feedback, supervisors_feedback) for batches of about chunk_size shifts."""
+    per_nurse = 4.5 * len(weeks)    # mean of choice([3,4,5,6]) shifts per week
+    batch = max(1, int(chunk_size // per_nurse))
+    next_feedback_id = start_id
+    for start in range(0, len(nurses), batch):
+        shifts = generate_shifts(nurses['nurse_id'].iloc[start:start + batch], weeks)
+        nurses_feedback = generate_nurses_feedback(shifts, start_id=next_feedback_id, normalized=normalized)
+        next_feedback_id += len(nurses_feedback)
+        yield shifts, nurses_feedback, generate_supervisors_feedback(nurses_feedback, normalized)
+
+def iter_nurse_chunks(nurses, generate, chunk_size=CHUNK_SIZE):
+    """Yield a per-nurse table generated chunk_size nurses at a time."""
+    for start in range(0, len(nurses), chunk_size):
+        yield generate(nurses.iloc[start:start + chunk_size])
+
+def table_path(output_dir, name, fmt):
+    return os.path.join(output_dir, name + (".csv" if fmt == "csv" else EXTENSIONS[fmt]))
+
+def append_chunk(df, path, first):
+    df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+def write_streamed(nurses, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE, weeks=SHIFT_WEEKS, fmt="csv", normalized=False):
+    """Write every table chunk by chunk; peak memory is bounded by chunk_size, not by total rows."""
+    counts, sinks = {}, {}
+    def emit(name, df):
+        path = table_path(output_dir, name, fmt)
+        if fmt == "csv":
+            append_chunk(df, path, name not in counts)
+        else:
+            if name not in sinks:
+                sinks[name] = open_sink(path, fmt)
+            sinks[name].write(df)
+        counts[name] = counts.get(name, 0) + len(df)
+
+    try:
+        emit("nurses", nurses)
+        for shifts, nurses_feedback, supervisors_feedback in iter_shift_chunks(nurses, chunk_size, weeks, normalized):
+            emit("shifts", shifts)
+            emit("nurses_feedback", nurses_feedback)
+            emit("supervisors_feedback", supervisors_feedback)
+        for name, generate in NURSE_TABLES.items():
+            for df in iter_nurse_chunks(nurses, generate, chunk_size):
+                emit(name, df)
+    finally:
+        for sink in sinks.values():
+            sink.close()
+    return counts
+
+# Incremental: continue an existing CSV dataset week by week
+APPENDED_TABLES = ["shifts", "nurses_feedback", "supervisors_feedback"]
+
+def dataset_format(output_dir):
+    """Format ("csv", "parquet" or "arrow") of the shifts table in output_dir, or None if there is none."""
+    for fmt in ["csv", *EXTENSIONS]:
+        if os.path.exists(table_path(output_dir, "shifts", fmt)):
+            return fmt
+    return None
+
+def last_simulated_week(output_dir, start=SHIFT_START):
+    """Index (weeks after start) of the latest shift in output_dir/shifts.csv."""
+    dates = pd.read_csv(table_path(output_dir, "shifts", "csv"), usecols=['date'], parse_dates=['date'])['date']
+    if dates.empty:
+        raise ValueError(f"{output_dir}/shifts.csv has no shifts to continue from")
+    return (dates.max() - pd.Timestamp(start)).days // 7
+
+def next_feedback_id(output_dir):
+    ids = pd.read_csv(table_path(output_dir, "nurses_feedback", "csv"), usecols=['feedback_id'])['feedback_id']
+    return int(ids.str[1:].astype(int).max()) + 1 if len(ids) else 1
+
+def append_weeks(output_dir=OUTPUT_DIR, n_weeks=1, chunk_size=CHUNK_SIZE, delta_dir=None, start=SHIFT_START):
+    """Simulate the n_weeks after the last one in output_dir and append them to its CSVs.
+
+    Uses the existing nurse roster, continues feedback ids and keeps the existing
+    column layout (wide or normalized). The new rows alone are also written to
+    delta_dir (default output_dir/deltas/<first new day>), ready for the loader.
+    Returns (rows per table, delta_dir).
+    """
+    fmt = dataset_format(output_dir)
+    if fmt != "csv":
+        raise ValueError(f"{output_dir} has no shifts.csv" if fmt is None else
+                         f"{output_dir} was written with --format {fmt}; only CSV datasets can be appended to")
+    nurses = pd.read_csv(table_path(output_dir, "nurses", "csv"), usecols=['nurse_id'])
+    headers = {name: pd.read_csv(table_path(output_dir, name, "csv"), nrows=0).columns.tolist()
+               for name in APPENDED_TABLES}
+    normalized = 'nurse_id' not in headers["nurses_feedback"]
+    first_week = last_simulated_week(output_dir, start) + 1
+    weeks = range(first_week, first_week + n_weeks)
+    delta_dir = delta_dir or os.path.join(output_dir, "deltas",
+                                          (start + timedelta(weeks=first_week)).strftime("%Y-%m-%d"))
+    os.makedirs(delta_dir, exist_ok=True)
+
+    counts = dict.fromkeys(APPENDED_TABLES, 0)
+    chunks = iter_shift_chunks(nurses, chunk_size, weeks, normalized, start_id=next_feedback_id(output_dir))
+    for i, tables in enumerate(chunks):
+        for name, df in zip(APPENDED_TABLES, tables):
+            if set(df.columns) != set(headers[name]):
+                raise ValueError(f"{name}.csv columns differ from what this version generates; regenerate the dataset")
+            df = df[headers[name]]
+            append_chunk(df, table_path(output_dir, name, "csv"), first=False)
+            append_chunk(df, table_path(delta_dir, name, "csv"), first=i == 0)
+            counts[name] += len(df)
+    return counts, delta_dir
+
+def write_all(tables, output_dir=OUTPUT_DIR, fmt="csv"):
+    for name, df in tables.items():
+        if fmt == "csv":
+            df.to_csv(table_path(output_dir, name, fmt), index=False)
+        else:
+            write_table(df, table_path(output_dir, name, fmt), fmt)
+    return {name: len(df) for name, df in tables.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the nurses_data_v3 tables.")
+    parser.add_argument("--nurses", type=int, default=N_NURSES)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stream", action="store_true", help="generate and append tables in chunks instead of in memory")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk in --stream mode")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="parquet/arrow write dictionary-encoded categoricals with date and bool types")
+    parser.add_argument("--normalized", action="store_true",
+                        help="feedback tables keep only shift_id/feedback_id plus their own columns")
+    parser.add_argument("--append-weeks", type=int, metavar="N",
+                        help="continue the CSVs in --output-dir by N weeks of shifts and feedback instead of regenerating")
+    parser.add_argument("--delta-dir", help="where --append-weeks also writes just the new rows "
+                                            "(default: <output-dir>/deltas/<first new day>)")
+    args = parser.parse_args()
+
+    if args.append_weeks is not None:
+        if args.append_weeks < 1:
+            parser.error("--append-weeks must be at least 1")
+        existing = dataset_format(args.output_dir)
+        if existing is None:
+            parser.error(f"--append-weeks needs an existing dataset; {args.output_dir} has no shifts table")
+        if existing != "csv":
+            parser.error(f"{args.output_dir} was written with --format {existing}; --append-weeks only continues CSVs")
+        if args.format != "csv":
+            parser.error("--append-weeks continues the CSV output; parquet/arrow files cannot be appended to")
+        # Offset the seed by the week so successive appends do not replay the same draws
+        first_week = last_simulated_week(args.output_dir) + 1
+        np.random.seed(args.seed + first_week)
+        random.seed(args.seed + first_week)
+        counts, delta_dir = append_weeks(args.output_dir, args.append_weeks, args.chunk_size, args.delta_dir)
+        print(f"\n✓ Appended {args.append_weeks} week(s) to {args.output_dir}:")
+        for name, n in counts.items():
+            print(f" - {name}.csv (+{n} rows)")
+        print(f"New rows only: {delta_dir}\n"
+              f"  python graph_rag/load_nurses_data.py --data-dir {delta_dir} --aggregates-dir {args.output_dir}")
+        return
+
+    np.random.seed(args.seed)
+    random.seed(args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    nurses = generate_nurses(args.nurses)
+    if args.stream:
+        counts = write_streamed(nurses, args.output_dir, args.chunk_size, fmt=args.format, normalized=args.normalized)
+    else:
+        shifts = generate_shifts(nurses['nurse_id'])
+        nurses_feedback = generate_nurses_feedback(shifts, normalized=args.normalized)
+        tables = {
+            "nurses": nurses,
+            "shifts": shifts,
+            "nurses_feedback": nurses_feedback,
+            "supervisors_feedback": generate_supervisors_feedback(nurses_feedback, args.normalized),
+        }
+        for name, generate in NURSE_TABLES.items():
+            tables[name] = generate(nurses)
+        counts = write_all(tables, args.output_dir, args.format)
+
+    print("\n✓ All files written:")
+    for name, n in counts.items():
+        print(f" - {os.path.basename(table_path(args.output_dir, name, args.format))} ({n} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
-from neo4j import GraphDatabase
+import os
+import sys
 import openai
 
-# Neo4j connection
-driver = GraphDatabase.driver("neo4j://127.0.0.1:7687", auth=("neo4j", "umbc2024"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph_rag"))
+from neo4j_conn import execute_read, get_driver
+
+# Neo4j connection (pooled, created here rather than on import of neo4j_conn)
+get_driver("neo4j://127.0.0.1:7687", auth=("neo4j", "umbc2024"))
 
 # Example: Query for a student's relevant courses
 def get_student_context(tx, student_name):
@@ -17,8 +21,7 @@ def get_student_context(tx, student_name):
     result = tx.run(query, student_name=student_name)
     return [record.data() for record in result]
 
-with driver.session() as session:
-    context = session.read_transaction(get_student_context, "Alice")
+context = execute_read(get_student_context, "Alice")
 
 # Format context for LLM
 context_str = "\n".join([
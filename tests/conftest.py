@@ -0,0 +1,30 @@
+"""The repo's modules are scripts that import their siblings by name; put their directories on sys.path."""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("graph_rag", "backend", "simulated_data", "benchmarks"):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+
+@pytest.fixture(scope="session")
+def small_dataset(tmp_path_factory):
+    """A 12-nurse nurses_data_v3 from the simulator, shared by the session; copy it before changing it."""
+    import nurses_shift
+
+    np.random.seed(7)
+    random.seed(7)
+    nurses = nurses_shift.generate_nurses(12)
+    shifts = nurses_shift.generate_shifts(nurses["nurse_id"])
+    nurses_feedback = nurses_shift.generate_nurses_feedback(shifts)
+    tables = {"nurses": nurses, "shifts": shifts, "nurses_feedback": nurses_feedback,
+              "supervisors_feedback": nurses_shift.generate_supervisors_feedback(nurses_feedback)}
+    tables.update((name, generate(nurses)) for name, generate in nurses_shift.NURSE_TABLES.items())
+    path = tmp_path_factory.mktemp("nurses_data_v3")
+    nurses_shift.write_all(tables, str(path))
+    return str(path)
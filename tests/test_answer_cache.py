@@ -0,0 +1,94 @@
+"""AnswerCache: TTL expiry, LRU eviction, data_version invalidation and the semantic tier."""
+
+import pytest
+
+import answer_cache
+from answer_cache import AnswerCache, bump_data_version
+
+QUERY = "MATCH (n:Nurse {unit: $unit}) RETURN n.nurse_id"
+CONTEXT = "unit=ICU\nnurse_id | night_shifts\nN0001 | 12"
+ROUTE = ("night_shifts", {"unit": "ICU"})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def prompt(question):
+    return f"Graph data:\n{CONTEXT}\nQuestion: {question}\nAnswer:"
+
+
+def test_entries_expire_after_their_ttl(path, clock):
+    cache = AnswerCache(path, context_ttl=10, answer_ttl=20)
+    cache.put_context(QUERY, {"unit": "ICU"}, [{"n.nurse_id": "N0001"}])
+    cache.put_answer("q", prompt("q"), CONTEXT, "answer", ROUTE)
+
+    clock.now += 10
+    assert cache.get_context(QUERY, {"unit": "ICU"}) == [{"n.nurse_id": "N0001"}]
+    clock.now += 1
+    assert cache.get_context(QUERY, {"unit": "ICU"}) is None
+    assert cache.get_answer("q", prompt("q"), CONTEXT, ROUTE) == "answer"
+    clock.now += 10
+    assert cache.get_answer("q", prompt("q"), CONTEXT, ROUTE) is None
+
+    cache.put_context(QUERY, {"unit": "ED"}, [])    # writing sweeps the expired rows
+    assert cache.stats()["context_rows"] == 1 and cache.counters["expired"] == 1
+
+
+def test_least_recently_used_rows_are_evicted(path, clock):
+    cache = AnswerCache(path, max_entries=3)
+    for unit in ("ICU", "ED", "Peds"):
+        clock.now += 1
+        cache.put_context(QUERY, {"unit": unit}, [unit])
+    clock.now += 1
+    assert cache.get_context(QUERY, {"unit": "ICU"}) == ["ICU"]    # now more recent than ED
+
+    clock.now += 1
+    cache.put_context(QUERY, {"unit": "Surgery"}, ["Surgery"])
+    assert cache.get_context(QUERY, {"unit": "ED"}) is None
+    for unit in ("ICU", "Peds", "Surgery"):
+        assert cache.get_context(QUERY, {"unit": unit}) == [unit]
+    assert cache.counters["evictions"] == 1 and cache.stats()["context_rows"] == 3
+
+
+def test_data_version_bump_invalidates_both_levels(path, clock):
+    cache = AnswerCache(path)
+    cache.put_context(QUERY, {"unit": "ICU"}, ["ICU"])
+    cache.put_answer("q", prompt("q"), CONTEXT, "old answer", ROUTE)
+
+    assert bump_data_version(path) == 1    # what the loader does after writing
+    assert cache.get_context(QUERY, {"unit": "ICU"}) is None
+    assert cache.get_answer("q", prompt("q"), CONTEXT, ROUTE) is None
+
+    cache.put_answer("q", prompt("q"), CONTEXT, "new answer", ROUTE)
+    assert cache.get_answer("q", prompt("q"), CONTEXT, ROUTE) == "new answer"
+    assert cache.stats()["data_version"] == 1
+
+
+def test_semantic_hits_are_opt_in_and_scoped_to_the_route(path, clock):
+    asked, similar = "Which ICU nurses work the most night shifts?", "which ICU nurses work most night shifts"
+    exact_only = AnswerCache(path)
+    exact_only.put_answer(asked, prompt(asked), CONTEXT, "answer", ROUTE)
+    assert exact_only.get_answer(similar, prompt(similar), CONTEXT, ROUTE) is None
+
+    semantic = AnswerCache(path, similarity=0.9)
+    assert semantic.get_answer(similar, prompt(similar), CONTEXT, ROUTE) == "answer"
+    assert semantic.get_answer(similar, prompt(similar), CONTEXT, ("night_shifts", {"unit": "ED"})) is None
+    assert semantic.get_answer(similar, prompt(similar), CONTEXT + "\nN0002 | 9", ROUTE) is None
+    assert semantic.counters["semantic_hits"] == 1
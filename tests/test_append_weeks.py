@@ -0,0 +1,66 @@
+"""nurses_shift --append-weeks: ids keep counting past the existing data; non-CSV datasets are refused."""
+
+import os
+import random
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import nurses_shift
+
+
+@pytest.fixture
+def data_dir(small_dataset, tmp_path):
+    path = tmp_path / "data"
+    shutil.copytree(small_dataset, path)
+    return str(path)
+
+
+def read(data_dir, name):
+    return pd.read_csv(os.path.join(data_dir, f"{name}.csv"), parse_dates=["date"] if name == "shifts" else None)
+
+
+def day_number(shift_ids):
+    return shift_ids.str.split("-").str[1].str[:3].astype(int)
+
+
+def test_append_one_week_continues_ids(data_dir, tmp_path):
+    before = {name: read(data_dir, name) for name in nurses_shift.APPENDED_TABLES}
+    np.random.seed(1)
+    random.seed(1)
+    counts, delta_dir = nurses_shift.append_weeks(data_dir, 1, delta_dir=str(tmp_path / "delta"))
+
+    after = {name: read(data_dir, name) for name in nurses_shift.APPENDED_TABLES}
+    delta = {name: read(delta_dir, name) for name in nurses_shift.APPENDED_TABLES}
+    for name in nurses_shift.APPENDED_TABLES:
+        assert counts[name] == len(delta[name]) > 0
+        assert len(after[name]) == len(before[name]) + counts[name]
+        assert list(after[name].columns) == list(before[name].columns)
+
+    old, new = before["shifts"], delta["shifts"]
+    last = old["date"].max()
+    assert new["date"].min() > last and (new["date"].max() - last).days <= 7 + 6
+    assert after["shifts"]["shift_id"].is_unique
+    assert day_number(new["shift_id"]).min() > day_number(old["shift_id"]).max()
+
+    old_ids = before["nurses_feedback"]["feedback_id"].str[1:].astype(int)
+    new_ids = delta["nurses_feedback"]["feedback_id"].str[1:].astype(int)
+    assert new_ids.tolist() == list(range(old_ids.max() + 1, old_ids.max() + 1 + len(new_ids)))
+    assert after["nurses_feedback"]["feedback_id"].is_unique
+    assert set(delta["supervisors_feedback"]["feedback_id"]) <= set(delta["nurses_feedback"]["feedback_id"])
+
+
+def test_columnar_dataset_is_refused(data_dir, tmp_path, monkeypatch, capsys):
+    parquet = str(tmp_path / "parquet")
+    os.makedirs(parquet)
+    nurses_shift.write_all({"shifts": read(data_dir, "shifts")}, parquet, "parquet")
+    with pytest.raises(ValueError, match="--format parquet"):
+        nurses_shift.append_weeks(parquet, 1)
+
+    monkeypatch.setattr(sys, "argv", ["nurses_shift.py", "--output-dir", parquet, "--append-weeks", "1"])
+    with pytest.raises(SystemExit):
+        nurses_shift.main()
+    assert "was written with --format parquet" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+"""batch_summaries.run with a fake fetch and a stub client: packing, fallback, resume and stats."""
+
+import asyncio
+import json
+import re
+
+import batch_summaries
+from llm_client import CONCURRENCY, LLMClient
+from llm_stub_server import start_stub_server
+
+IDS = [f"N{i:04d}" for i in range(10)]
+DONE = IDS[:3]
+DROPPED = "N0005"    # left out of its packed answer
+
+
+def fetch(ids):
+    return [{"nurse_id": i, "shifts": 20 + n, "night_shifts": n, "avg_satisfaction": 3.5} for n, i in enumerate(ids)]
+
+
+class StubClient:
+    def __init__(self):
+        self.prompts = []
+        self.limits = set()
+
+    def limiter(self, concurrency=None):
+        return asyncio.Semaphore(concurrency)
+
+    async def agenerate(self, prompt, limit=None):
+        self.prompts.append(prompt)
+        self.limits.add(limit)
+        async with limit:
+            await asyncio.sleep(0)
+        ids = re.findall(r"N\d{4}", prompt)
+        if prompt.startswith(batch_summaries.PROMPT[:40]):
+            return "```json\n" + json.dumps({i: f"packed note on {i}" for i in ids if i != DROPPED}) + "\n```"
+        return f"single note on {ids[0]}"
+
+
+def written(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_packs_falls_back_and_resumes(tmp_path):
+    output = tmp_path / "summaries.jsonl"
+    output.write_text("".join(json.dumps({"nurse_id": i, "summary": "earlier run"}) + "\n" for i in DONE))
+    client = StubClient()
+
+    stats = asyncio.run(batch_summaries.run(IDS, str(output), per_prompt=3, concurrency=2, client=client, fetch=fetch))
+
+    # 7 pending nurses pack into groups of 3, 3 and 1; the single nurse gets the one-nurse prompt
+    packed = [p for p in client.prompts if p.startswith(batch_summaries.PROMPT[:40])]
+    assert [len(re.findall(r"N\d{4}", p)) for p in packed] == [3, 3]
+    assert not any(i in p for i in DONE for p in client.prompts)
+    assert len(client.limits) == 1    # every prompt shares the run's limit
+    assert stats == {"skipped": 3, "queries": 1, "prompts": 4, "single_retries": 1, "failed_prompts": 0, "written": 7}
+
+    lines = written(output)
+    assert sorted(line["nurse_id"] for line in lines) == IDS
+    summaries = {line["nurse_id"]: line["summary"] for line in lines}
+    assert summaries[DROPPED] == f"single note on {DROPPED}"
+    assert summaries["N0009"] == "single note on N0009"
+    assert summaries["N0003"] == "packed note on N0003"
+
+    again = asyncio.run(batch_summaries.run(IDS, str(output), client=StubClient(), fetch=fetch))
+    assert again["skipped"] == len(IDS) and again["prompts"] == 0 and len(written(output)) == len(IDS)
+
+
+def test_run_leaves_the_client_concurrency_alone(tmp_path):
+    server, url = start_stub_server(latency=0.0)
+    try:
+        with LLMClient(url=url) as client:
+            output = str(tmp_path / "summaries.jsonl")
+            stats = asyncio.run(batch_summaries.run(IDS, output, per_prompt=4, concurrency=2, client=client, fetch=fetch))
+            assert client.concurrency == CONCURRENCY
+    finally:
+        server.shutdown()
+    # The stub does not answer with JSON, so every nurse falls back to a prompt of its own
+    assert stats["written"] == len(IDS) and stats["prompts"] == 3 + len(IDS)
+    assert sorted(line["nurse_id"] for line in written(output)) == IDS
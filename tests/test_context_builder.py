@@ -0,0 +1,46 @@
+"""build_context: the token budget, hoisted shared columns and the summary of the rows that were cut."""
+
+import pytest
+
+from context_builder import EMPTY, build_context, estimate_tokens
+
+RECORDS = [
+    {"unit": "ICU", "week": w, "nurse_id": f"N{w:04d}", "responses": 200 + w, "pct_drained": 50.0 + w,
+     "supervisor": "SUP1"}
+    for w in range(1, 121)
+]
+
+
+@pytest.mark.parametrize("budget", [60, 150, 400, 1500])
+def test_output_stays_within_the_budget(budget):
+    context = build_context(RECORDS, budget=budget)
+    assert estimate_tokens(context) <= budget
+    assert sum(estimate_tokens(line) + 1 for line in context.splitlines()) <= budget
+
+
+def test_shared_columns_are_hoisted():
+    lines = build_context(RECORDS[:3]).splitlines()
+    assert lines[0] == "unit=ICU; supervisor=SUP1"
+    assert lines[1] == "week | nurse_id | responses | pct_drained"
+    assert lines[2] == "1 | N0001 | 201 | 51"
+    assert len(lines) == 5    # everything fits: no summary line
+
+
+def test_summary_line_reports_the_dropped_rows():
+    lines = build_context(RECORDS, budget=150).splitlines()
+    rows = lines[2:-1]
+    assert 0 < len(rows) < len(RECORDS)
+    assert lines[-1] == (f"(showing {len(rows)} of {len(RECORDS)} rows; all rows: week 1..120 mean 60.5, "
+                         "responses 201..320 mean 260.5, pct_drained 51..170 mean 110.5)")
+    assert [row.split(" | ")[1] for row in rows] == [r["nurse_id"] for r in RECORDS[:len(rows)]]    # query order kept
+
+
+def test_rows_matching_the_question_are_kept_first():
+    lines = build_context(RECORDS, question="How is N0117 doing?", budget=60).splitlines()
+    assert lines[2].startswith("117 | N0117 |")
+    assert lines[-1].startswith("(showing ")
+
+
+def test_empty_and_single_records():
+    assert build_context([]) == EMPTY
+    assert build_context([{"unit": "ICU", "flag": True, "score": None}]) == "unit | flag | score\nICU | yes | "
@@ -0,0 +1,242 @@
+"""EmbeddedBackend: each template against a plain-Python reading of its Cypher, and the pickle cache."""
+
+import csv
+import datetime
+import math
+import os
+import re
+import shutil
+from collections import defaultdict
+
+import pytest
+
+import embedded_backend
+import wellbeing_aggregates
+from query_router import TEMPLATES
+
+
+def value(text):
+    """A CSV cell as the loader sends it: empty is null, then bool, int, float or str."""
+    if text == "":
+        return None
+    if text in ("True", "False"):
+        return text == "True"
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def cypher_round(x, digits=0):
+    """Neo4j's round(): halves go away from zero (Python's round() goes to even)."""
+    scale = 10 ** digits
+    return math.floor(abs(x) * scale + 0.5) / scale * (1 if x >= 0 else -1)
+
+
+class Graph:
+    """The nodes and relationships load_nurses_data MERGEs, as dicts; the last row for a key wins."""
+
+    def __init__(self, data_dir):
+        def nodes(name, key):
+            with open(os.path.join(data_dir, f"{name}.csv"), newline="") as f:
+                return {row[key]: {c: value(v) for c, v in row.items()} for row in csv.DictReader(f)}
+
+        self.nurses = nodes("nurses", "nurse_id")
+        self.shifts = {k: s for k, s in nodes("shifts", "shift_id").items() if s["nurse_id"] in self.nurses}
+        self.feedback = {k: f for k, f in nodes("nurses_feedback", "feedback_id").items()
+                         if f["shift_id"] in self.shifts}
+        self.reviews = {k: r for k, r in nodes("supervisors_feedback", "feedback_id").items()
+                        if r["shift_id"] in self.shifts}
+        self.health = [h for h in nodes("health", "record_id").values() if h["nurse_id"] in self.nurses]
+        self.training = [t for t in nodes("training", "training_id").values() if t["nurse_id"] in self.nurses]
+        tables = wellbeing_aggregates.compute_aggregates(*wellbeing_aggregates.read_inputs(data_dir))
+        self.aggregates = {name: embedded_backend.to_records(df) for name, df in tables.items()}
+
+    def shifts_by_type(self, shift_type, unit, limit):
+        out = {}
+        for s in self.shifts.values():
+            if s["shift_type"] == shift_type and (unit is None or s["unit"] == unit):
+                n = self.nurses[s["nurse_id"]]
+                row = out.setdefault(n["nurse_id"], {"nurse_id": n["nurse_id"], "first_name": n["first_name"],
+                                                     "last_name": n["last_name"], "shifts": 0, "hours": 0})
+                row["shifts"] += 1
+                row["hours"] += s["hours"]
+        return sorted(out.values(), key=lambda r: (-r["shifts"], r["nurse_id"]))[:limit]
+
+    def burnout_trend(self, unit):
+        columns = ["unit", "week", "responses", "pct_frequent_burnout", "pct_frequent_burnout_4w", "pct_drained"]
+        rows = [{c: w[c] for c in columns} for w in self.aggregates["unit_week"] if unit is None or w["unit"] == unit]
+        return sorted(rows, key=lambda r: (r["unit"], r["week"]))
+
+    def overtime_stress(self, unit):
+        groups = defaultdict(list)
+        for f in self.feedback.values():
+            s = self.shifts[f["shift_id"]]
+            if unit is None or s["unit"] == unit:
+                groups[s["overtime"]].append(f)
+
+        def pct(fs, column, level):
+            return cypher_round(100.0 * sum(f[column] == level for f in fs) / len(fs), 1)
+
+        return [{"overtime": overtime, "responses": len(fs), "pct_high_stress": pct(fs, "reported_stress", "High"),
+                 "pct_severe_fatigue": pct(fs, "reported_fatigue", "Severe"),
+                 "avg_satisfaction": cypher_round(sum(f["satisfaction"] for f in fs) / len(fs), 2)}
+                for overtime, fs in sorted(groups.items())]
+
+    def supervisor_scores(self, supervisor_id, unit, limit):
+        groups = defaultdict(list)
+        for r in self.reviews.values():
+            if (supervisor_id is None or r["supervisor_id"] == supervisor_id) and \
+                    (unit is None or self.shifts[r["shift_id"]]["unit"] == unit):
+                groups[r["supervisor_id"]].append(r)
+        rows = [{"supervisor_id": sup, "reviews": len(rs),
+                 "avg_performance": cypher_round(sum(r["performance_score"] for r in rs) / len(rs), 2),
+                 "pct_high_teamwork": cypher_round(100.0 * sum(r["teamwork"] == "High" for r in rs) / len(rs), 1)}
+                for sup, rs in groups.items()]
+        return sorted(rows, key=lambda r: (-r["avg_performance"], r["supervisor_id"]))[:limit]
+
+    def training_expiry(self, days, module, limit):
+        today = datetime.date.today()
+        rows = []
+        for t in self.training:
+            expiry = datetime.date.fromisoformat(t["cert_expiry"])
+            if today <= expiry <= today + datetime.timedelta(days=days) and (module is None or t["module"] == module):
+                n = self.nurses[t["nurse_id"]]
+                rows.append({"nurse_id": n["nurse_id"], "first_name": n["first_name"], "last_name": n["last_name"],
+                             "module": t["module"], "cert_expiry": t["cert_expiry"]})
+        return sorted(rows, key=lambda r: (r["cert_expiry"], r["nurse_id"]))[:limit]
+
+    def intent_to_leave(self, unit):
+        leaving = defaultdict(dict)    # unit -> nurse -> max(intent_to_leave)
+        for f in self.feedback.values():
+            s = self.shifts[f["shift_id"]]
+            if unit is None or s["unit"] == unit:
+                nurses = leaving[s["unit"]]
+                nurses[s["nurse_id"]] = max(nurses.get(s["nurse_id"], 0), int(f["intent_to_leave"]))
+        rows = [{"unit": u, "nurses": len(nurses), "intending_to_leave": sum(nurses.values()),
+                 "pct_intending_to_leave": cypher_round(100.0 * sum(nurses.values()) / len(nurses), 1)}
+                for u, nurses in leaving.items()]
+        return sorted(rows, key=lambda r: -r["pct_intending_to_leave"])
+
+    def health_absences(self, limit):
+        groups = {}
+        for h in self.health:
+            if h["absence_type"] != "None":
+                row = groups.setdefault((h["absence_type"], h["health_status"]), {
+                    "absence_type": h["absence_type"], "health_status": h["health_status"], "records": 0,
+                    "days_off": 0})
+                row["records"] += 1
+                row["days_off"] += h["days_off"]
+        return sorted(groups.values(), key=lambda r: -r["days_off"])[:limit]
+
+    def nurse_profile(self, nurse_id):
+        if nurse_id not in self.nurses:
+            return []
+        n = {**self.nurses[nurse_id], **next((a for a in self.aggregates["nurse"] if a["nurse_id"] == nurse_id), {})}
+        renamed = {"shifts": "shift_count", "feedback": "feedback_count"}
+        return [{c: n.get(renamed.get(c, c)) for c in returned_columns(TEMPLATES["nurse_profile"]["cypher"])}]
+
+
+def returned_columns(cypher):
+    """The names in the RETURN clause: the alias after AS, or the bare variable."""
+    clause = re.split(r"\bRETURN\b", cypher)[-1]
+    clause = re.split(r"\bORDER BY\b", clause)[0]
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(clause):
+        depth += (ch == "(") - (ch == ")")
+        if ch == "," and depth == 0:
+            items.append(clause[start:i])
+            start = i + 1
+    items.append(clause[start:])
+    return [re.split(r"\bAS\b", item)[-1].strip() for item in items]
+
+
+def comparable(rows):
+    return [{c: round(v, 6) if isinstance(v, float) else v for c, v in row.items()} for row in rows]
+
+
+CASES = [
+    ("shifts_by_type", {}),
+    ("shifts_by_type", {"shift_type": "Day", "unit": "ICU", "limit": 3}),
+    ("burnout_trend", {}),
+    ("burnout_trend", {"unit": "ED"}),
+    ("overtime_stress", {}),
+    ("overtime_stress", {"unit": "Medical"}),
+    ("supervisor_scores", {}),
+    ("supervisor_scores", {"unit": "ICU", "limit": 5}),
+    ("training_expiry", {"days": 3650}),
+    ("training_expiry", {"days": 3650, "module": "Resilience", "limit": 3}),
+    ("intent_to_leave", {}),
+    ("intent_to_leave", {"unit": "Surgery"}),
+    ("health_absences", {}),
+    ("nurse_profile", {"nurse_id": "N0003"}),
+    ("nurse_profile", {"nurse_id": "N9999"}),
+]
+
+
+@pytest.fixture(scope="module")
+def graph(small_dataset):
+    return Graph(small_dataset)
+
+
+@pytest.fixture(scope="module")
+def backend(small_dataset, tmp_path_factory):
+    return embedded_backend.EmbeddedBackend(small_dataset, str(tmp_path_factory.mktemp("embedded")))
+
+
+def test_every_template_is_covered():
+    assert {name for name, _ in CASES} == set(TEMPLATES)
+
+
+@pytest.mark.parametrize("name, params", CASES)
+def test_template_matches_its_cypher(graph, backend, name, params):
+    records = backend.run(name, **params)
+    expected = getattr(graph, name)(**{**TEMPLATES[name]["params"], **params})
+    assert expected or params == {"nurse_id": "N9999"}    # every other case exercises some data
+    for record in records:
+        assert list(record) == returned_columns(TEMPLATES[name]["cypher"])
+
+    if name in ("intent_to_leave", "health_absences"):
+        # ORDER BY a single measure: ties may come back in any order
+        key = {"intent_to_leave": "pct_intending_to_leave", "health_absences": "days_off"}[name]
+        assert [r[key] for r in records] == [r[key] for r in expected]
+        records, expected = (sorted(rows, key=lambda r: sorted(r.items(), key=str)) for rows in (records, expected))
+    assert comparable(records) == comparable(expected)
+
+
+@pytest.fixture
+def data_dir(small_dataset, tmp_path):
+    path = tmp_path / "data"
+    shutil.copytree(small_dataset, path)
+    return str(path)
+
+
+def test_pickle_cache_follows_the_source_file(data_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    reads = []
+    read = embedded_backend.EmbeddedBackend._read
+    monkeypatch.setattr(embedded_backend.EmbeddedBackend, "_read",
+                        lambda self, path, name: (reads.append(name), read(self, path, name))[1])
+
+    def load():
+        return embedded_backend.EmbeddedBackend(data_dir, cache_dir).table("nurses")
+
+    nurses = load()
+    assert reads == ["nurses"] and len(os.listdir(cache_dir)) == 1
+    assert load().equals(nurses) and reads == ["nurses"]    # a new process: served from the pickle
+
+    path = os.path.join(data_dir, "nurses.csv")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))    # touched, same content
+    assert load().equals(nurses) and reads == ["nurses"] * 2
+
+    with open(path) as f:
+        rows = f.read().splitlines()
+    with open(path, "w") as f:    # one row fewer, mtime put back: only the size gives it away
+        f.write("\n".join(rows[:-1]) + "\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert len(load()) == len(nurses) - 1 and reads == ["nurses"] * 3
+    assert len(load()) == len(nurses) - 1 and reads == ["nurses"] * 3
+    assert len(os.listdir(cache_dir)) == 1    # rewritten in place, one pickle per source file
@@ -0,0 +1,78 @@
+"""LLMClient against the local stub server: retries, timeouts and the concurrency limits."""
+
+import asyncio
+import time
+
+import pytest
+
+from llm_client import LLMClient, LLMError
+from llm_stub_server import start_stub_server
+
+LATENCY = 0.3
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server, url = start_stub_server(**kwargs)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def test_retry_after_wins_over_backoff(stub):
+    # Every second request fails: 429 with Retry-After first, then 503
+    with LLMClient(url=stub(latency=0.0, fail_every=2, retry_after=1), backoff=0.001) as client:
+        assert client.generate("first").startswith("[stub answer #0]")
+        answer, elapsed = timed(client.generate, "second")
+        assert answer.startswith("[stub answer #2]") and elapsed >= 1.0    # waited the Retry-After second
+        answer, elapsed = timed(client.generate, "third")
+        assert answer.startswith("[stub answer #4]") and elapsed < 0.5    # 503: the short backoff
+        assert client.stats == {"requests": 5, "retries": 2, "failures": 0}
+
+
+def test_gives_up_after_max_retries(stub):
+    with LLMClient(url=stub(latency=0.0, fail_every=1), max_retries=2, backoff=0.001) as client:
+        with pytest.raises(LLMError, match="3 attempts: HTTP 429"):
+            client.generate("never answered")
+        assert client.stats == {"requests": 3, "retries": 2, "failures": 1}
+
+
+def test_read_timeout_is_retried_then_raised(stub):
+    with LLMClient(url=stub(latency=LATENCY), timeout=(1, 0.05), max_retries=1, backoff=0.001) as client:
+        with pytest.raises(LLMError, match="timed out"):
+            client.generate("slow")
+        assert client.stats == {"requests": 2, "retries": 1, "failures": 1}
+
+
+def test_generate_many_keeps_order_and_applies_its_concurrency(stub):
+    prompts = [f"prompt {i}" for i in range(8)]
+    with LLMClient(url=stub(latency=LATENCY), concurrency=4) as client:
+        answers, limited = timed(client.generate_many, prompts)
+        assert [a.rsplit("] ", 1)[1] for a in answers] == prompts
+        assert limited >= 2 * LATENCY    # two waves of 4
+
+        _, wide = timed(client.generate_many, prompts, 8)
+        assert wide < 2 * LATENCY and client.concurrency == 4    # one wave; the client's limit is unchanged
+
+
+def test_semaphore_follows_the_running_loop(stub):
+    with LLMClient(url=stub(latency=LATENCY), concurrency=2) as client:
+        async def burst():
+            return await asyncio.gather(*(client.agenerate(f"prompt {i}") for i in range(4)))
+
+        for _ in range(2):    # each asyncio.run() is a new loop, which gets a semaphore of its own
+            answers, elapsed = timed(asyncio.run, burst())
+            assert len(answers) == 4 and elapsed >= 2 * LATENCY
+            assert len(client._semaphores) == 1
@@ -0,0 +1,122 @@
+"""load_nurses_data.load_all against a driver that records what it is sent."""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import load_nurses_data as loader
+import neo4j_conn
+
+DATABASE = "nursing"
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nurses_data_v3")
+BATCH_SIZE = 700
+WORKERS = 4
+
+
+class RecordingTx:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, parameters=None, **params):
+        with self.driver.lock:
+            self.driver.calls.append(("write", query, params["rows"]))
+        return self
+
+    def consume(self):
+        pass
+
+
+class RecordingSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **params):
+        with self.driver.lock:
+            self.driver.calls.append(("run", query, None))
+        return RecordingTx(self.driver)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(RecordingTx(self.driver), *args, **kwargs)
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.calls = []
+        self.databases = set()
+        self.lock = threading.Lock()
+
+    def session(self, **kwargs):
+        with self.lock:
+            self.databases.add(kwargs.get("database"))
+        return RecordingSession(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def loaded():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(loader, "bump_data_version", lambda: None)
+        mp.setenv("NEO4J_DATABASE", DATABASE)
+        mp.setattr(neo4j_conn, "_settings", None)
+        driver = RecordingDriver()
+        stats = loader.load_all(driver, DATA_DIR, BATCH_SIZE, WORKERS)
+    return driver, stats
+
+
+def table_of(cypher, rows):
+    """Table a batch came from: pay and practice_multistate share a statement, so match the columns too."""
+    for filename, columns, _, query in loader.TABLES:
+        header = columns or pd.read_csv(os.path.join(DATA_DIR, filename), nrows=0).columns.tolist()
+        if query == cypher and set(rows[0]) == set(header):
+            return filename[:-len(".csv")]
+
+
+def test_constraints_come_first(loaded):
+    calls = loaded[0].calls
+    n = len(loader.CONSTRAINTS)
+    assert [query for _, query, _ in calls[:n]] == loader.CONSTRAINTS
+    assert all(kind == "write" for kind, _, _ in calls[n:])
+
+
+def test_batches_respect_batch_size(loaded):
+    calls, stats = loaded[0].calls, loaded[1]
+    batches = [rows for kind, _, rows in calls if kind == "write"]
+    assert batches and all(0 < len(rows) <= BATCH_SIZE for rows in batches)
+    assert sum(map(len, batches)) == sum(rows for rows, _ in stats.values())
+
+
+def test_tables_load_in_dependency_order(loaded):
+    calls, stats = loaded[0].calls, loaded[1]
+    order = []
+    for kind, query, rows in calls:
+        if kind == "write" and (not order or order[-1] != table_of(query, rows)):
+            order.append(table_of(query, rows))
+    assert order == [filename[:-len(".csv")] for filename, *_ in loader.TABLES]    # each table once, in TABLES order
+    assert list(stats) == order
+
+
+def test_writes_use_the_configured_database(loaded):
+    assert loaded[0].databases == {DATABASE}    # the database graph_rag reads from
+
+
+@pytest.mark.parametrize("filename, key", [(filename, key) for filename, _, key, _ in loader.TABLES])
+def test_partition_key_lands_in_one_partition(filename, key):
+    df = pd.read_csv(os.path.join(DATA_DIR, filename), keep_default_na=False, na_values=[""],
+                     dtype={"nurse_id": str, "shift_id": str})
+    parts = loader.partition(df, key, WORKERS)
+    assert sum(map(len, parts)) == len(df)
+    owners = {}
+    for i, part in enumerate(parts):
+        for value in part[key].unique():
+            assert owners.setdefault(value, i) == i
+    assert set(owners) == set(df[key].unique())
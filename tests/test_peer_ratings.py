@@ -0,0 +1,70 @@
+"""iter_peer_ratings (linear in nurses) against the original quadratic generator."""
+
+import random
+from collections import Counter
+
+import pytest
+
+SEED = 7
+NUM_NURSES = 2000
+
+
+@pytest.fixture(scope="module")
+def kg(tmp_path_factory):
+    # data_generate_v2 creates its output directory on import
+    cwd = tmp_path_factory.mktemp("kg")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(cwd)
+        import data_generate_v2
+    return data_generate_v2
+
+
+def legacy_peer_ratings(nurses, teams):
+    """generate_peer_ratings as it was before it was made linear."""
+    ratings = []
+    for team in teams:
+        members = [n for n in nurses if n['team_id'] == team['team_id']]
+        for n1 in members:
+            peers = [n2 for n2 in members if n1['nurse_id'] != n2['nurse_id']]
+            sample_peers = random.sample(peers, min(3, len(peers)))
+            for n2 in sample_peers:
+                ratings.append({
+                    "from_nurse_id": n1['nurse_id'],
+                    "to_nurse_id": n2['nurse_id'],
+                    "rating": random.randint(1, 5),
+                    "review_comment": random.choice([
+                        "Excellent teamwork.", "Needs to improve time management.",
+                        "Great under pressure.", "Supportive to colleagues.",
+                        "Effective leader.", "Could communicate more proactively."
+                    ])
+                })
+    return ratings
+
+
+@pytest.fixture(scope="module")
+def population(kg):
+    kg.seed_everything(SEED)
+    teams = kg.generate_teams()
+    return kg.generate_nurses(NUM_NURSES, kg.generate_clinics(), kg.generate_families(), teams), teams
+
+
+def seeded_ratings(kg, population, generate):
+    kg.seed_everything(SEED)
+    return generate(*population)
+
+
+def test_matches_legacy_ratings(kg, population):
+    new = seeded_ratings(kg, population, kg.generate_peer_ratings)
+    old = seeded_ratings(kg, population, legacy_peer_ratings)
+    assert len(new) == 3 * NUM_NURSES
+    assert new == old    # same random draws in the same order, so the same ratings
+
+
+def test_no_self_ratings_and_peers_share_a_team(kg, population):
+    ratings = seeded_ratings(kg, population, kg.generate_peer_ratings)
+    team = {n["nurse_id"]: n["team_id"] for n in population[0]}
+    assert all(r["from_nurse_id"] != r["to_nurse_id"] for r in ratings)
+    assert all(team[r["from_nurse_id"]] == team[r["to_nurse_id"]] for r in ratings)
+    per_rater = Counter(r["from_nurse_id"] for r in ratings)
+    assert max(per_rater.values()) <= 3
+    assert len({(r["from_nurse_id"], r["to_nurse_id"]) for r in ratings}) == len(ratings)
@@ -0,0 +1,54 @@
+"""query_router: keyword scoring picks the template, extract_params fills its parameters."""
+
+import pytest
+
+from query_router import DEFAULT_TEMPLATE, MAX_LIMIT, TEMPLATES, extract_params, normalize, route_question
+
+ROUTES = [
+    ("Which ICU nurses work the most night shifts?",
+     "shifts_by_type", {"shift_type": "Night", "unit": "ICU", "limit": 10}),
+    ("Top 5 nurses by evening shifts in the emergency room",
+     "shifts_by_type", {"shift_type": "Evening", "unit": "ED", "limit": 5}),
+    ("Show the burnout trend for pediatrics", "burnout_trend", {"unit": "Peds"}),
+    ("How does overtime relate to stress in surgery?", "overtime_stress", {"unit": "Surgery"}),
+    ("How did SUP3 score nurses in the ICU?",
+     "supervisor_scores", {"supervisor_id": "SUP3", "unit": "ICU", "limit": 20}),
+    ("top 500 supervisors by performance",
+     "supervisor_scores", {"supervisor_id": None, "unit": None, "limit": MAX_LIMIT}),
+    ("Whose certifications expire in the next 60 days?", "training_expiry", {"days": 60, "module": None, "limit": 25}),
+    ("Which infection control certificates expire within 2 weeks?",
+     "training_expiry", {"days": 14, "module": "Infection control", "limit": 25}),
+    ("Emergency response training expiring in 3 months",    # the module, not the ED unit
+     "training_expiry", {"days": 90, "module": "Emergency Response", "limit": 25}),
+    ("Which unit has the most nurses intending to quit?", "intent_to_leave", {"unit": None}),
+    ("What are the most common sick leave absences?", "health_absences", {"limit": 20}),
+    ("How is N0007 doing?", "nurse_profile", {"nurse_id": "N0007"}),
+    ("Give me a profile of nurse n 12", "nurse_profile", {"nurse_id": "N0012"}),
+    ("What is the weather like today?", DEFAULT_TEMPLATE, TEMPLATES[DEFAULT_TEMPLATE]["params"]),
+    ("How is nurse doing?", DEFAULT_TEMPLATE, TEMPLATES[DEFAULT_TEMPLATE]["params"]),    # nurse_profile needs an id
+]
+
+
+@pytest.mark.parametrize("question, name, params", ROUTES)
+def test_route_question(question, name, params):
+    route = route_question(question)
+    assert (route.name, route.params) == (name, params)
+    assert route.cypher == TEMPLATES[name]["cypher"]
+
+
+@pytest.mark.parametrize("text, params", [
+    ("top 5", {"limit": 5}),
+    ("worst 1000", {"limit": MAX_LIMIT}),
+    ("next 60 days", {"days": 60}),
+    ("in 1 year", {"days": 365}),
+    ("N0007", {"nurse_id": "N0007"}),
+    ("sup 12", {"supervisor_id": "SUP12"}),
+    ("intensive care overnight", {"unit": "ICU", "shift_type": "Night"}),
+    ("nothing to extract here", {}),
+])
+def test_extract_params(text, params):
+    assert extract_params(normalize(text)) == params
+
+
+def test_case_and_punctuation_share_a_route():
+    assert route_question("WHICH icu nurses work the most NIGHT shifts") == route_question(ROUTES[0][0])
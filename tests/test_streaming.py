@@ -0,0 +1,86 @@
+"""LLMClient.astream and graph_rag_stream against the stub server: order of pieces and answer caching."""
+
+import asyncio
+
+import pytest
+
+import answer_cache
+import graph_rag
+from llm_client import LLMClient
+from llm_stub_server import start_stub_server
+
+RECORDS = [{"nurse_id": f"N{i:04d}", "unit": "ICU", "night_shifts": 40 - i} for i in range(20)]
+QUESTION = "Which ICU nurses work the most night shifts?"
+
+
+async def fake_astream_records(cypher, **params):
+    for record in RECORDS:
+        yield record
+
+
+@pytest.fixture
+def streaming(tmp_path, monkeypatch):
+    server, url = start_stub_server(latency=0.0, token_latency=0.01)
+    client = LLMClient(url=url)
+    cache = answer_cache.AnswerCache(str(tmp_path / "cache.sqlite"))
+    puts = []
+    put_answer = cache.put_answer
+    monkeypatch.setattr(cache, "put_answer", lambda *args: (puts.append(args[3]), put_answer(*args)))
+    monkeypatch.setattr(graph_rag, "get_client", lambda: client)
+    monkeypatch.setattr(graph_rag, "get_cache", lambda: cache)
+    monkeypatch.setattr(graph_rag, "astream_records", fake_astream_records)
+    yield server, client, puts
+    client.close()
+    server.shutdown()
+
+
+def test_astream_yields_pieces_in_order(streaming):
+    _, client, _ = streaming
+    prompt = "how is nurse N0007 doing after three night shifts in a row"
+
+    async def consume():
+        return [piece async for piece in client.astream(prompt)]
+
+    pieces = asyncio.run(consume())
+    assert "".join(pieces) == f"[stub answer #0] {prompt}"
+    assert pieces == ["[stub"] + [" " + word for word in f"answer #0] {prompt}".split(" ")]
+
+
+def test_answer_is_cached_only_after_the_stream_finishes(streaming):
+    server, _, puts = streaming
+
+    async def consume():
+        pieces = []
+        async for piece in graph_rag.graph_rag_stream(QUESTION):
+            pieces.append((piece, len(puts)))
+        return pieces
+
+    pieces = asyncio.run(consume())
+    assert len(pieces) > 1 and all(cached == 0 for _, cached in pieces)    # nothing cached mid-stream
+    answer = "".join(piece for piece, _ in pieces)
+    assert puts == [answer]
+
+    requests = next(server.counter)
+    again = asyncio.run(consume())
+    assert again == [(answer, 1)]    # the whole cached answer as one piece
+    assert next(server.counter) == requests + 1    # and no request to the model
+
+
+def test_answer_is_not_cached_when_the_consumer_stops_early(streaming):
+    _, _, puts = streaming
+
+    async def first_piece():
+        stream = graph_rag.graph_rag_stream(QUESTION)
+        async for piece in stream:
+            break
+        await stream.aclose()
+        return piece
+
+    assert asyncio.run(first_piece())
+    assert not puts
+
+    async def consume():
+        return [piece async for piece in graph_rag.graph_rag_stream(QUESTION)]
+
+    assert len(asyncio.run(consume())) > 1    # streamed again rather than served a partial answer
+    assert len(puts) == 1
@@ -0,0 +1,95 @@
+"""Tracing of graph_rag_stream when the consumer stops reading early."""
+
+import asyncio
+import gc
+import logging
+
+import pytest
+
+import answer_cache
+import graph_rag
+import tracing
+from llm_client import LLMClient
+from llm_stub_server import start_stub_server
+
+RECORDS = [{"nurse_id": f"N{i:04d}", "unit": "ICU", "night_shifts": 40 - i} for i in range(20)]
+STREAM_QUESTION = "Which ICU nurses work the most night shifts?"
+QUERY_QUESTION = "How does overtime relate to stress?"
+
+
+def fake_read(cypher, **params):
+    return list(RECORDS)
+
+
+async def fake_astream_records(cypher, **params):
+    for record in RECORDS:
+        yield record
+
+
+@pytest.fixture
+def traced(tmp_path, monkeypatch):
+    server, url = start_stub_server(latency=0.0, token_latency=0.0)
+    client = LLMClient(url=url)
+    cache = answer_cache.AnswerCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(graph_rag, "get_client", lambda: client)
+    monkeypatch.setattr(graph_rag, "get_cache", lambda: cache)
+    monkeypatch.setattr(graph_rag, "read", fake_read)
+    monkeypatch.setattr(graph_rag, "astream_records", fake_astream_records)
+    tracer = tracing.configure("memory", sample_rate=1.0)
+    yield tracer.exporter
+    tracing.configure(None)
+    client.close()
+    server.shutdown()
+
+
+def by_name(traces):
+    return {t["name"]: t for t in traces}
+
+
+def test_break_after_first_chunk_keeps_traces_separate(traced):
+    async def consume():
+        stream = graph_rag.graph_rag_stream(STREAM_QUESTION)
+        async for _ in stream:
+            break
+        assert tracing._current.get() is None    # the stream's span did not leak into this context
+        await asyncio.to_thread(graph_rag.graph_rag_query, QUERY_QUESTION)
+        await stream.aclose()
+
+    asyncio.run(consume())
+    traces = by_name(traced.traces)
+    assert sorted(traces) == ["graph_rag_query", "graph_rag_stream"]
+    stream = traces["graph_rag_stream"]
+    assert stream["attrs"]["stopped_early"] is True and "error" not in stream["attrs"]
+    gemini = next(s for s in stream["spans"] if s["name"] == "gemini_stream")
+    assert gemini["parent"] == "graph_rag_stream" and gemini["attrs"]["pieces"] == 1
+    assert all(s["name"] != "gemini_stream" for s in traces["graph_rag_query"]["spans"])
+
+
+def test_abandoned_stream_is_finalized_without_context_errors(traced, caplog):
+    async def consume():
+        stream = graph_rag.graph_rag_stream(STREAM_QUESTION)
+        async for _ in stream:
+            break
+        del stream    # no aclose(): the event loop finalizes the generator in a task of its own
+        gc.collect()
+        graph_rag.graph_rag_query(QUERY_QUESTION)
+        await asyncio.sleep(0.2)    # let that task finish before asyncio.run cancels it
+
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        asyncio.run(consume())
+    assert not caplog.records
+    assert sorted(t["name"] for t in traced.traces) == ["graph_rag_query", "graph_rag_stream"]
+    traces = by_name(traced.traces)
+    assert traces["graph_rag_stream"]["attrs"]["stopped_early"] is True
+    assert all("error" not in t["attrs"] for t in traces.values())
+
+
+def test_full_stream_trace(traced):
+    async def consume():
+        return "".join([piece async for piece in graph_rag.graph_rag_stream(STREAM_QUESTION)])
+
+    assert asyncio.run(consume())
+    (trace,) = traced.traces
+    assert trace["name"] == "graph_rag_stream" and "stopped_early" not in trace["attrs"]
+    names = [s["name"] for s in trace["spans"]]
+    assert {"neo4j.stream", "build_context", "gemini_stream"} <= set(names)
@@ -0,0 +1,101 @@
+"""validate_data: duplicate keys, dangling references and bad dates are reported; the schema is detected."""
+
+import pandas as pd
+import pytest
+
+from validate_data import detect_dataset, format_report, validate
+
+TODAY = "2025-12-31"
+
+
+def write(data_dir, **tables):
+    for name, rows in tables.items():
+        pd.DataFrame(rows).to_csv(data_dir / f"{name}.csv", index=False)
+    return str(data_dir)
+
+
+def nurses(*ids):
+    return {"nurse_id": list(ids), "hire_date": ["2020-01-01"] * len(ids)}
+
+
+def by_check(validator):
+    return {(i["table"], i["check"], i["column"]): i for i in validator.issues}
+
+
+def test_small_dataset_is_clean(small_dataset):
+    validator = validate(small_dataset)
+    assert validator.dataset == "nurses_data_v3"
+    assert validator.errors == [] and validator.rows["nurses"] == 12
+
+
+@pytest.mark.parametrize("block_size", [1 << 20, 64])    # 64 bytes: the checks span many record batches
+def test_problems_are_reported(tmp_path, block_size):
+    data_dir = write(
+        tmp_path,
+        nurses=nurses("N0001", "N0002", "N0002", "N0003"),
+        shifts={"shift_id": ["S1", "S2", "S3", "S4"], "nurse_id": ["N0001", "N0009", "N0002", None],
+                "date": ["2025-10-01", "2025-10-02", "2019-06-01", "2025-10-03"]},
+        training={"training_id": ["T1", "T2"], "nurse_id": ["N0001", "N0003"], "date": ["2025-01-01", "2025-02-01"],
+                  "cert_expiry": ["2024-01-01", "2027-02-01"]},
+    )
+    validator = validate(data_dir, today=TODAY, block_size=block_size)
+    issues = by_check(validator)
+
+    duplicate = issues["nurses", "unique", "nurse_id"]
+    assert (duplicate["count"], duplicate["examples"], duplicate["severity"]) == (1, ["N0002"], "error")
+    dangling = issues["shifts", "reference", "nurse_id"]
+    assert (dangling["count"], dangling["examples"], dangling["severity"]) == (1, ["N0009"], "error")
+    assert issues["shifts", "null", "nurse_id"]["examples"] == ["line 5"]
+    assert issues["shifts", "after", "date >= nurses.hire_date"]["examples"] == ["S3"]
+    assert issues["training", "ordered", "cert_expiry >= date"]["examples"] == ["T1"]
+    assert len(validator.issues) == 5 and len(validator.errors) == 3
+
+    report = format_report(validator)
+    assert report.startswith("nurses_data_v3 in ") and "N0009" in report
+
+
+def test_unparseable_date_is_an_error(tmp_path):
+    data_dir = write(
+        tmp_path,
+        nurses=nurses("N0001"),
+        health={"record_id": ["H1", "H2"], "nurse_id": ["N0001", "N0001"], "date": ["2024-03-01", "2024-13-45"],
+                "return_date": ["2024-03-05", "2024-03-05"]},
+    )
+    issues = by_check(validate(data_dir, today=TODAY))
+    assert issues["health", "parse", None]["severity"] == "error"
+    assert "2024-13-45" in issues["health", "parse", None]["examples"][0]
+
+
+def test_future_dates_are_warnings(tmp_path):
+    data_dir = write(tmp_path, nurses=nurses("N0001"),
+                     health={"record_id": ["H1"], "nurse_id": ["N0001"], "date": ["2026-01-01"],
+                             "return_date": ["2026-01-02"]})
+    validator = validate(data_dir, today=TODAY)
+    assert by_check(validator)["health", "future", "date"]["examples"] == ["H1"]
+    assert validator.errors == []
+
+
+def test_detect_dataset(tmp_path, small_dataset):
+    assert detect_dataset(small_dataset) == "nurses_data_v3"
+
+    delta = tmp_path / "delta"    # what --append-weeks writes: the appended tables only
+    delta.mkdir()
+    write(delta, shifts={"shift_id": ["S1"], "nurse_id": ["N0001"], "date": ["2025-10-01"]},
+          nurses_feedback={"feedback_id": ["F1"], "shift_id": ["S1"]})
+    assert detect_dataset(str(delta)) == "nurses_data_v3"
+
+    kg = tmp_path / "kg"    # shares nurses.csv with nurses_data_v3, but the other tables decide
+    kg.mkdir()
+    write(kg, clinics={"clinic_id": ["C1"]}, teams={"team_id": ["T1"]}, families={"family_id": ["F1"]},
+          nurses={"nurse_id": ["N1"], "clinic_id": ["C1"], "team_id": ["T1"], "family_id": ["F9"]},
+          peer_ratings={"from_nurse_id": ["N1"], "to_nurse_id": ["N1"]})
+    validator = validate(str(kg))
+    assert validator.dataset == "nurse_kg_data_v1"
+    issues = by_check(validator)
+    assert issues["nurses", "reference", "family_id"]["examples"] == ["F9"]
+    assert issues["peer_ratings", "distinct", "from_nurse_id != to_nurse_id"]["severity"] == "warning"
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    with pytest.raises(ValueError, match="does not look like"):
+        detect_dataset(str(empty))
@@ -0,0 +1,44 @@
+"""VectorIndex persistence: saving over a loaded (memory-mapped) index must not corrupt it."""
+
+import numpy as np
+
+from vector_index import VectorIndex, synthetic_texts
+
+QUERIES = ["felt unsupported by management", "grateful for colleagues after a difficult night shift"]
+
+
+def build(path, n=3000):
+    texts = list(synthetic_texts(n))
+    index = VectorIndex()
+    index.upsert([f"doc:{i}" for i in range(n)], texts)
+    index.compact(retrain=True)
+    index.save(path)
+    return texts
+
+
+def test_load_add_save_load_round_trip(tmp_path):
+    texts = build(tmp_path)
+    index = VectorIndex.load(tmp_path)
+    assert isinstance(index.vectors, np.memmap)
+
+    index.upsert(["new:1", "new:2"], ["felt unsupported by management today", "great team"])
+    index.delete(["doc:0"])
+    index.save(tmp_path)    # rewrites vectors.npy while this index still maps it
+    reloaded = VectorIndex.load(tmp_path)
+
+    assert len(reloaded) == len(index) == len(texts) + 1
+    assert np.array_equal(np.asarray(reloaded.vectors), np.asarray(index.vectors))
+    assert reloaded.search(QUERIES, k=5) == index.search(QUERIES, k=5)
+    assert "new:1" in reloaded.locations and "doc:0" not in reloaded.locations
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_save_after_compacting_a_loaded_index(tmp_path):
+    build(tmp_path)
+    index = VectorIndex.load(tmp_path)
+    index.upsert([f"more:{i}" for i in range(500)], list(synthetic_texts(500, seed=1)))
+    index.compact()
+    index.save(tmp_path)
+    reloaded = VectorIndex.load(tmp_path)
+    assert len(reloaded) == len(index)
+    assert reloaded.search(QUERIES, k=5) == index.search(QUERIES, k=5)
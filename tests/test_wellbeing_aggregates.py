@@ -0,0 +1,147 @@
+"""compute_aggregates on hand-built tables, read_inputs on duplicated keys, and the hash diff between runs."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+import embedded_backend
+import wellbeing_aggregates as wa
+
+
+def hand_built():
+    shifts = pd.DataFrame({
+        "shift_id": ["S1", "S2", "S3", "S4"],
+        "nurse_id": ["N1", "N1", "N2", "N1"],
+        "date": pd.to_datetime(["2025-10-06", "2025-10-08", "2025-10-13", "2025-10-14"]),    # two Monday weeks
+        "unit": ["ICU", "ICU", "ED", "ICU"],
+        "shift_type": ["Day", "Night", "Night", "Day"],
+        "hours": [12, 12, 8, 12],
+        "patients": [4, 6, 3, 5],
+        "acuity": [5, 7, 2, 6],
+        "overtime": [False, True, False, False],
+    })
+    feedback = pd.DataFrame({
+        "shift_id": ["S1", "S2", "S3"],
+        "feedback_id": ["F1", "F2", "F3"],
+        "reported_stress": ["High", "Low", "High"],
+        "burnout_freq": ["Weekly", "Never", "Every day"],
+        "emotionally_drained": [True, False, True],
+        "intent_to_leave": [False, True, True],
+        "satisfaction": [2, 4, 1],
+    })
+    reviews = pd.DataFrame({"shift_id": ["S1", "S3"], "feedback_id": ["F1", "F3"], "performance_score": [4, 2]})
+    return shifts, feedback, reviews
+
+
+def by_key(tables, name):
+    return tables[name].set_index(wa.KEYS[name])
+
+
+def test_compute_aggregates():
+    tables = wa.compute_aggregates(*hand_built())
+    unit_week = by_key(tables, "unit_week")
+    assert sorted(unit_week.index) == ["ED|2025-10-13", "ICU|2025-10-06", "ICU|2025-10-13"]
+
+    icu = unit_week.loc["ICU|2025-10-06"]
+    assert icu[["shifts", "hours", "avg_acuity", "overtime_share"]].tolist() == [2, 24, 6.0, 0.5]
+    assert icu[["responses", "pct_high_stress", "pct_frequent_burnout", "pct_drained"]].tolist() == [2, 50, 50, 50]
+    assert icu[["pct_intent_to_leave", "avg_satisfaction", "reviews", "avg_performance"]].tolist() == [50, 3, 1, 4]
+
+    later = unit_week.loc["ICU|2025-10-13"]
+    assert later["responses"] == 0 and pd.isna(later["pct_frequent_burnout"])
+    assert later["pct_frequent_burnout_4w"] == 50.0    # the week before still counts in the rolling rate
+
+    nurse_week = by_key(tables, "nurse_week")
+    assert nurse_week.loc["N1|2025-10-06", "shifts"] == 2 and nurse_week.loc["N2|2025-10-13", "pct_high_stress"] == 100
+
+    nurse = by_key(tables, "nurse")
+    assert nurse.loc["N1", "shift_count"] == 3 and nurse.loc["N1", "night_share"] == 0.333
+    assert nurse.loc["N1", "feedback_count"] == 2 and nurse.loc["N1", "pct_high_stress"] == 50
+    assert bool(nurse.loc["N1", "reported_intent_to_leave"]) and nurse.loc["N1", "avg_performance"] == 4
+    assert nurse.loc["N2", "avg_satisfaction"] == 1 and nurse.loc["N2", "pct_frequent_burnout"] == 100
+
+
+def plain(df, key):
+    df = df.sort_values(key, ignore_index=True)
+    return df.astype({c: str for c in df.select_dtypes("category").columns})
+
+
+@pytest.fixture
+def data_dir(small_dataset, tmp_path):
+    path = tmp_path / "data"
+    shutil.copytree(small_dataset, path)
+    return str(path)
+
+
+def duplicate_rows(data_dir, name, n=5):
+    path = f"{data_dir}/{name}.csv"
+    df = pd.read_csv(path)
+    df.iloc[:n].to_csv(path, mode="a", header=False, index=False)
+
+
+def test_duplicate_keys_count_once_and_match_the_embedded_backend(small_dataset, data_dir, tmp_path):
+    for name in ("shifts", "nurses_feedback", "supervisors_feedback"):
+        duplicate_rows(data_dir, name)
+    expected = wa.compute_aggregates(*wa.read_inputs(small_dataset))
+    tables = wa.compute_aggregates(*wa.read_inputs(data_dir))
+    embedded = embedded_backend.EmbeddedBackend(data_dir, str(tmp_path / "embedded")).aggregates()
+    for name, key in wa.KEYS.items():
+        pd.testing.assert_frame_equal(plain(tables[name], key), plain(expected[name], key))
+        pd.testing.assert_frame_equal(plain(embedded[name], key)[tables[name].columns], plain(tables[name], key),
+                                      check_dtype=False)
+
+
+class RecordingDriver:
+    """Records the rows of every write; sessions, transactions and results are the driver itself."""
+
+    def __init__(self):
+        self.writes = []
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work):
+        return work(self)
+
+    def run(self, query, rows=None):
+        if rows is not None:
+            self.writes.append((query, rows))
+        return self
+
+    def consume(self):
+        pass
+
+
+def test_unchanged_second_run_writes_nothing(data_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(wa, "bump_data_version", lambda: None)
+    state = str(tmp_path / "state")
+    driver = RecordingDriver()
+
+    first = wa.refresh(driver, data_dir, state)
+    tables = wa.compute_aggregates(*wa.read_inputs(data_dir))
+    assert first == {name: (len(df), 0) for name, df in tables.items()}
+
+    driver.writes.clear()
+    assert wa.refresh(driver, data_dir, state) == dict.fromkeys(wa.KEYS, (0, 0))
+    assert driver.writes == []
+
+    # One shift's acuity changes: only its unit week, nurse week and nurse are rewritten
+    shifts = pd.read_csv(f"{data_dir}/shifts.csv")
+    shifts.loc[0, "acuity"] = 100
+    shifts.to_csv(f"{data_dir}/shifts.csv", index=False)
+    assert wa.refresh(driver, data_dir, state) == dict.fromkeys(wa.KEYS, (1, 0))
+    written = {row.get("window_id") or row["nurse_id"] for _, rows in driver.writes for row in rows}
+    nurse_id = shifts.loc[0, "nurse_id"]
+    assert nurse_id in written and any(key.startswith(f"{nurse_id}|") for key in written)
+
+    # A nurse whose shifts are gone loses its windows and properties
+    shifts[shifts["nurse_id"] != nurse_id].to_csv(f"{data_dir}/shifts.csv", index=False)
+    stats = wa.refresh(driver, data_dir, state, dry_run=True)
+    assert stats["nurse"] == (0, 1) and stats["nurse_week"][1] > 0